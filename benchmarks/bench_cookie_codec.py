@@ -0,0 +1,61 @@
+"""
+Compares encode/decode time and stored item size of the legacy pickle cookie format and CompactCookieCodec.
+
+Usage:
+    python -m benchmarks.bench_cookie_codec [--cookies 30] [--iterations 2000]
+"""
+import argparse
+import secrets
+import time
+import timeit
+from http.cookiejar import Cookie
+
+from py_aws_core.cookie_codecs import CompactCookieCodec, ICookieCodec, PickleCookieCodec
+
+
+def build_cookies(n: int) -> list[Cookie]:
+    expires = int(time.time()) + 3600
+    return [
+        Cookie(
+            version=0,
+            name=f'cookie_{i}',
+            value=secrets.token_urlsafe(16 + 8 * (i % 10)),
+            port=None,
+            port_specified=False,
+            domain=f'.www{i % 3}.example.com',
+            domain_specified=True,
+            domain_initial_dot=True,
+            path='/',
+            path_specified=True,
+            secure=True,
+            expires=expires,
+            discard=False,
+            comment=None,
+            comment_url=None,
+            rest={'HttpOnly': None, 'SameSite': 'Lax'},
+        )
+        for i in range(n)
+    ]
+
+
+def bench(name: str, codec: ICookieCodec, cookies: list[Cookie], iterations: int):
+    encoded = codec.encode(cookies)
+    encode_us = timeit.timeit(lambda: codec.encode(cookies), number=iterations) / iterations * 1e6
+    decode_us = timeit.timeit(lambda: codec.decode(encoded), number=iterations) / iterations * 1e6
+    print(f'{name:<24} size={len(encoded):>6} B  encode={encode_us:8.1f} us  decode={decode_us:8.1f} us')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cookies', type=int, default=30)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    cookies = build_cookies(args.cookies)
+    bench('pickle+base64 (legacy)', PickleCookieCodec(), cookies, args.iterations)
+    bench('compact', CompactCookieCodec(compress_threshold=None), cookies, args.iterations)
+    bench('compact+zlib', CompactCookieCodec(compress_threshold=0), cookies, args.iterations)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Measures the per-call overhead each decorator adds to a trivial function, on the success path.
+
+Usage:
+    python -m benchmarks.bench_decorators [--iterations 200000]
+"""
+import argparse
+import timeit
+
+from py_aws_core import decorators, exceptions
+
+
+def build_funcs() -> dict[str, callable]:
+    def func(x):
+        return {'Item': {'PK': {'S': x}}, 'ResponseMetadata': {'HTTPStatusCode': 200}}
+
+    return {
+        'undecorated': func,
+        'boto3_handler': decorators.boto3_handler(raise_as=exceptions.DynamoDBException)(func),
+        'dynamodb_handler': decorators.dynamodb_handler(client_err_map=exceptions.ERR_CODE_MAP, cancellation_err_maps=[])(func),
+        'retry': decorators.retry(retry_exceptions=(exceptions.DynamoDBException,))(func),
+        'http_status_check': decorators.http_status_check()(func),
+        'wrap_exceptions': decorators.wrap_exceptions(raise_as=exceptions.DynamoDBException)(func),
+        'retry+dynamodb_handler': decorators.retry(retry_exceptions=(exceptions.DynamoDBException,))(
+            decorators.dynamodb_handler(client_err_map=exceptions.ERR_CODE_MAP, cancellation_err_maps=[])(func)
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=200_000)
+    args = parser.parse_args()
+
+    funcs = build_funcs()
+    baseline = None
+    for name, func in funcs.items():
+        ns = min(timeit.repeat(lambda: func('pk'), number=args.iterations, repeat=5)) / args.iterations * 1e9
+        baseline = ns if baseline is None else baseline
+        print(f'{name:<24} {ns:8.0f} ns/call  overhead={ns - baseline:8.0f} ns')
+
+
+if __name__ == '__main__':
+    main()
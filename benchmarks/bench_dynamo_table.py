@@ -0,0 +1,82 @@
+"""
+Measures the per-call cost of resolving DynamoTable.table, uncached vs cached,
+and of a GetItem through the table resource vs the low-level client path.
+Responses are returned by a "before-send" hook, so no request leaves the process.
+
+Usage:
+    AWS_DEFAULT_REGION=us-west-2 python -m benchmarks.bench_dynamo_table [--iterations 2000]
+"""
+import argparse
+import json
+import os
+import timeit
+
+# Requests are signed before the hook answers them, so any credentials will do
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'bench')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'bench')
+
+from botocore.awsrequest import AWSResponse
+
+from py_aws_core.boto_clients import DynamoTable
+from py_aws_core.secrets_interface import IDynamoDBSecrets
+
+ITEM = {
+    'PK': {'S': 'SESSION#1'},
+    'SK': {'S': 'SESSION#1'},
+    'Count': {'N': '12'},
+    'Tags': {'SS': ['a', 'b', 'c']},
+    'Data': {'M': {'Name': {'S': 'abc'}, 'Enabled': {'BOOL': True}}},
+}
+
+
+class StaticSecrets(IDynamoDBSecrets):
+    def get_secret(self, secret_name: str) -> str:
+        return ''
+
+    def get_table_name(self) -> str:
+        return 'BENCH_TABLE'
+
+
+class RawBody:
+    def __init__(self, body: bytes):
+        self._body = body
+
+    def stream(self, **kwargs):
+        yield self._body
+
+
+def fake_send(request, **kwargs) -> AWSResponse:
+    return AWSResponse(request.url, 200, {'Content-Type': 'application/x-amz-json-1.0'}, RawBody(json.dumps({'Item': ITEM}).encode()))
+
+
+def per_call_us(func, iterations: int) -> float:
+    return min(timeit.repeat(func, number=iterations, repeat=3)) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    dynamo_table = DynamoTable(ddb_secrets=StaticSecrets())
+    dynamo_table.client.meta.events.register('before-send.dynamodb', fake_send)
+    dynamo_table.table.meta.client.meta.events.register('before-send.dynamodb', fake_send)
+
+    def uncached_table():
+        dynamo_table.invalidate()
+        return dynamo_table.table
+
+    key = {'PK': 'SESSION#1', 'SK': 'SESSION#1'}
+    low_level_key = {'PK': {'S': 'SESSION#1'}, 'SK': {'S': 'SESSION#1'}}
+    results = {
+        'table (uncached)': per_call_us(uncached_table, args.iterations),
+        'table (cached)': per_call_us(lambda: dynamo_table.table, args.iterations),
+        'get_item (resource)': per_call_us(lambda: dynamo_table.table.get_item(Key=key), args.iterations),
+        'get_item (client)': per_call_us(lambda: dynamo_table.get_item(key=low_level_key), args.iterations),
+    }
+    for name, us in results.items():
+        print(f'{name:<22} {us:10.2f} us/call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Compares serializing and deserializing batches of items with boto3's TypeSerializer/TypeDeserializer,
+built per key as DynamoDBAPI did before, against DynamoDBCodec, and with a schema when deserializing.
+
+Usage:
+    python -m benchmarks.bench_dynamodb_codec [--items 10000] [--repeat 5]
+"""
+import argparse
+import timeit
+from decimal import Decimal
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from py_aws_core.dynamodb_codec import DynamoDBCodec
+
+SCHEMA = {
+    'PK': 'S',
+    'SK': 'S',
+    'Type': 'S',
+    'CreatedAt': 'S',
+    'CreatedBy': 'S',
+    'ExpiresAt': 'N',
+    'SessionId': 'S',
+    'Count': 'N',
+    'Enabled': 'BOOL',
+    'Data': 'M',
+}
+
+
+def build_items(n: int) -> list[dict]:
+    return [
+        {
+            'PK': f'SESSION#{i}',
+            'SK': f'SESSION#{i}',
+            'Type': 'SESSION',
+            'CreatedAt': '2024-05-01T12:00:00+00:00',
+            'CreatedBy': 'bench',
+            'ExpiresAt': 1714564800 + i,
+            'SessionId': f'{i:012x}',
+            'Count': Decimal(i % 100),
+            'Enabled': i % 2 == 0,
+            'Data': {'Name': f'name-{i}', 'Tags': ['a', 'b'], 'Score': i},
+        }
+        for i in range(n)
+    ]
+
+
+def boto3_serialize(items: list[dict]) -> list[dict]:
+    return [{k: TypeSerializer().serialize(v) for k, v in item.items()} for item in items]
+
+
+def boto3_deserialize(items: list[dict]) -> list[dict]:
+    return [{k: TypeDeserializer().deserialize(v) for k, v in item.items()} for item in items]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    items = build_items(args.items)
+    serialized = boto3_serialize(items)
+    codec = DynamoDBCodec()
+    schema_codec = DynamoDBCodec(schema=SCHEMA)
+    assert codec.serialize_items(items) == schema_codec.serialize_items(items) == serialized
+    assert codec.deserialize_items(serialized) == schema_codec.deserialize_items(serialized) == boto3_deserialize(serialized)
+
+    cases = {
+        'serialize': {
+            'boto3 (per key)': lambda: boto3_serialize(items),
+            'codec': lambda: codec.serialize_items(items),
+        },
+        'deserialize': {
+            'boto3 (per key)': lambda: boto3_deserialize(serialized),
+            'codec': lambda: codec.deserialize_items(serialized),
+            'codec (schema)': lambda: schema_codec.deserialize_items(serialized),
+        },
+    }
+    for direction, funcs in cases.items():
+        baseline = None
+        for name, func in funcs.items():
+            ms = min(timeit.repeat(func, number=1, repeat=args.repeat)) * 1000
+            baseline = ms if baseline is None else baseline
+            print(f'{direction:<12} {name:<16} {ms:8.1f} ms/{args.items} items  speedup={baseline / ms:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
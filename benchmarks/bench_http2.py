@@ -0,0 +1,115 @@
+"""
+Compares RetryClient request throughput over HTTP/1.1 and HTTP/2 against local test servers.
+
+Each server delays its response to mimic upstream latency, so throughput is bound by how many requests
+can be in flight at once. HTTP/1.1 is limited to one request per pooled connection, HTTP/2 multiplexes
+every request over a single connection.
+
+The HTTP/2 server speaks cleartext HTTP/2 with prior knowledge (h2c), so no certificates are needed.
+
+Usage:
+    python -m benchmarks.bench_http2 [--requests 500] [--concurrency 50] [--delay 0.02]
+"""
+import argparse
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import h2.config
+import h2.connection
+import h2.events
+
+from py_aws_core.clients import RetryClient
+
+BODY = b'{"ok": true}'
+
+
+def start_http1_server(delay: float) -> int:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+def start_http2_server(delay: float) -> int:
+    class H2Protocol(asyncio.Protocol):
+        def connection_made(self, transport):
+            self.transport = transport
+            self.conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+            self.conn.initiate_connection()
+            self.transport.write(self.conn.data_to_send())
+
+        def data_received(self, data):
+            for event in self.conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    asyncio.get_running_loop().call_later(delay, self.respond, event.stream_id)
+            self.transport.write(self.conn.data_to_send())
+
+        def respond(self, stream_id):
+            if self.transport.is_closing():
+                return
+            self.conn.send_headers(stream_id, [(':status', '200'), ('content-length', str(len(BODY)))])
+            self.conn.send_data(stream_id, BODY, end_stream=True)
+            self.transport.write(self.conn.data_to_send())
+
+    started = threading.Event()
+    port = []
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(loop.create_server(H2Protocol, '127.0.0.1', 0))
+        port.append(server.sockets[0].getsockname()[1])
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    started.wait()
+    return port[0]
+
+
+def run(client: RetryClient, url: str, n_requests: int, concurrency: int) -> float:
+    client.get(url)  # Warm up connection
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for response in executor.map(lambda _: client.get(url), range(n_requests)):
+            assert response.status_code == 200
+    return n_requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--delay', type=float, default=0.02)
+    args = parser.parse_args()
+
+    http1_port = start_http1_server(delay=args.delay)
+    http2_port = start_http2_server(delay=args.delay)
+
+    for profile in ('low_footprint', 'default'):
+        with RetryClient(pool_profile=profile) as client:
+            rps = run(client, f'http://127.0.0.1:{http1_port}/', args.requests, args.concurrency)
+        print(f'HTTP/1.1 pool_profile={profile:<16} {rps:8.1f} req/s')
+
+        with RetryClient(pool_profile=profile, http1=False, http2=True) as client:
+            rps = run(client, f'http://127.0.0.1:{http2_port}/', args.requests, args.concurrency)
+        print(f'HTTP/2   pool_profile={profile:<16} {rps:8.1f} req/s')
+
+
+if __name__ == '__main__':
+    main()
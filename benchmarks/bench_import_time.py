@@ -0,0 +1,53 @@
+"""
+Measures the cold-start import cost of each py_aws_core module, in a fresh interpreter per sample,
+from the cumulative times reported by "python -X importtime".
+
+Usage:
+    python -m benchmarks.bench_import_time [--repeat 5] [--modules py_aws_core.logs py_aws_core.router]
+"""
+import argparse
+import pkgutil
+import subprocess
+import sys
+
+import py_aws_core
+
+
+def get_modules() -> list[str]:
+    return sorted(
+        f'{py_aws_core.__name__}.{m.name}'
+        for m in pkgutil.iter_modules(py_aws_core.__path__)
+        if not m.ispkg and m.name != 'testing'
+    )
+
+
+def measure(module: str) -> float:
+    """
+    :return: Cumulative import time of module, in milliseconds
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in reversed(result.stderr.splitlines()):
+        _, _, cumulative, name = (part.strip() for part in line.replace(':', '|', 1).split('|'))
+        if name == module:
+            return int(cumulative) / 1000
+    raise RuntimeError(f'No import time reported for {module}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--modules', nargs='*', default=None)
+    args = parser.parse_args()
+
+    for module in args.modules or get_modules():
+        ms = min(measure(module) for _ in range(args.repeat))
+        print(f'{module:<36} {ms:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,97 +1,380 @@
+import dataclasses
+import threading
+import typing
 from abc import ABC
+from dataclasses import dataclass
 
-import boto3
-from botocore.client import BaseClient
-from botocore.config import Config
-
+from . import logs
 from .secrets_interface import IDynamoDBSecrets
 
+if typing.TYPE_CHECKING:  # boto3 is imported on first use, it is the slowest import on a cold start
+    import boto3
+    from botocore.client import BaseClient
+    from botocore.config import Config
+
+logger = logs.get_logger()
+
+
+class BotoClientRegistry:
+    """
+    Process-wide cache of botocore clients, keyed by service, region, config, client kwargs and the session's
+    profile and credentials, so sessions signing as different identities never share a client.
+    Building a client loads its service model and endpoint rules, so warm Lambda invocations reuse them instead.
+    Clients are thread-safe once built
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = dict()
+
+    def get_client(self, session: 'boto3.Session', service_name: str, config: 'Config' = None, **kwargs) -> 'BaseClient':
+        key = (
+            service_name,
+            kwargs.get('region_name') or session.region_name,
+            get_config_key(config),
+            tuple(sorted(kwargs.items())),
+            get_session_key(session),
+        )
+        if client := self._clients.get(key):
+            return client
+        with self._lock:
+            if not (client := self._clients.get(key)):
+                client = self._clients[key] = session.client(service_name=service_name, config=config, **kwargs)
+                logger.info(
+                    f'Built boto client',
+                    service_name=service_name,
+                    region_name=client.meta.region_name,
+                    max_pool_connections=client.meta.config.max_pool_connections,
+                    retry_mode=client.meta.config.retries.get('mode'),
+                )
+            return client
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+    def __len__(self):
+        return len(self._clients)
+
+
+def get_config_key(config: typing.Optional['Config']) -> str | None:
+    if config is None:
+        return None
+    # Config has no public accessor for the options it was built with
+    return repr(sorted(config._user_provided_options.items()))
+
+
+def get_session_key(session: 'boto3.Session') -> typing.Tuple:
+    """
+    Profile and credentials the session signs requests with.
+    Refreshable credentials, e.g. of an assumed or instance role, are keyed by their source, since their keys rotate
+    """
+    from botocore.credentials import RefreshableCredentials
+
+    if (credentials := session.get_credentials()) is None:
+        return session.profile_name, None, None
+    if isinstance(credentials, RefreshableCredentials):
+        return session.profile_name, credentials.method, None
+    return session.profile_name, credentials.method, credentials.access_key
+
+
+BOTO_CLIENTS = BotoClientRegistry()
+
+
+@dataclass(frozen=True)
+class BotoProfile:
+    """
+    Timeouts, retries and connection pool sizing for a botocore client
+    :param retry_mode: "standard", or "adaptive" to also rate limit on the client side when throttled.
+        None keeps botocore's default, "legacy" unless configured otherwise
+    :param max_pool_connections: Should be at least the number of threads sharing the client
+    """
+    connect_timeout: float = 4.9
+    read_timeout: float = 4.9
+    total_max_attempts: int = 2
+    retry_mode: str | None = None
+    max_pool_connections: int = 10
+    tcp_keepalive: bool = False
+
+    def get_config(self, **kwargs) -> 'Config':
+        from botocore.config import Config
+
+        retries = dict(total_max_attempts=self.total_max_attempts)
+        if self.retry_mode:
+            retries['mode'] = self.retry_mode
+        return Config(
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.read_timeout,
+            retries=retries,
+            max_pool_connections=self.max_pool_connections,
+            tcp_keepalive=self.tcp_keepalive,
+            **kwargs
+        )
+
+
+BOTO_PROFILES = {
+    # The original client settings
+    'default': BotoProfile(),
+    # API handlers, fail fast and retry up to twice quickly rather than eat the caller's timeout
+    'latency_sensitive': BotoProfile(
+        connect_timeout=1.0,
+        read_timeout=2.0,
+        total_max_attempts=3,
+        retry_mode='standard',
+        tcp_keepalive=True,
+    ),
+    # Threaded batch writers, sized for many concurrent requests and backing off when throttled
+    'bulk': BotoProfile(
+        connect_timeout=5.0,
+        read_timeout=30.0,
+        total_max_attempts=10,
+        retry_mode='adaptive',
+        max_pool_connections=50,
+        tcp_keepalive=True,
+    ),
+    # Jobs with no caller waiting, patient with slow or throttled responses
+    'background': BotoProfile(
+        connect_timeout=10.0,
+        read_timeout=60.0,
+        total_max_attempts=5,
+        retry_mode='adaptive',
+    ),
+}
+
+
+def get_boto_profile(boto_profile: str | BotoProfile) -> BotoProfile:
+    if isinstance(boto_profile, BotoProfile):
+        return boto_profile
+    try:
+        return BOTO_PROFILES[boto_profile]
+    except KeyError:
+        raise ValueError(f'Unknown boto profile "{boto_profile}", expected one of {list(BOTO_PROFILES)}')
+
+
+class BotoSessionManager:
+    """
+    Hands each thread its own boto3 Session, created on first use, since sessions are not thread-safe.
+    Clients built from them are shared through BOTO_CLIENTS, resources are not thread-safe and stay per thread
+    """
+    def __init__(self):
+        self._local = threading.local()
+
+    def get_session(self) -> 'boto3.Session':
+        if (session := getattr(self._local, 'session', None)) is None:
+            import boto3
+            logs.load_env()  # The session reads its region and credentials, which may come from .env
+            session = self._local.session = boto3.Session()
+        return session
+
+    def reset(self):
+        """
+        Drops the sessions of all threads, e.g. after changing AWS environment variables in tests
+        """
+        self._local = threading.local()
+
+
+BOTO_SESSIONS = BotoSessionManager()
+
 
 class ABCBotoSession(ABC):
+    """
+    Set BOTO_PROFILE on a subclass, or pass "boto_profile" to an instance, to pick a BOTO_PROFILES entry or a BotoProfile
+
+    Subclasses overriding CLIENT_CONNECT_TIMEOUT or CLIENT_READ_TIMEOUT get the default profile with those timeouts
+    """
+    BOTO_PROFILE: str | BotoProfile = 'default'
     CLIENT_CONNECT_TIMEOUT = 4.9
     CLIENT_READ_TIMEOUT = 4.9
+    CLIENT_REGISTRY = BOTO_CLIENTS
 
-    _boto3_session = boto3.Session()
+    SESSION_MANAGER = BOTO_SESSIONS
 
     @classmethod
-    def _get_config(cls, **kwargs):
-        return Config(
-            connect_timeout=cls.CLIENT_CONNECT_TIMEOUT,
-            read_timeout=cls.CLIENT_READ_TIMEOUT,
-            retries=dict(
-                total_max_attempts=2,
-            ),
-            **kwargs
-        )
+    def _get_boto3_session(cls) -> 'boto3.Session':
+        """
+        Session of the calling thread, created on first use
+        """
+        return cls.SESSION_MANAGER.get_session()
+
+    @classmethod
+    def _get_config(cls, boto_profile: str | BotoProfile = None, **kwargs) -> 'Config':
+        profile = get_boto_profile(boto_profile or cls.BOTO_PROFILE)
+        if timeouts := cls._get_timeout_overrides():
+            if profile is not BOTO_PROFILES['default']:
+                raise ValueError(
+                    f'{cls.__name__} overrides {list(timeouts)}, which only apply to the default boto profile. '
+                    f'Set the timeouts on a BotoProfile instead'
+                )
+            profile = dataclasses.replace(profile, **timeouts)
+        return profile.get_config(**kwargs)
+
+    @classmethod
+    def _get_timeout_overrides(cls) -> typing.Dict[str, float]:
+        timeouts = dict()
+        if cls.CLIENT_CONNECT_TIMEOUT != ABCBotoSession.CLIENT_CONNECT_TIMEOUT:
+            timeouts['connect_timeout'] = cls.CLIENT_CONNECT_TIMEOUT
+        if cls.CLIENT_READ_TIMEOUT != ABCBotoSession.CLIENT_READ_TIMEOUT:
+            timeouts['read_timeout'] = cls.CLIENT_READ_TIMEOUT
+        return timeouts
 
 
 class ABCBotoClient(ABCBotoSession):
-    def __init__(self, service_name: str, verify: bool = True, **kwargs):
+    def __init__(self, service_name: str, verify: bool = True, boto_profile: str | BotoProfile = None, **kwargs):
         self._boto_client = self._get_new_client(
             service_name=service_name,
             verify=verify,
+            boto_profile=boto_profile,
             **kwargs
         )
 
-    def _get_new_client(self, service_name: str, verify: bool, **kwargs) -> BaseClient:
-        return self._boto3_session.client(
-            config=self._get_config(),
+    def _get_new_client(self, service_name: str, verify: bool, boto_profile: str | BotoProfile = None, **kwargs) -> 'BaseClient':
+        return self.CLIENT_REGISTRY.get_client(
+            session=self._get_boto3_session(),
+            config=self._get_config(boto_profile),
             service_name=service_name,
             **kwargs
         )
 
     @property
-    def boto_client(self) -> BaseClient:
+    def boto_client(self) -> 'BaseClient':
         return self._boto_client
 
+    @property
+    def max_pool_connections(self) -> int:
+        """
+        Effective connection pool size of the client
+        """
+        return self._boto_client.meta.config.max_pool_connections
+
 
 class ABCBotoResource(ABCBotoSession):
-    def __init__(self, service_name: str, **kwargs):
-        self._boto_resource = self._get_new_resource(
+    """
+    Builds one resource per thread, on first use from that thread
+    """
+    def __init__(self, service_name: str, boto_profile: str | BotoProfile = None, **kwargs):
+        self._service_name = service_name
+        self._boto_profile = boto_profile
+        self._resource_kwargs = kwargs
+        self._local = threading.local()
+        self._local.boto_resource = self._get_new_resource(
             service_name=service_name,
+            boto_profile=boto_profile,
             **kwargs
         )
 
-    def _get_new_resource(self, service_name: str, **kwargs) -> BaseClient:
-        return self._boto3_session.resource(
-            config=self._get_config(),
+    def _get_new_resource(self, service_name: str, boto_profile: str | BotoProfile = None, **kwargs) -> 'BaseClient':
+        return self._get_boto3_session().resource(
+            config=self._get_config(boto_profile),
             service_name=service_name,
             **kwargs
         )
 
     @property
-    def boto_resource(self) -> BaseClient:
-        return self._boto_resource
+    def boto_resource(self) -> 'BaseClient':
+        if (boto_resource := getattr(self._local, 'boto_resource', None)) is None:
+            boto_resource = self._local.boto_resource = self._get_new_resource(
+                service_name=self._service_name,
+                boto_profile=self._boto_profile,
+                **self._resource_kwargs
+            )
+        return boto_resource
+
+    @property
+    def max_pool_connections(self) -> int:
+        """
+        Effective connection pool size of the resource's client
+        """
+        return self.boto_resource.meta.client.meta.config.max_pool_connections
 
 
 class CognitoClient(ABCBotoClient):
-    def __init__(self):
-        super().__init__(service_name='cognito-idp')
+    def __init__(self, boto_profile: str | BotoProfile = None):
+        super().__init__(service_name='cognito-idp', boto_profile=boto_profile)
 
 
 class SecretManagerClient(ABCBotoClient):
-    def __init__(self):
-        super().__init__(service_name='secretsmanager')
+    def __init__(self, boto_profile: str | BotoProfile = None):
+        super().__init__(service_name='secretsmanager', boto_profile=boto_profile)
 
 
 class SSMClient(ABCBotoClient):
-    def __init__(self):
-        super().__init__(service_name='ssm')
+    def __init__(self, boto_profile: str | BotoProfile = None):
+        super().__init__(service_name='ssm', boto_profile=boto_profile)
 
 
 class DynamoTable(ABCBotoResource):
-    def __init__(self, ddb_secrets: IDynamoDBSecrets):
-        super().__init__(service_name='dynamodb')
+    """
+    The table name is resolved on first use and cached, the Table resource is cached per thread.
+    Call invalidate() to resolve them again, e.g. after the table name secret was rotated
+    """
+    def __init__(self, ddb_secrets: IDynamoDBSecrets, boto_profile: str | BotoProfile = None):
+        """
+        :param boto_profile: Use "bulk", or a BotoProfile with max_pool_connections of at least the thread count,
+            to share the table between threads
+        """
+        super().__init__(service_name='dynamodb', boto_profile=boto_profile)
         self._ddb_secrets = ddb_secrets
+        self._lock = threading.Lock()
+        self._table_name = None
+        self._generation = 0  # Bumped by invalidate(), so each thread drops its cached Table
+        self._client = None
 
     @property
-    def client(self):
-        return self.table.meta.client
+    def client(self) -> 'BaseClient':
+        """
+        Low-level client shared by all threads, for hot paths that pass typed attribute values directly
+        """
+        if (client := self._client) is None:
+            client = self._client = self.CLIENT_REGISTRY.get_client(
+                session=self._get_boto3_session(),
+                service_name='dynamodb',
+                config=self._get_config(self._boto_profile),
+            )
+        return client
 
     @property
     def table(self):
-        return self.boto_resource.Table(self.table_name)
+        local = self._local
+        if (table := getattr(local, 'table', None)) is None or local.generation != self._generation:
+            generation = self._generation
+            table = local.table = self.boto_resource.Table(self.table_name)
+            local.generation = generation
+        return table
 
     @property
-    def table_name(self):
-        return self._ddb_secrets.get_table_name()
+    def table_name(self) -> str:
+        if (table_name := self._table_name) is None:
+            with self._lock:
+                table_name = self._get_table_name()
+        return table_name
+
+    def invalidate(self):
+        with self._lock:
+            self._table_name = None
+            self._generation += 1
+
+    def get_item(self, key: dict, **kwargs) -> dict:
+        """
+        Calls GetItem on the low-level client, skipping the resource layer's type (de)serialization
+        :param key: Key in low-level form, e.g. {'PK': {'S': 'SESSION#1'}}
+        """
+        return self.client.get_item(TableName=self.table_name, Key=key, **kwargs)
+
+    def put_item(self, item: dict, **kwargs) -> dict:
+        """
+        :param item: Item in low-level form, e.g. {'PK': {'S': 'SESSION#1'}, 'Count': {'N': '1'}}
+        """
+        return self.client.put_item(TableName=self.table_name, Item=item, **kwargs)
+
+    def update_item(self, key: dict, **kwargs) -> dict:
+        return self.client.update_item(TableName=self.table_name, Key=key, **kwargs)
+
+    def query(self, **kwargs) -> dict:
+        return self.client.query(TableName=self.table_name, **kwargs)
+
+    def _get_table_name(self) -> str:
+        """
+        Must be called holding the lock
+        """
+        if self._table_name is None:
+            self._table_name = self._ddb_secrets.get_table_name()
+        return self._table_name
@@ -45,7 +45,7 @@ class QueryResponse:
 
 class UpdateItemResponse:
     def __init__(self, data: dict):
-        self.attributes = data['Attributes']
+        self.attributes = data.get('Attributes')
 
 
 class TransactionResponse:
@@ -0,0 +1,188 @@
+import threading
+import time
+import typing
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+
+from py_aws_core import exceptions, logs
+
+logger = logs.get_logger()
+
+
+class CircuitState(Enum):
+    # Calls pass through, outcomes are recorded
+    CLOSED = 'CLOSED'
+    # Calls fail immediately with CircuitOpenError
+    OPEN = 'OPEN'
+    # A limited number of probe calls pass through to test whether the target recovered
+    HALF_OPEN = 'HALF_OPEN'
+
+
+@dataclass(frozen=True)
+class BreakerPolicy:
+    """
+    :param failure_rate_threshold: Opens the circuit when this fraction of the recorded calls failed
+    :param minimum_calls: Calls recorded before the failure rate is evaluated
+    :param window_size: Number of most recent calls the failure rate is computed over
+    :param open_seconds: Time the circuit stays open before allowing probe calls
+    :param open_backoff: Multiplies open_seconds each time a probe fails, up to max_open_seconds
+    :param max_open_seconds: Upper bound on the time the circuit stays open
+    :param half_open_max_probes: Probe calls allowed in flight at once while half-open
+    :param half_open_success_threshold: Successful probes needed to close the circuit again
+    """
+    failure_rate_threshold: float = 0.5
+    minimum_calls: int = 10
+    window_size: int = 20
+    open_seconds: float = 15.0
+    open_backoff: float = 2.0
+    max_open_seconds: float = 300.0
+    half_open_max_probes: int = 1
+    half_open_success_threshold: int = 1
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for a single target, e.g. a host reached through a given proxy.
+    Pass the probe token returned by before_call to the record methods, so that calls admitted before the circuit
+    went half-open, or during an earlier half-open period, are not counted as probes.
+    Outcomes recorded while the circuit is open are ignored
+    """
+    def __init__(self, key: typing.Hashable, policy: BreakerPolicy = BreakerPolicy()):
+        self._key = key
+        self._policy = policy
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=policy.window_size)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._open_seconds = policy.open_seconds
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._generation = 0  # Incremented each time the circuit goes half-open
+        self._rejected = 0
+
+    @property
+    def key(self) -> typing.Hashable:
+        return self._key
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._get_state()
+
+    @property
+    def metrics(self) -> typing.Dict[str, typing.Any]:
+        with self._lock:
+            return {
+                'key': self._key,
+                'state': self._get_state().value,
+                'failure_rate': self._failure_rate(),
+                'calls': len(self._outcomes),
+                'rejected': self._rejected,
+            }
+
+    def before_call(self) -> int | None:
+        """
+        Raises CircuitOpenError if the call may not proceed, otherwise reserves a probe slot when half-open
+        :return: Probe token when the call was admitted as a probe, None when the circuit is closed
+        """
+        with self._lock:
+            state = self._get_state()
+            if state is CircuitState.CLOSED:
+                return None
+            if state is CircuitState.HALF_OPEN and self._probes_in_flight < self._policy.half_open_max_probes:
+                self._probes_in_flight += 1
+                return self._generation
+            self._rejected += 1
+            retry_in = max(0.0, self._opened_at + self._open_seconds - time.monotonic())
+        raise exceptions.CircuitOpenError(circuit=str(self._key), retry_in=f'{retry_in:.1f}s')
+
+    def record_success(self, probe: int = None):
+        with self._lock:
+            if self._state is CircuitState.OPEN:
+                return  # Admitted before the circuit opened
+            if self._state is CircuitState.HALF_OPEN:
+                if not self._is_current_probe(probe):
+                    return
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._probe_successes += 1
+                if self._probe_successes >= self._policy.half_open_success_threshold:
+                    self._close()
+            else:
+                self._outcomes.append(False)
+
+    def record_failure(self, probe: int = None):
+        with self._lock:
+            if self._state is CircuitState.OPEN:
+                return  # Admitted before the circuit opened, reopening would reset the backed off open time
+            if self._state is CircuitState.HALF_OPEN:
+                if not self._is_current_probe(probe):
+                    return
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._open(open_seconds=min(self._policy.max_open_seconds, self._open_seconds * self._policy.open_backoff))
+                return
+            self._outcomes.append(True)
+            if len(self._outcomes) >= self._policy.minimum_calls and self._failure_rate() >= self._policy.failure_rate_threshold:
+                self._open(open_seconds=self._policy.open_seconds)
+
+    def release(self, probe: int = None):
+        """
+        Frees a probe slot without recording an outcome, e.g. when the call was cancelled
+        """
+        with self._lock:
+            if self._state is CircuitState.HALF_OPEN and self._is_current_probe(probe):
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _is_current_probe(self, probe: int | None) -> bool:
+        return probe is not None and probe == self._generation
+
+    def _get_state(self) -> CircuitState:
+        if self._state is CircuitState.OPEN and time.monotonic() - self._opened_at >= self._open_seconds:
+            self._state = CircuitState.HALF_OPEN
+            self._generation += 1
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+            logger.info(f'Circuit half-open, allowing probes', circuit=self._key)
+        return self._state
+
+    def _failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def _open(self, open_seconds: float):
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._open_seconds = open_seconds
+        logger.warning(f'Circuit opened', circuit=self._key, open_seconds=open_seconds, failure_rate=self._failure_rate())
+
+    def _close(self):
+        self._state = CircuitState.CLOSED
+        self._outcomes.clear()
+        self._open_seconds = self._policy.open_seconds
+        logger.info(f'Circuit closed', circuit=self._key)
+
+
+class CircuitBreakerRegistry:
+    """
+    Process-wide circuit breakers, so every client calling the same target shares its state
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers: typing.Dict[typing.Hashable, CircuitBreaker] = dict()
+
+    def get(self, key: typing.Hashable, policy: BreakerPolicy) -> CircuitBreaker:
+        with self._lock:
+            if not (breaker := self._breakers.get(key)):
+                breaker = self._breakers[key] = CircuitBreaker(key=key, policy=policy)
+            return breaker
+
+    def clear(self):
+        with self._lock:
+            self._breakers.clear()
+
+    def __len__(self):
+        return len(self._breakers)
+
+
+CIRCUIT_BREAKERS = CircuitBreakerRegistry()
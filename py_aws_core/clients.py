@@ -1,42 +1,369 @@
-import base64
-import binascii
-import pickle
+import asyncio
+import contextvars
+import dataclasses
+import itertools
+import os
 import ssl
-from http.cookiejar import CookieJar
+import threading
+import time
+import typing
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from enum import Enum
+from functools import partial
+from http.cookiejar import Cookie, CookieJar
 
-from httpx import Client, HTTPStatusError, TimeoutException, NetworkError, ProxyError
+from httpx import AsyncBaseTransport, AsyncClient, BaseTransport, Client, ConnectError, ConnectTimeout, HTTPStatusError, \
+    Limits, PoolTimeout, Proxy, Request, RemoteProtocolError, Response, TimeoutException, TransportError, NetworkError, \
+    ProxyError, URL
 
-from py_aws_core import decorators, exceptions, logs, utils
-from py_aws_core.session_interface import ISession
+from py_aws_core import deadlines, decorators, dynamodb_entities, exceptions, logs, utils
+from py_aws_core.circuit_breakers import CIRCUIT_BREAKERS, BreakerPolicy, CircuitBreaker
+from py_aws_core.coalescing import RequestCoalescer
+from py_aws_core.cookie_codecs import CompactCookieCodec, ICookieCodec, PickleCookieCodec
+from py_aws_core.session_interface import IAsyncSession, ISession
+from py_aws_core.db_interface import IAsyncDatabase
 from py_aws_core.db_service import DBService
+from py_aws_core.downloads import RangeDownload, open_sink
+from py_aws_core.hedging import Hedger, HedgePolicy
+from py_aws_core.http_cache import HttpCache
+from py_aws_core.retry_policies import Jitter, KeyedRetryBudget, RetryPolicy, StatusRule
+from py_aws_core.timings import REQUEST_TIMINGS, RequestTimer, TimingRegistry, copy_untimed
+from py_aws_core.transports import SharedPoolTransport, get_proxy_key
 
 logger = logs.get_logger()
 # Using same ssl context for all clients to save on loading SSL bundles
 # See https://github.com/python/cpython/issues/95031#issuecomment-1749489998
 # Also results in _tests running about 9 times faster
-SSL_CONTEXT = ssl.create_default_context()
+# Created on first use rather than at import, loading the bundle is slow on a cold start
+_ssl_context = None
 
 
-class RetryClient(Client):
+def get_ssl_context() -> ssl.SSLContext:
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context()
+    return _ssl_context
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name == 'SSL_CONTEXT':
+        return get_ssl_context()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+# Alternate client of the hedge request being sent in the current context, whose transport it is sent through
+_hedge_client: contextvars.ContextVar[Client | AsyncClient | None] = contextvars.ContextVar('hedge_client', default=None)
+
+RETRY_EXCEPTIONS = (
+    HTTPStatusError,
+    TimeoutException,
+    NetworkError,
+    ProxyError
+)
+
+RETRY_STATUS_CODES = (
+    408,
+    425,
+    429,
+    500,
+    502,
+    503,
+    504,
+)
+
+# Raised before the request reaches the server, so safe to retry for non-idempotent methods too
+PRE_SEND_EXCEPTIONS = (
+    ConnectError,
+    ConnectTimeout,
+    PoolTimeout,
+    ProxyError,
+)
+
+# Downloads also resume after the body is cut short
+DOWNLOAD_RETRY_EXCEPTIONS = (
+    RemoteProtocolError,
+    exceptions.DownloadIncompleteError,
+)
+
+RETRY_POLICY = RetryPolicy(
+    retry_exceptions=RETRY_EXCEPTIONS,
+    always_retry_exceptions=PRE_SEND_EXCEPTIONS,
+    jitter=Jitter.FULL,
+    status_rules={
+        429: StatusRule(min_delay=1.0),
+        503: StatusRule(min_delay=1.0),
+    },
+    # Per host, so one degraded upstream cannot use up the retries of every other host
+    budget=KeyedRetryBudget(name='host'),
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class PoolProfile:
+    """
+    Connection pool sizing for a client.
+    With HTTP/2, a single connection multiplexes many requests per host,
+    so far fewer connections are needed for the same concurrency
+    """
+    max_connections: int | None = 100
+    max_keepalive_connections: int | None = 20
+    keepalive_expiry: float | None = 5.0
+
+    @property
+    def limits(self) -> Limits:
+        return Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+POOL_PROFILES = {
+    # httpx defaults
+    'default': PoolProfile(),
+    # Many concurrent requests to a handful of hosts, kept warm between bursts
+    'high_concurrency': PoolProfile(max_connections=200, max_keepalive_connections=100, keepalive_expiry=30.0),
+    # Short-lived clients, e.g. one per session, that should not hold idle sockets open
+    'low_footprint': PoolProfile(max_connections=10, max_keepalive_connections=2, keepalive_expiry=2.0),
+}
+
+
+@decorators.http_status_check(reraise_status_codes=RETRY_STATUS_CODES)
+def check_response_status(response: Response) -> Response:
+    return response.raise_for_status()
+
+
+def get_pool_profile(pool_profile: str | PoolProfile) -> PoolProfile:
+    if isinstance(pool_profile, PoolProfile):
+        return pool_profile
+    try:
+        return POOL_PROFILES[pool_profile]
+    except KeyError:
+        raise ValueError(f'Unknown pool profile "{pool_profile}", expected one of {list(POOL_PROFILES)}')
+
+
+@dataclasses.dataclass
+class FetchResult:
+    """
+    Outcome of one request sent by fetch_many
+    :param index: Position of the request in the input iterable
+    """
+    index: int
+    request: Request
+    response: Response | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def get_breaker_proxy_key(proxy_key: str | None) -> str:
+    """
+    Proxy URL without its password, since breaker keys are logged
+    """
+    if not proxy_key:
+        return ''
+    proxy_url = URL(proxy_key)
+    # Username kept, since rotating proxies often select the exit node by username
+    return str(proxy_url.copy_with(userinfo=proxy_url.userinfo.partition(b':')[0]))
+
+
+class CircuitBreakerMixin:
+    """
+    Fails requests immediately while the target host, reached through the client's proxy, is known to be down.
+    Breakers are shared by every client via CIRCUIT_BREAKERS
+    """
+    BREAKER_POLICY = BreakerPolicy()
+
+    _breaker_policy: BreakerPolicy | None = None
+    _transport_proxy_keys: typing.Dict[BaseTransport | AsyncBaseTransport, str]
+
+    def _init_circuit_breaker(self, circuit_breaker: bool, breaker_policy: BreakerPolicy | None):
+        self._breaker_policy = (breaker_policy or self.BREAKER_POLICY) if circuit_breaker else None
+
+    def _get_circuit_breaker(self, request: Request) -> CircuitBreaker | None:
+        if not self._breaker_policy:
+            return None
+        url = request.url
+        client = self
+        if (hedge_client := _hedge_client.get()) is not None and hedge_client is not self:
+            if not isinstance(hedge_client, CircuitBreakerMixin):
+                return None  # Proxy of the alternate client is unknown, so is the target it reaches
+            client = hedge_client
+        proxy_key = get_breaker_proxy_key(client._get_proxy_key_for_url(url))
+        return CIRCUIT_BREAKERS.get(key=(url.scheme, url.host, url.port, proxy_key), policy=self._breaker_policy)
+
+    def _get_proxy_key_for_url(self, url: URL) -> str | None:
+        """
+        :return: Proxy the request to url is sent through, including proxies set by mounts or found in the environment
+        """
+        return self._transport_proxy_keys.get(self._transport_for_url(url))
+
+    def _transport_for_url(self, url: URL) -> BaseTransport:
+        if (hedge_client := _hedge_client.get()) is not None and hedge_client is not self:
+            return hedge_client._transport_for_url(url)
+        return super()._transport_for_url(url)
+
+    @staticmethod
+    def _record_circuit_outcome(
+        breaker: CircuitBreaker,
+        probe: int | None,
+        response: Response = None,
+        exc: BaseException = None
+    ):
+        if isinstance(exc, HTTPStatusError):
+            response = exc.response
+        if exc is not None and not isinstance(exc, Exception):  # Cancelled, not an outcome of the target
+            breaker.release(probe)
+        elif isinstance(exc, TransportError):
+            breaker.record_failure(probe)
+        elif response is not None and response.status_code >= 500:
+            breaker.record_failure(probe)
+        else:
+            breaker.record_success(probe)
+
+
+class SessionCookiesMixin:
     """
-    Http/2 Client that retries for given exceptions and http status codes
+    Cookie persistence shared by sync and async clients.
+    Expects to be mixed into an httpx client, which provides the "cookies" attribute
     """
-    RETRY_EXCEPTIONS = (
-        HTTPStatusError,
-        TimeoutException,
-        NetworkError,
-        ProxyError
-    )
+    COOKIE_CODEC: ICookieCodec = CompactCookieCodec()
 
-    RETRY_STATUS_CODES = (
-        408,
-        425,
-        429,
-        500,
-        502,
-        503,
-        504,
-    )
+    _session_id: str
+    _cookie_codec: ICookieCodec
+
+    @property
+    def session_id(self) -> str:
+        return self._session_id
+
+    @property
+    def encoded_cookies(self) -> bytes:
+        return self._cookie_codec.encode(self.cookies.jar)
+
+    @property
+    def cookies_fingerprint(self) -> int:
+        """
+        Order independent fingerprint of the cookie jar, used to detect whether cookies changed
+        """
+        return hash(frozenset(
+            (c.domain, c.path, c.name, c.value, c.expires, c.secure, c.discard) for c in self.cookies.jar
+        ))
+
+    @property
+    def b64_encoded_cookies(self) -> bytes:
+        """
+        Legacy pickle format, kept for consumers that still read it.
+        Sessions are persisted with "encoded_cookies"
+        """
+        return PickleCookieCodec().encode(self.cookies.jar)
+
+    @staticmethod
+    def cookie_key(cookie: Cookie) -> str:
+        return f'{cookie.domain}|{cookie.path}|{cookie.name}'
+
+    @property
+    def encoded_cookie_map(self) -> typing.Dict[str, bytes]:
+        """
+        Each unexpired cookie encoded on its own, keyed by "cookie_key"
+        """
+        now = time.time()
+        return {self.cookie_key(c): self._cookie_codec.encode([c]) for c in self.cookies.jar if not c.is_expired(now)}
+
+    def decode_and_set_cookies(self, cookies_bytes: bytes):
+        if not cookies_bytes:
+            logger.info(f'No Cookies To Restore', session_id=self.session_id, cookies_bytes=cookies_bytes)
+            self.cookies.jar = CookieJar()
+            return
+        self._set_decoded_cookies([cookies_bytes])
+
+    def decode_and_set_cookie_map(self, cookie_map: typing.Dict[str, bytes]):
+        self._set_decoded_cookies(cookie_map.values())
+
+    def _set_decoded_cookies(self, encoded: typing.Iterable[bytes]):
+        try:
+            cookie_jar = CookieJar()
+            for cookies_bytes in encoded:
+                for c in self._cookie_codec.decode(cookies_bytes):
+                    logger.info(f'Setting CookieJar Cookie: {getattr(c, 'name')}', session_id=self.session_id)
+                    cookie_jar.set_cookie(c)
+            self.cookies.jar = cookie_jar
+            logger.info(f'Rehydrated {len(self.cookies.jar)} cookies', session_id=self.session_id)
+        except exceptions.CookieDecodingError as e:
+            raise exceptions.CookieDecodingError(*e.args, session_id=self.session_id, **e.kwargs)
+
+    def b64_decode_and_set_cookies(self, b64_cookies: bytes):
+        """
+        Codecs fall back to the legacy pickle format, so this is now an alias of "decode_and_set_cookies"
+        """
+        self.decode_and_set_cookies(cookies_bytes=b64_cookies)
+
+
+class CookiePersistMode(Enum):
+    # Whole cookie jar in the Base64Cookies binary attribute
+    BLOB = 'BLOB'
+    # One CookieMap entry per cookie, only changed entries are written
+    DELTA = 'DELTA'
+
+
+class SessionStateMixin:
+    """
+    Tracks what was read from the session item, so exits only write what changed.
+    Shared by sync and async session persist clients
+    """
+    _persist_mode: CookiePersistMode
+    _read_fingerprint: int | None
+    _read_cookie_map: typing.Dict[str, bytes]
+
+    @property
+    def is_session_dirty(self) -> bool:
+        return self._read_fingerprint != self.cookies_fingerprint
+
+    def _restore_session(self, session: dynamodb_entities.Session):
+        self._read_cookie_map = dict()
+        if self._persist_mode is CookiePersistMode.DELTA and (cookie_map := session.cookie_map_bytes):
+            self.decode_and_set_cookie_map(cookie_map)
+            self._read_cookie_map = cookie_map
+        else:
+            # Delta sessions without map entries may still hold a legacy blob, which the first delta write migrates
+            self.decode_and_set_cookies(cookies_bytes=session.b64_cookies_bytes)
+        self._read_fingerprint = self.cookies_fingerprint
+
+    def _set_session_cookie_header(self, request: Request):
+        """
+        Rebuilds the Cookie header of a request built before the session cookies were restored.
+        Cookies already in the header, set on the client or passed with the request, override restored ones
+        """
+        header_cookies = self._parse_cookie_header(request.headers.pop('Cookie', ''))
+        self.cookies.set_cookie_header(request)
+        if header_cookies:
+            cookies = self._parse_cookie_header(request.headers.get('Cookie', '')) | header_cookies
+            request.headers['Cookie'] = '; '.join(f'{k}={v}' for k, v in cookies.items())
+
+    @staticmethod
+    def _parse_cookie_header(header: str) -> typing.Dict[str, str]:
+        return dict(c.strip().partition('=')[::2] for c in header.split(';') if c.strip())
+
+    def _get_cookie_delta(self) -> typing.Tuple[typing.Dict[str, bytes], typing.Dict[str, bytes], typing.List[str]]:
+        """
+        :return: Current cookie map, entries to set and keys to remove
+        """
+        cookie_map = self.encoded_cookie_map
+        set_cookies = {k: v for k, v in cookie_map.items() if self._read_cookie_map.get(k) != v}
+        remove_keys = [k for k in self._read_cookie_map if k not in cookie_map]
+        return cookie_map, set_cookies, remove_keys
+
+
+class RetryClient(CircuitBreakerMixin, SessionCookiesMixin, Client):
+    """
+    Http Client that retries for given exceptions and http status codes
+    HTTP/2 is opt-in via the "http2" parameter
+    """
+    RETRY_EXCEPTIONS = RETRY_EXCEPTIONS
+    RETRY_STATUS_CODES = RETRY_STATUS_CODES
+    RETRY_POLICY = RETRY_POLICY
+    TIMING_REGISTRY = REQUEST_TIMINGS
 
     def __init__(
         self,
@@ -44,70 +371,656 @@ class RetryClient(Client):
         follow_redirects: bool = True,
         verify: bool = None,
         timeout=10.0,
+        http2: bool = False,
+        pool_profile: str | PoolProfile = 'default',
+        shared_pool: bool = False,
+        cookie_codec: ICookieCodec = None,
+        retry_policy: RetryPolicy = None,
+        circuit_breaker: bool = False,
+        breaker_policy: BreakerPolicy = None,
+        hedge_policy: HedgePolicy = None,
+        timing_registry: TimingRegistry = None,
+        cache: HttpCache = None,
+        coalescer: RequestCoalescer = None,
         *args,
         **kwargs
     ):
+        """
+        :param http2: Negotiates HTTP/2 via ALPN, multiplexing requests to the same host over one connection
+        :param pool_profile: Name of a POOL_PROFILES entry or a PoolProfile. Ignored if "limits" is given
+        :param shared_pool: Borrows warm connections from the process-wide TransportRegistry,
+            keyed by proxy URL and target origin, instead of opening a private pool
+        :param cookie_codec: Codec used to persist the cookie jar. Defaults to COOKIE_CODEC
+        :param retry_policy: Decides which failed requests are retried and when. Defaults to RETRY_POLICY
+        :param circuit_breaker: Opts in to failing requests with CircuitOpenError while the host and proxy pair is failing
+        :param breaker_policy: Thresholds and probe policy of the circuit breaker. Defaults to BREAKER_POLICY
+        :param hedge_policy: Opts in to hedging, which sends a duplicate of a slow idempotent request
+            and returns whichever response arrives first
+        :param timing_registry: Collects per host and per phase latency histograms. Defaults to TIMING_REGISTRY
+        :param cache: Opts in to caching GET responses per their "Cache-Control", "ETag" and "Last-Modified" headers.
+            Streamed requests bypass the cache
+        :param coalescer: Opts in to coalescing, where concurrent identical idempotent requests share one upstream call.
+            Share one coalescer between clients to coalesce their requests too. Streamed requests are never coalesced
+        """
+        logs.load_env()  # httpx reads proxy and certificate variables, which may come from .env
+        self._init_circuit_breaker(circuit_breaker, breaker_policy=breaker_policy)
+        kwargs.setdefault('limits', get_pool_profile(pool_profile).limits)
+        # Set before httpx builds the transports, so the proxy given or found in the environment uses the registry too
+        self._shared_pool = shared_pool
+        self._transport_proxy_keys: typing.Dict[BaseTransport, str] = dict()
         super().__init__(
             follow_redirects=follow_redirects,
             default_encoding="utf-8",
-            verify=verify or SSL_CONTEXT,
+            verify=verify or get_ssl_context(),
             timeout=timeout,
+            http2=http2,
             *args,
             **kwargs
         )
         self._session_id = session_id or utils.get_uuid_hex()
+        self._cookie_codec = cookie_codec or self.COOKIE_CODEC
+        self._retry_policy = retry_policy or self.RETRY_POLICY
+        self._download_policy = dataclasses.replace(
+            self._retry_policy,
+            retry_exceptions=self._retry_policy.retry_exceptions + DOWNLOAD_RETRY_EXCEPTIONS
+        )
+        self._hedger = Hedger(policy=hedge_policy) if hedge_policy else None
+        self._timing_registry = timing_registry or self.TIMING_REGISTRY
+        self._cache = cache
+        self._coalescer = coalescer
 
-    @decorators.retry(retry_exceptions=RETRY_EXCEPTIONS)
-    @decorators.http_status_check(reraise_status_codes=RETRY_STATUS_CODES)
-    def send(self, *args, **kwargs):
-        return super().send(*args, **kwargs)
+    def _init_transport(self, **kwargs) -> BaseTransport:
+        if self._shared_pool and kwargs.get('transport') is None and kwargs.get('app') is None:
+            return self._new_shared_pool_transport(proxy=None, **kwargs)
+        return super()._init_transport(**kwargs)
 
-    @property
-    def session_id(self) -> str:
-        return self._session_id
+    def _init_proxy_transport(self, proxy: Proxy, **kwargs) -> BaseTransport:
+        if self._shared_pool:
+            transport = self._new_shared_pool_transport(proxy=proxy, **kwargs)
+        else:
+            transport = super()._init_proxy_transport(proxy, **kwargs)
+        self._transport_proxy_keys[transport] = get_proxy_key(proxy)
+        return transport
 
-    @property
-    def b64_encoded_cookies(self) -> bytes:
-        return base64.encodebytes(pickle.dumps([c for c in self.cookies.jar]))
+    @staticmethod
+    def _new_shared_pool_transport(
+        proxy: Proxy | None,
+        verify,
+        cert,
+        http1: bool,
+        http2: bool,
+        limits: Limits,
+        trust_env: bool,
+        **kwargs
+    ) -> BaseTransport:
+        return SharedPoolTransport(
+            proxy=proxy,
+            verify=verify,
+            cert=cert,
+            http1=http1,
+            http2=http2,
+            limits=limits,
+            trust_env=trust_env
+        )
 
-    def b64_decode_and_set_cookies(self, b64_cookies: bytes):
-        if not b64_cookies:
-            logger.info(f'No Cookies To Restore', session_id=self.session_id, b64_cookies=b64_cookies)
-            self.cookies.jar = CookieJar()
-            return
+    def __exit__(self, *args, **kwargs):
+        if self._hedger:
+            self._hedger.close()
+        super().__exit__(*args, **kwargs)
+
+    def close(self):
+        if self._hedger:
+            self._hedger.close()
+        super().close()
+
+    def send(self, request: Request, *args, **kwargs):
+        if not self._cache or kwargs.get('stream') or not self._cache.is_cacheable_request(request):
+            return self._send_coalesced(request, *args, **kwargs)
+        entry, response = self._cache.prepare(request)
+        if response:
+            return response
+        return self._cache.complete(request, entry, self._send_coalesced(request, *args, **kwargs))
+
+    def _send_coalesced(self, request: Request, *args, **kwargs):
+        if not self._coalescer or kwargs.get('stream') or not self._coalescer.should_coalesce(request):
+            return self._send_uncached(request, *args, **kwargs)
+        response = self._coalescer.run(
+            request,
+            partial(self._send_uncached, request, *args, **kwargs),
+            proxy_key=self._get_proxy_key_for_url(request.url)
+        )
+        if response.extensions.get('coalesced'):
+            self.cookies.extract_cookies(response)
+        return response
+
+    def _send_uncached(self, request: Request, *args, **kwargs):
+        timer = RequestTimer(request)
         try:
-            cookie_jar = CookieJar()
-            decoded_bytes = base64.decodebytes(b64_cookies)
-            for c in pickle.loads(decoded_bytes):
-                logger.info(f'Setting CookieJar Cookie: {getattr(c, 'name')}', session_id=self.session_id)
-                cookie_jar.set_cookie(c)
-            self.cookies.jar = cookie_jar
-            logger.info(f'Rehydrated {len(self.cookies.jar)} cookies', session_id=self.session_id)
-        except (pickle.PickleError, binascii.Error) as e:
-            raise exceptions.CookieDecodingError(info=f'Cookie Error: {str(e)}', session_id=self.session_id)
+            with timer.install():
+                response = self._retry_policy.run(
+                    partial(self._timed_attempt, timer, request, *args, **kwargs),
+                    method=request.method,
+                    name=f'{type(self).__name__}.send',
+                    budget_key=request.url.host
+                )
+        except Exception as e:
+            timer.finish()
+            self._timing_registry.record(timer, error=e)
+            raise
+        timer.finish()
+        self._timing_registry.record(timer, status_code=response.status_code)
+        return response
+
+    def get_latency_stats(self, host: str = None) -> typing.Dict[str, typing.Any]:
+        """
+        :param host: Limits stats to one host
+        :return: Request counts and p50/p95/p99 latencies by host and phase, from the client's timing registry
+        """
+        return self._timing_registry.get_stats(host=host)
+
+    def _timed_attempt(self, timer: RequestTimer, request: Request, *args, **kwargs):
+        with timer.attempt():
+            return self._send_attempt(request, *args, **kwargs)
+
+    def download(
+        self,
+        url: str,
+        sink: typing.BinaryIO | str | os.PathLike,
+        headers: typing.Mapping[str, str] = None
+    ) -> int:
+        """
+        Streams url to sink as chunks arrive, so memory use does not grow with the download size
+        A retryable failure resumes from the last byte received with a "Range" request instead of starting over
+        :param sink: Path or binary file-like object. Must be seekable to recover from servers ignoring "Range"
+        :param headers: Extra request headers
+        :return: Number of bytes written
+        """
+        with open_sink(sink) as f:
+            download = RangeDownload(url=url, sink=f, headers=headers)
+            self._download_policy.run(
+                partial(self._download_attempt, download),
+                method='GET',
+                name=f'{type(self).__name__}.download',
+                budget_key=URL(url).host
+            )
+        return download.written
+
+    def _download_attempt(self, download: RangeDownload):
+        request = self.build_request('GET', download.url, headers=download.request_headers)
+        response = self._send_once(request, stream=True)
+        try:
+            if not download.is_complete(response):
+                check_response_status(response)
+                download.start(response)
+                for chunk in response.iter_raw():  # Unbuffered, so no received byte is lost when the body is cut short
+                    download.write(chunk)
+            download.finish()
+        finally:
+            response.close()
+
+    def fetch_many(
+        self,
+        requests: typing.Iterable[Request | str],
+        concurrency: int = 10,
+        ordered: bool = False
+    ) -> typing.Iterator[FetchResult]:
+        """
+        Sends requests on a pool of threads, each with the client's retry policy
+        A failed request is yielded with its error instead of aborting the batch
+        :param requests: Requests or urls to GET, consumed lazily so it may be a generator
+        :param concurrency: Maximum requests in flight at once
+        :param ordered: Yields results in input order instead of completion order
+        """
+        items = enumerate(requests)
+        max_window = concurrency * 2  # Keeps the pool busy while bounding buffered results
+        pending = dict()
+        buffered = dict()
+        next_index = 0
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='fetch')
+        try:
+            while True:
+                for index, request in itertools.islice(items, max_window - len(pending) - len(buffered)):
+                    request = self._build_fetch_request(request)
+                    # Copies the context so worker threads see the caller's deadline
+                    future = executor.submit(contextvars.copy_context().run, self._fetch_one, index, request)
+                    pending[future] = index
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    result = future.result()
+                    if not ordered:
+                        yield result
+                    else:
+                        buffered[result.index] = result
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+        finally:
+            # Queued requests are cancelled, requests in flight finish in the background instead of blocking the caller
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _build_fetch_request(self, request: Request | str) -> Request:
+        return request if isinstance(request, Request) else self.build_request('GET', request)
+
+    def _fetch_one(self, index: int, request: Request) -> FetchResult:
+        try:
+            return FetchResult(index=index, request=request, response=self.send(request))
+        except Exception as e:
+            logger.warning(f'Fetch failed', index=index, url=str(request.url), exception=str(e))
+            return FetchResult(index=index, request=request, error=e)
+
+    def _send_attempt(self, request: Request, *args, **kwargs):
+        if not self._hedger or kwargs.get('stream') or not self._hedger.should_hedge(request.method):
+            return self._send_once(request, *args, **kwargs)
+        return self._hedger.run(
+            send=partial(self._send_once, request, *args, **kwargs),
+            hedge=partial(self._send_hedge, request, *args, **kwargs),
+        )
+
+    def _send_hedge(self, request: Request, *args, **kwargs):
+        """
+        Sends the hedge request through the alternate client's transport, e.g. another proxy, but otherwise like the
+        primary request, so cookies set by a winning hedge response land in this client's cookie jar
+        """
+        token = _hedge_client.set(self._hedger.policy.alternate_client)
+        try:
+            return self._send_once(copy_untimed(request), *args, **kwargs)
+        finally:
+            _hedge_client.reset(token)
+
+    @decorators.http_status_check(reraise_status_codes=RETRY_STATUS_CODES)
+    def _send_once(self, request: Request, *args, **kwargs):
+        request.extensions['timeout'] = deadlines.fit_timeouts(request.extensions.get('timeout', dict()))
+        if not (breaker := self._get_circuit_breaker(request)):
+            response = super().send(request, *args, **kwargs)
+        else:
+            probe = breaker.before_call()
+            try:
+                response = super().send(request, *args, **kwargs)
+            except BaseException as e:
+                self._record_circuit_outcome(breaker, probe, exc=e)
+                raise
+            self._record_circuit_outcome(breaker, probe, response=response)
+        if response.status_code in self.RETRY_STATUS_CODES:
+            response.close()
+            response.raise_for_status()  # Retried by the retry policy, honouring "Retry-After"
+        return response
+
+
+class SessionPersistClient(SessionStateMixin, RetryClient, ISession):
+    """
+    Restores session cookies on enter and writes them back on exit.
+    The write is skipped when the cookie jar is unchanged since it was read.
 
+    With lazy=True the session is only read right before the first request is sent,
+    and neither read nor written if the client never sends a request.
 
-class SessionPersistClient(RetryClient, ISession):
-    def __init__(self, session_service: DBService, *args, **kwargs):
+    With persist_mode=CookiePersistMode.DELTA, cookies are stored per cookie and only changed entries are written
+    """
+    def __init__(
+        self,
+        session_service: DBService,
+        *args,
+        lazy: bool = False,
+        persist_mode: CookiePersistMode = CookiePersistMode.BLOB,
+        **kwargs
+    ):
         self._session_service = session_service
+        self._lazy = lazy
+        self._persist_mode = persist_mode
+        self._is_session_loaded = False
+        self._session_lock = threading.Lock()
+        self._read_fingerprint = None
+        self._read_cookie_map = dict()
         super().__init__(*args, **kwargs)
 
     def __enter__(self):
         super().__enter__()
-        self.read_session()
+        if not self._lazy:
+            self.read_session()
+            self._is_session_loaded = True
         return self
 
     def __exit__(self, *args, **kwargs):
-        self.write_session(session_id=self.session_id)
+        if not self._is_session_loaded:
+            logger.info(f'Session never loaded, skipping write', session_id=self.session_id)
+        elif self.is_session_dirty:
+            self.write_session(session_id=self.session_id)
+        else:
+            logger.info(f'Session cookies unchanged, skipping write', session_id=self.session_id)
         super().__exit__(*args, **kwargs)
 
+    def send(self, request: Request, *args, **kwargs):
+        if not self._is_session_loaded:
+            with self._session_lock:
+                if not self._is_session_loaded:
+                    self._hydrate_session(request)
+        return super().send(request, *args, **kwargs)
+
+    def _hydrate_session(self, request: Request):
+        set_cookies = list(self.cookies.jar)  # Cookies set before the session was read take precedence
+        self.read_session()
+        for c in set_cookies:
+            self.cookies.jar.set_cookie(c)
+        self._set_session_cookie_header(request)
+        self._is_session_loaded = True
+
     def read_session(self):
         session_id = self.session_id
         logger.info(f'Attempting to read session...', session_id=self.session_id)
         session = self._session_service.get_or_create_session(session_id=session_id)
         logger.info(f'Successfully read session.', session_id=self.session_id)
-        self.b64_decode_and_set_cookies(b64_cookies=session.b64_cookies_bytes)
+        self._restore_session(session)
 
     def write_session(self, session_id):
-        self._session_service.update_session_cookies(session_id=session_id, b64_cookies=self.b64_encoded_cookies)
+        if self._persist_mode is CookiePersistMode.DELTA:
+            cookie_map, set_cookies, remove_keys = self._get_cookie_delta()
+            self._session_service.update_session_cookie_delta(
+                session_id=session_id,
+                set_cookies=set_cookies,
+                remove_keys=remove_keys
+            )
+            self._read_cookie_map = cookie_map
+        else:
+            self._session_service.update_session_cookies(session_id=session_id, b64_cookies=self.encoded_cookies)
+        self._read_fingerprint = self.cookies_fingerprint
+        logger.info(f'Wrote session cookies to database', session_id=self.session_id)
+
+
+class AsyncRetryClient(CircuitBreakerMixin, SessionCookiesMixin, AsyncClient):
+    """
+    Async counterpart of RetryClient.
+    Backoff between retries awaits asyncio.sleep, so many clients can share one event loop
+    """
+    RETRY_EXCEPTIONS = RETRY_EXCEPTIONS
+    RETRY_STATUS_CODES = RETRY_STATUS_CODES
+    RETRY_POLICY = RETRY_POLICY
+    TIMING_REGISTRY = REQUEST_TIMINGS
+
+    def __init__(
+        self,
+        session_id: str = None,
+        follow_redirects: bool = True,
+        verify: bool = None,
+        timeout=10.0,
+        http2: bool = False,
+        pool_profile: str | PoolProfile = 'default',
+        cookie_codec: ICookieCodec = None,
+        retry_policy: RetryPolicy = None,
+        circuit_breaker: bool = False,
+        breaker_policy: BreakerPolicy = None,
+        hedge_policy: HedgePolicy = None,
+        timing_registry: TimingRegistry = None,
+        cache: HttpCache = None,
+        coalescer: RequestCoalescer = None,
+        *args,
+        **kwargs
+    ):
+        """
+        Same parameters as RetryClient, except shared_pool, since the TransportRegistry only holds sync transports
+        """
+        logs.load_env()  # httpx reads proxy and certificate variables, which may come from .env
+        self._init_circuit_breaker(circuit_breaker, breaker_policy=breaker_policy)
+        kwargs.setdefault('limits', get_pool_profile(pool_profile).limits)
+        self._transport_proxy_keys: typing.Dict[AsyncBaseTransport, str] = dict()
+        super().__init__(
+            follow_redirects=follow_redirects,
+            default_encoding="utf-8",
+            verify=verify or get_ssl_context(),
+            timeout=timeout,
+            http2=http2,
+            *args,
+            **kwargs
+        )
+        self._session_id = session_id or utils.get_uuid_hex()
+        self._cookie_codec = cookie_codec or self.COOKIE_CODEC
+        self._retry_policy = retry_policy or self.RETRY_POLICY
+        self._download_policy = dataclasses.replace(
+            self._retry_policy,
+            retry_exceptions=self._retry_policy.retry_exceptions + DOWNLOAD_RETRY_EXCEPTIONS
+        )
+        self._hedger = Hedger(policy=hedge_policy) if hedge_policy else None
+        self._timing_registry = timing_registry or self.TIMING_REGISTRY
+        self._cache = cache
+        self._coalescer = coalescer
+
+    def _init_proxy_transport(self, proxy: Proxy, **kwargs) -> AsyncBaseTransport:
+        transport = super()._init_proxy_transport(proxy, **kwargs)
+        self._transport_proxy_keys[transport] = get_proxy_key(proxy)
+        return transport
+
+    async def send(self, request: Request, *args, **kwargs):
+        if not self._cache or kwargs.get('stream') or not self._cache.is_cacheable_request(request):
+            return await self._send_coalesced(request, *args, **kwargs)
+        entry, response = self._cache.prepare(request)
+        if response:
+            return response
+        return self._cache.complete(request, entry, await self._send_coalesced(request, *args, **kwargs))
+
+    async def _send_coalesced(self, request: Request, *args, **kwargs):
+        if not self._coalescer or kwargs.get('stream') or not self._coalescer.should_coalesce(request):
+            return await self._send_uncached(request, *args, **kwargs)
+        response = await self._coalescer.async_run(
+            request,
+            partial(self._send_uncached, request, *args, **kwargs),
+            proxy_key=self._get_proxy_key_for_url(request.url)
+        )
+        if response.extensions.get('coalesced'):
+            self.cookies.extract_cookies(response)
+        return response
+
+    async def _send_uncached(self, request: Request, *args, **kwargs):
+        timer = RequestTimer(request)
+        try:
+            with timer.install(is_async=True):
+                response = await self._retry_policy.async_run(
+                    partial(self._timed_attempt, timer, request, *args, **kwargs),
+                    method=request.method,
+                    name=f'{type(self).__name__}.send',
+                    budget_key=request.url.host
+                )
+        except Exception as e:
+            timer.finish()
+            self._timing_registry.record(timer, error=e)
+            raise
+        timer.finish()
+        self._timing_registry.record(timer, status_code=response.status_code)
+        return response
+
+    def get_latency_stats(self, host: str = None) -> typing.Dict[str, typing.Any]:
+        """
+        :param host: Limits stats to one host
+        :return: Request counts and p50/p95/p99 latencies by host and phase, from the client's timing registry
+        """
+        return self._timing_registry.get_stats(host=host)
+
+    async def _timed_attempt(self, timer: RequestTimer, request: Request, *args, **kwargs):
+        with timer.attempt():
+            return await self._send_attempt(request, *args, **kwargs)
+
+    async def download(
+        self,
+        url: str,
+        sink: typing.BinaryIO | str | os.PathLike,
+        headers: typing.Mapping[str, str] = None
+    ) -> int:
+        """
+        Async counterpart of RetryClient.download. Chunks are written to sink synchronously
+        """
+        with open_sink(sink) as f:
+            download = RangeDownload(url=url, sink=f, headers=headers)
+            await self._download_policy.async_run(
+                partial(self._download_attempt, download),
+                method='GET',
+                name=f'{type(self).__name__}.download',
+                budget_key=URL(url).host
+            )
+        return download.written
+
+    async def _download_attempt(self, download: RangeDownload):
+        request = self.build_request('GET', download.url, headers=download.request_headers)
+        response = await self._send_once(request, stream=True)
+        try:
+            if not download.is_complete(response):
+                check_response_status(response)
+                download.start(response)
+                async for chunk in response.aiter_raw():
+                    download.write(chunk)
+            download.finish()
+        finally:
+            await response.aclose()
+
+    async def fetch_many(
+        self,
+        requests: typing.Iterable[Request | str],
+        concurrency: int = 10,
+        ordered: bool = False
+    ) -> typing.AsyncIterator[FetchResult]:
+        """
+        Async counterpart of RetryClient.fetch_many, running requests as tasks on the event loop
+        """
+        items = enumerate(requests)
+        pending = set()
+        buffered = dict()
+        next_index = 0
+        try:
+            while True:
+                free = min(concurrency - len(pending), concurrency * 2 - len(pending) - len(buffered))
+                for index, request in itertools.islice(items, free):
+                    request = self._build_fetch_request(request)
+                    pending.add(asyncio.ensure_future(self._fetch_one(index, request)))
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if not ordered:
+                        yield result
+                    else:
+                        buffered[result.index] = result
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def _build_fetch_request(self, request: Request | str) -> Request:
+        return request if isinstance(request, Request) else self.build_request('GET', request)
+
+    async def _fetch_one(self, index: int, request: Request) -> FetchResult:
+        try:
+            return FetchResult(index=index, request=request, response=await self.send(request))
+        except Exception as e:
+            logger.warning(f'Fetch failed', index=index, url=str(request.url), exception=str(e))
+            return FetchResult(index=index, request=request, error=e)
+
+    async def _send_attempt(self, request: Request, *args, **kwargs):
+        if not self._hedger or kwargs.get('stream') or not self._hedger.should_hedge(request.method):
+            return await self._send_once(request, *args, **kwargs)
+        return await self._hedger.async_run(
+            send=partial(self._send_once, request, *args, **kwargs),
+            hedge=partial(self._send_hedge, request, *args, **kwargs),
+        )
+
+    async def _send_hedge(self, request: Request, *args, **kwargs):
+        """
+        Same as RetryClient._send_hedge
+        """
+        token = _hedge_client.set(self._hedger.policy.alternate_client)
+        try:
+            return await self._send_once(copy_untimed(request), *args, **kwargs)
+        finally:
+            _hedge_client.reset(token)
+
+    @decorators.http_status_check(reraise_status_codes=RETRY_STATUS_CODES)
+    async def _send_once(self, request: Request, *args, **kwargs):
+        request.extensions['timeout'] = deadlines.fit_timeouts(request.extensions.get('timeout', dict()))
+        if not (breaker := self._get_circuit_breaker(request)):
+            response = await super().send(request, *args, **kwargs)
+        else:
+            probe = breaker.before_call()
+            try:
+                response = await super().send(request, *args, **kwargs)
+            except BaseException as e:
+                self._record_circuit_outcome(breaker, probe, exc=e)
+                raise
+            self._record_circuit_outcome(breaker, probe, response=response)
+        if response.status_code in self.RETRY_STATUS_CODES:
+            await response.aclose()
+            response.raise_for_status()
+        return response
+
+
+class AsyncSessionPersistClient(SessionStateMixin, AsyncRetryClient, IAsyncSession):
+    def __init__(
+        self,
+        session_service: IAsyncDatabase,
+        *args,
+        lazy: bool = False,
+        persist_mode: CookiePersistMode = CookiePersistMode.BLOB,
+        **kwargs
+    ):
+        self._session_service = session_service
+        self._lazy = lazy
+        self._persist_mode = persist_mode
+        self._is_session_loaded = False
+        self._session_lock = asyncio.Lock()
+        self._read_fingerprint = None
+        self._read_cookie_map = dict()
+        super().__init__(*args, **kwargs)
+
+    async def __aenter__(self):
+        await super().__aenter__()
+        if not self._lazy:
+            await self.read_session()
+            self._is_session_loaded = True
+        return self
+
+    async def __aexit__(self, *args, **kwargs):
+        if not self._is_session_loaded:
+            logger.info(f'Session never loaded, skipping write', session_id=self.session_id)
+        elif self.is_session_dirty:
+            await self.write_session(session_id=self.session_id)
+        else:
+            logger.info(f'Session cookies unchanged, skipping write', session_id=self.session_id)
+        await super().__aexit__(*args, **kwargs)
+
+    async def send(self, request: Request, *args, **kwargs):
+        if not self._is_session_loaded:
+            async with self._session_lock:
+                if not self._is_session_loaded:
+                    await self._hydrate_session(request)
+        return await super().send(request, *args, **kwargs)
+
+    async def _hydrate_session(self, request: Request):
+        set_cookies = list(self.cookies.jar)  # Cookies set before the session was read take precedence
+        await self.read_session()
+        for c in set_cookies:
+            self.cookies.jar.set_cookie(c)
+        self._set_session_cookie_header(request)
+        self._is_session_loaded = True
+
+    async def read_session(self):
+        session_id = self.session_id
+        logger.info(f'Attempting to read session...', session_id=self.session_id)
+        session = await self._session_service.get_or_create_session(session_id=session_id)
+        logger.info(f'Successfully read session.', session_id=self.session_id)
+        self._restore_session(session)
+
+    async def write_session(self, session_id):
+        if self._persist_mode is CookiePersistMode.DELTA:
+            cookie_map, set_cookies, remove_keys = self._get_cookie_delta()
+            await self._session_service.update_session_cookie_delta(
+                session_id=session_id,
+                set_cookies=set_cookies,
+                remove_keys=remove_keys
+            )
+            self._read_cookie_map = cookie_map
+        else:
+            await self._session_service.update_session_cookies(session_id=session_id, b64_cookies=self.encoded_cookies)
+        self._read_fingerprint = self.cookies_fingerprint
         logger.info(f'Wrote session cookies to database', session_id=self.session_id)
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import typing
+from functools import partial
+
+from httpx import Request, Response
+
+from py_aws_core import logs
+
+logger = logs.get_logger()
+
+KEY_HEADERS = (
+    'Accept',
+    'Accept-Encoding',
+    'Accept-Language',
+    'Authorization',
+    'Cookie',
+    'If-Modified-Since',
+    'If-None-Match',
+    'Range',
+)
+# Followers get the decoded body, so the encoding and length headers of the upstream response no longer apply
+DECODED_HEADERS = frozenset(['content-encoding', 'content-length'])
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: Response | None = None
+        self.error: BaseException | None = None
+        self.followers = 0
+
+
+class RequestCoalescer:
+    """
+    Singleflight for idempotent requests: concurrent requests with the same key share one upstream call.
+    The caller that sent the request gets its response, every follower gets a copy marked with the
+    "coalesced" response extension. Errors are raised to every caller.
+    One coalescer may be shared by many clients, requests from different sessions differ in their "Cookie" header,
+    and requests sent through different proxies in the proxy key the client passes
+    """
+    def __init__(self, methods: typing.Iterable[str] = ('GET', 'HEAD'), key_headers: typing.Iterable[str] = KEY_HEADERS):
+        """
+        :param methods: Methods that are coalesced. Only list idempotent methods
+        :param key_headers: Request headers that, with the method and URL, identify identical requests
+        """
+        self._methods = frozenset(m.upper() for m in methods)
+        self._key_headers = tuple(key_headers)
+        self._lock = threading.Lock()
+        self._calls: typing.Dict[typing.Hashable, _Call] = dict()
+        self._tasks: typing.Dict[typing.Hashable, asyncio.Task] = dict()
+        self._leaders = 0
+        self._coalesced = 0
+
+    @property
+    def metrics(self) -> typing.Dict[str, int]:
+        with self._lock:
+            return {
+                'upstream_calls': self._leaders,
+                'coalesced': self._coalesced,
+                'in_flight': len(self._calls) + len(self._tasks),
+            }
+
+    def should_coalesce(self, request: Request) -> bool:
+        return request.method in self._methods
+
+    def get_key(self, request: Request, proxy_key: str = None) -> typing.Hashable:
+        return (
+            request.method,
+            str(request.url),
+            proxy_key,
+            tuple(request.headers.get(name) for name in self._key_headers),
+        )
+
+    def run(self, request: Request, send: typing.Callable[[], Response], proxy_key: str = None) -> Response:
+        """
+        :param proxy_key: Proxy the request is sent through, only requests through the same proxy are coalesced
+        """
+        key = self.get_key(request, proxy_key=proxy_key)
+        with self._lock:
+            if call := self._calls.get(key):
+                call.followers += 1
+                self._coalesced += 1
+                is_leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._leaders += 1
+                is_leader = True
+
+        if not is_leader:
+            call.done.wait()
+            if call.error:
+                raise call.error
+            return self._share(call.response, request)
+
+        try:
+            call.response = send()
+            return call.response
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.followers:
+                logger.debug(f'Coalesced requests', url=str(request.url), followers=call.followers)
+
+    async def async_run(
+        self,
+        request: Request,
+        send: typing.Callable[[], typing.Awaitable[Response]],
+        proxy_key: str = None
+    ) -> Response:
+        """
+        The upstream call runs as its own task, so a cancelled caller does not cancel it for the other callers
+        :param proxy_key: Same as in run()
+        """
+        key = self.get_key(request, proxy_key=proxy_key)
+        with self._lock:
+            if task := self._tasks.get(key):
+                self._coalesced += 1
+                is_leader = False
+            else:
+                task = self._tasks[key] = asyncio.ensure_future(send())
+                task.add_done_callback(partial(self._discard_task, key))
+                self._leaders += 1
+                is_leader = True
+
+        response = await asyncio.shield(task)
+        return response if is_leader else self._share(response, request)
+
+    def _discard_task(self, key: typing.Hashable, task: asyncio.Task):
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # Marks the error as retrieved when every caller was cancelled
+
+    @staticmethod
+    def _share(response: Response, request: Request) -> Response:
+        return Response(
+            status_code=response.status_code,
+            headers=[(k, v) for k, v in response.headers.multi_items() if k.lower() not in DECODED_HEADERS],
+            content=response.content,
+            request=request,
+            extensions={
+                'http_version': response.extensions.get('http_version', b'HTTP/1.1'),
+                'reason_phrase': response.extensions.get('reason_phrase', b''),
+                'coalesced': True,
+            },
+        )
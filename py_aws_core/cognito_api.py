@@ -3,10 +3,11 @@ from abc import ABC
 from dataclasses import dataclass
 from enum import Enum
 
-from botocore.client import BaseClient
-
 from py_aws_core import decorators, exceptions, logs, mixins
 
+if typing.TYPE_CHECKING:
+    from botocore.client import BaseClient
+
 logger = logs.get_logger()
 
 
@@ -53,7 +54,7 @@ class AdminCreateUser:
     @decorators.boto3_handler(raise_as=exceptions.CognitoException)
     def call(
         cls,
-        cognito_client: BaseClient,
+        cognito_client: 'BaseClient',
         cognito_pool_id: str,
         username: str,
         user_attributes: typing.List[typing.Dict],
@@ -98,7 +99,7 @@ class UserPasswordAuth(ABCInitiateAuth):
     @decorators.boto3_handler(raise_as=exceptions.CognitoException)
     def call(
         cls,
-        cognito_client: BaseClient,
+        cognito_client: 'BaseClient',
         cognito_pool_client_id: str,
         username: str,
         password: str,
@@ -121,7 +122,7 @@ class RefreshTokenAuth(ABCInitiateAuth):
     @decorators.boto3_handler(raise_as=exceptions.CognitoException)
     def call(
         cls,
-        cognito_client: BaseClient,
+        cognito_client: 'BaseClient',
         cognito_pool_client_id: str,
         refresh_token: str,
     ):
@@ -161,7 +162,7 @@ class RespondToAuthChallenge(ABCInitiateAuth):
     @decorators.boto3_handler(raise_as=exceptions.CognitoException)
     def call(
         cls,
-        cognito_client: BaseClient,
+        cognito_client: 'BaseClient',
         cognito_pool_client_id: str,
         challenge_name: AuthChallenge,
         challenge_responses: ABCChallengeResponse,
@@ -0,0 +1,188 @@
+import base64
+import binascii
+import pickle
+import struct
+import time
+import typing
+import zlib
+from abc import ABC, abstractmethod
+from http.cookiejar import Cookie
+
+from py_aws_core import exceptions
+
+
+class ICookieCodec(ABC):
+    @abstractmethod
+    def encode(self, cookies: typing.Iterable[Cookie]) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, data: bytes) -> typing.List[Cookie]:
+        pass
+
+
+class PickleCookieCodec(ICookieCodec):
+    """
+    Legacy format: base64 encoded pickle of the full Cookie objects
+    """
+    def encode(self, cookies: typing.Iterable[Cookie]) -> bytes:
+        return base64.encodebytes(pickle.dumps([c for c in cookies]))
+
+    def decode(self, data: bytes) -> typing.List[Cookie]:
+        try:
+            return list(pickle.loads(base64.decodebytes(data)))
+        except (pickle.PickleError, binascii.Error, EOFError, ValueError, TypeError) as e:
+            raise exceptions.CookieDecodingError(info=f'Cookie Error: {str(e)}')
+
+
+class CompactCookieCodec(ICookieCodec):
+    """
+    Versioned, schema based binary format.
+
+    Layout: MAGIC | version | flags | payload, where payload is optionally zlib compressed.
+    The payload stores a fixed-width numeric record per cookie (attribute bit field, version, expiry),
+    followed by every string attribute joined by NUL. Attribute names and class paths are never stored,
+    and decoding is one struct.iter_unpack and one str.split instead of per-field parsing.
+
+    Blobs that do not start with MAGIC are decoded with the legacy PickleCookieCodec.
+    MAGIC bytes fall outside the base64 alphabet, so they can never start a legacy blob.
+    """
+    MAGIC = b'\xa7\xc0'
+    VERSION = 1
+    FLAG_ZLIB = 0x01
+
+    _HEADER = struct.Struct('<I')
+    _RECORD = struct.Struct('<HHq')
+    _SEP = '\x00'
+    _FIELDS_PER_COOKIE = 8
+
+    # Cookie attribute bit field
+    _SECURE = 1 << 0
+    _DISCARD = 1 << 1
+    _DOMAIN_SPECIFIED = 1 << 2
+    _DOMAIN_INITIAL_DOT = 1 << 3
+    _PATH_SPECIFIED = 1 << 4
+    _PORT_SPECIFIED = 1 << 5
+    _RFC2109 = 1 << 6
+    _HAS_EXPIRES = 1 << 7
+    _HAS_VALUE = 1 << 8
+    _HAS_PORT = 1 << 9
+    _HAS_COMMENT = 1 << 10
+    _HAS_COMMENT_URL = 1 << 11
+
+    def __init__(self, compress_threshold: int | None = 256, prune_expired: bool = True):
+        """
+        :param compress_threshold: Payloads of at least this many bytes are zlib compressed. None disables compression
+        :param prune_expired: Drops expired cookies before encoding
+        """
+        self._compress_threshold = compress_threshold
+        self._prune_expired = prune_expired
+        self._legacy_codec = PickleCookieCodec()
+
+    def encode(self, cookies: typing.Iterable[Cookie]) -> bytes:
+        now = time.time()
+        if self._prune_expired:
+            cookies = [c for c in cookies if not c.is_expired(now)]
+        else:
+            cookies = list(cookies)
+
+        records = bytearray(self._HEADER.pack(len(cookies)))
+        strings = []
+        for c in cookies:
+            records += self._RECORD.pack(self._get_bits(c), c.version or 0, int(c.expires or 0))
+            strings += (
+                c.name,
+                c.value or '',
+                c.domain,
+                c.path,
+                c.port or '',
+                c.comment or '',
+                c.comment_url or '',
+                ';'.join(k if v is None else f'{k}={v}' for k, v in c._rest.items()),
+            )
+        joined = self._SEP.join(strings)
+        if joined.count(self._SEP) != max(len(strings) - 1, 0):
+            raise exceptions.CookieEncodingError(info='Cookie attributes may not contain NUL characters')
+        payload = bytes(records) + joined.encode('utf-8')
+
+        flags = 0
+        if self._compress_threshold is not None and len(payload) >= self._compress_threshold:
+            compressed = zlib.compress(payload)
+            if len(compressed) < len(payload):
+                payload = compressed
+                flags |= self.FLAG_ZLIB
+        return self.MAGIC + bytes((self.VERSION, flags)) + payload
+
+    def decode(self, data: bytes) -> typing.List[Cookie]:
+        if not data.startswith(self.MAGIC):
+            return self._legacy_codec.decode(data)
+        try:
+            version, flags = data[len(self.MAGIC)], data[len(self.MAGIC) + 1]
+            if version != self.VERSION:
+                raise ValueError(f'Unsupported cookie codec version {version}')
+            payload = data[len(self.MAGIC) + 2:]
+            if flags & self.FLAG_ZLIB:
+                payload = zlib.decompress(payload)
+
+            (count,) = self._HEADER.unpack_from(payload)
+            strings_offset = self._HEADER.size + count * self._RECORD.size
+            records = self._RECORD.iter_unpack(payload[self._HEADER.size:strings_offset])
+            strings = payload[strings_offset:].decode('utf-8').split(self._SEP) if count else []
+            if len(strings) != count * self._FIELDS_PER_COOKIE:
+                raise ValueError('Cookie payload does not match cookie count')
+
+            n = self._FIELDS_PER_COOKIE
+            return [self._build_cookie(record, strings[i * n:(i + 1) * n]) for i, record in enumerate(records)]
+        except (IndexError, ValueError, UnicodeDecodeError, struct.error, zlib.error) as e:
+            raise exceptions.CookieDecodingError(info=f'Cookie Error: {str(e)}')
+
+    @classmethod
+    def _get_bits(cls, c: Cookie) -> int:
+        return (
+            cls._SECURE * bool(c.secure) |
+            cls._DISCARD * bool(c.discard) |
+            cls._DOMAIN_SPECIFIED * bool(c.domain_specified) |
+            cls._DOMAIN_INITIAL_DOT * bool(c.domain_initial_dot) |
+            cls._PATH_SPECIFIED * bool(c.path_specified) |
+            cls._PORT_SPECIFIED * bool(c.port_specified) |
+            cls._RFC2109 * bool(c.rfc2109) |
+            cls._HAS_EXPIRES * (c.expires is not None) |
+            cls._HAS_VALUE * (c.value is not None) |
+            cls._HAS_PORT * (c.port is not None) |
+            cls._HAS_COMMENT * (c.comment is not None) |
+            cls._HAS_COMMENT_URL * (c.comment_url is not None)
+        )
+
+    @classmethod
+    def _build_cookie(cls, record: tuple, fields: list[str]) -> Cookie:
+        """
+        Sets attributes directly, as unpickling does, since fields were normalised by Cookie.__init__ before encoding
+        """
+        bits, version, expires = record
+        name, value, domain, path, port, comment, comment_url, rest = fields
+        cookie = Cookie.__new__(Cookie)
+        cookie.__dict__.update(
+            version=version,
+            name=name,
+            value=value if bits & cls._HAS_VALUE else None,
+            port=port if bits & cls._HAS_PORT else None,
+            port_specified=bool(bits & cls._PORT_SPECIFIED),
+            domain=domain,
+            domain_specified=bool(bits & cls._DOMAIN_SPECIFIED),
+            domain_initial_dot=bool(bits & cls._DOMAIN_INITIAL_DOT),
+            path=path,
+            path_specified=bool(bits & cls._PATH_SPECIFIED),
+            secure=bool(bits & cls._SECURE),
+            expires=expires if bits & cls._HAS_EXPIRES else None,
+            discard=bool(bits & cls._DISCARD),
+            comment=comment if bits & cls._HAS_COMMENT else None,
+            comment_url=comment_url if bits & cls._HAS_COMMENT_URL else None,
+            rfc2109=bool(bits & cls._RFC2109),
+            _rest=dict(cls._parse_rest_attr(attr) for attr in rest.split(';')) if rest else dict(),
+        )
+        return cookie
+
+    @staticmethod
+    def _parse_rest_attr(attr: str) -> tuple[str, str | None]:
+        k, sep, v = attr.partition('=')
+        return k, v if sep else None
@@ -28,6 +28,7 @@ class GetOrCreateSession(DynamoDBAPI):
             cls.UpdateField(expression_attr='ma'),
             cls.UpdateField(expression_attr='ea', set_once=True),
             cls.UpdateField(expression_attr='ca', set_once=True),
+            cls.UpdateField(expression_attr='cm', set_once=True),
         ]
         response = table.update_item(
             Key={
@@ -41,6 +42,7 @@ class GetOrCreateSession(DynamoDBAPI):
                 '#ca': 'CreatedAt',
                 '#ma': 'ModifiedAt',
                 '#ea': 'ExpiresAt',
+                '#cm': 'CookieMap',
             },
             ExpressionAttributeValues={
                 ':ty': _type,
@@ -48,6 +50,7 @@ class GetOrCreateSession(DynamoDBAPI):
                 ':ca': created_at_datetime,
                 ':ma': created_at_datetime,
                 ':ea': expires_at,
+                ':cm': dict(),  # Must exist before per-cookie updates can set nested keys
             },
             ReturnValues='ALL_NEW'
         )
@@ -78,9 +81,10 @@ class GetSessionItem(DynamoDBAPI):
             ExpressionAttributeNames={
                 "#pk": "PK",
                 "#bc": "Base64Cookies",
+                "#cm": "CookieMap",
                 "#tp": "Type"
             },
-            ProjectionExpression='#pk, #bc, #tp'
+            ProjectionExpression='#pk, #bc, #cm, #tp'
         )
         logger.debug(f'GetSessionItem called', response=response)
         return cls.Response(response)
@@ -115,7 +119,9 @@ class PutSession(DynamoDBAPI):
 class UpdateSessionCookies(DynamoDBAPI):
     class Response(UpdateItemResponse):
         @property
-        def session(self) -> dynamodb_entities.Session:
+        def session(self) -> dynamodb_entities.Session | None:
+            if self.attributes is None:
+                return None
             return dynamodb_entities.Session(self.attributes)
 
     @classmethod
@@ -125,7 +131,8 @@ class UpdateSessionCookies(DynamoDBAPI):
         table,
         session_id: str,
         b64_cookies: bytes,
-        now_datetime: str
+        now_datetime: str,
+        return_values: str = 'NONE'
     ):
         pk = sk = dynamodb_entities.Session.create_key(_id=session_id)
         response = table.update_item(
@@ -133,16 +140,76 @@ class UpdateSessionCookies(DynamoDBAPI):
                 'PK': pk,
                 'SK': sk,
             },
-            UpdateExpression='SET #b64 = :b64, #mda = :mda',
+            # Emptying CookieMap keeps delta mode readers from restoring entries older than this blob
+            UpdateExpression='SET #b64 = :b64, #mda = :mda, #cm = :cm',
             ExpressionAttributeNames={
                 '#b64': 'Base64Cookies',
                 '#mda': 'ModifiedAt',
+                '#cm': 'CookieMap',
             },
             ExpressionAttributeValues={
                 ':b64': b64_cookies,
-                ':mda': now_datetime
+                ':mda': now_datetime,
+                ':cm': dict(),
             },
-            ReturnValues='ALL_NEW'
+            ReturnValues=return_values
         )
         logger.debug(f'UpdateSessionCookies called', response=response)
         return cls.Response(response)
+
+
+class UpdateSessionCookieDelta(DynamoDBAPI):
+    """
+    Sets or removes individual entries of the session CookieMap attribute,
+    so write size tracks the size of the change rather than the size of the cookie jar.
+    The legacy Base64Cookies blob is removed so it cannot be restored over newer map entries
+    """
+    class Response(UpdateItemResponse):
+        @property
+        def session(self) -> dynamodb_entities.Session | None:
+            if self.attributes is None:
+                return None
+            return dynamodb_entities.Session(self.attributes)
+
+    @classmethod
+    @decorators.dynamodb_handler(client_err_map=exceptions.ERR_CODE_MAP, cancellation_err_maps=[])
+    def call(
+        cls,
+        table,
+        session_id: str,
+        set_cookies: dict[str, bytes],
+        remove_keys: list[str],
+        now_datetime: str,
+        return_values: str = 'NONE'
+    ):
+        pk = sk = dynamodb_entities.Session.create_key(_id=session_id)
+        attr_names = {
+            '#cm': 'CookieMap',
+            '#b64': 'Base64Cookies',
+            '#mda': 'ModifiedAt',
+        }
+        attr_values = {
+            ':mda': now_datetime
+        }
+        set_exprs = ['#mda = :mda']
+        remove_exprs = ['#b64']
+        for i, (key, value) in enumerate(set_cookies.items()):
+            attr_names[f'#s{i}'] = key
+            attr_values[f':s{i}'] = value
+            set_exprs.append(f'#cm.#s{i} = :s{i}')
+        for i, key in enumerate(remove_keys):
+            attr_names[f'#r{i}'] = key
+            remove_exprs.append(f'#cm.#r{i}')
+
+        response = table.update_item(
+            Key={
+                'PK': pk,
+                'SK': sk,
+            },
+            UpdateExpression=f'SET {', '.join(set_exprs)} REMOVE {', '.join(remove_exprs)}',
+            ExpressionAttributeNames=attr_names,
+            ExpressionAttributeValues=attr_values,
+            ReturnValues=return_values
+        )
+        logger.debug(f'UpdateSessionCookieDelta called', response=response)
+        return cls.Response(response)
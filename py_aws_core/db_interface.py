@@ -21,5 +21,65 @@ class IDatabase(ABC):
 
     @classmethod
     @abstractmethod
-    def update_session_cookies(cls, session_id: str, b64_cookies: bytes) -> dynamodb_entities.Session:
+    def update_session_cookies(
+        cls,
+        session_id: str,
+        b64_cookies: bytes,
+        return_values: str = 'NONE'
+    ) -> dynamodb_entities.Session | None:
         pass
+
+    @classmethod
+    def update_session_cookie_delta(
+        cls,
+        session_id: str,
+        set_cookies: dict[str, bytes],
+        remove_keys: list[str],
+        return_values: str = 'NONE'
+    ) -> dynamodb_entities.Session | None:
+        """
+        Only needed for CookiePersistMode.DELTA, so not abstract
+        """
+        raise NotImplementedError(get_delta_not_supported_message(cls))
+
+
+class IAsyncDatabase(ABC):
+    @abstractmethod
+    async def get_or_create_session(self, session_id: str) -> dynamodb_entities.Session:
+        pass
+
+    @abstractmethod
+    async def get_session_item(self, session_id: str) -> dynamodb_entities.Session:
+        pass
+
+    @abstractmethod
+    async def put_session_item(self, session_id: str, b64_cookies: bytes):
+        pass
+
+    @abstractmethod
+    async def update_session_cookies(
+        self,
+        session_id: str,
+        b64_cookies: bytes,
+        return_values: str = 'NONE'
+    ) -> dynamodb_entities.Session | None:
+        pass
+
+    async def update_session_cookie_delta(
+        self,
+        session_id: str,
+        set_cookies: dict[str, bytes],
+        remove_keys: list[str],
+        return_values: str = 'NONE'
+    ) -> dynamodb_entities.Session | None:
+        """
+        Only needed for CookiePersistMode.DELTA, so not abstract
+        """
+        raise NotImplementedError(get_delta_not_supported_message(type(self)))
+
+
+def get_delta_not_supported_message(cls: type) -> str:
+    return (
+        f'{cls.__name__} does not implement update_session_cookie_delta, '
+        f'use CookiePersistMode.BLOB or implement it to persist cookies with CookiePersistMode.DELTA'
+    )
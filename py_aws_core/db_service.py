@@ -1,5 +1,5 @@
 from py_aws_core import const, db_api, dynamodb_entities, logs, utils
-from py_aws_core.db_interface import IDatabase
+from py_aws_core.db_interface import IAsyncDatabase, IDatabase
 from py_aws_core.dynamodb_api import DynamoDBAPI
 
 logger = logs.get_logger()
@@ -30,10 +30,85 @@ class DBService(IDatabase):
             b64_cookies=b64_cookies
         )
 
-    def update_session_cookies(self, session_id: str, b64_cookies: bytes) -> dynamodb_entities.Session:
+    def update_session_cookies(
+        self,
+        session_id: str,
+        b64_cookies: bytes,
+        return_values: str = 'NONE'
+    ) -> dynamodb_entities.Session | None:
+        """
+        Session is only returned when requested with return_values, e.g. "ALL_NEW"
+        """
         return db_api.UpdateSessionCookies.call(
             table=self._table,
             session_id=session_id,
             b64_cookies=b64_cookies,
-            now_datetime=utils.to_iso_8601()
+            now_datetime=utils.to_iso_8601(),
+            return_values=return_values
         ).session
+
+    def update_session_cookie_delta(
+        self,
+        session_id: str,
+        set_cookies: dict[str, bytes],
+        remove_keys: list[str],
+        return_values: str = 'NONE'
+    ) -> dynamodb_entities.Session | None:
+        return db_api.UpdateSessionCookieDelta.call(
+            table=self._table,
+            session_id=session_id,
+            set_cookies=set_cookies,
+            remove_keys=remove_keys,
+            now_datetime=utils.to_iso_8601(),
+            return_values=return_values
+        ).session
+
+
+class AsyncDBService(IAsyncDatabase):
+    """
+    Async facade over DBService.
+    boto3 calls are blocking, so each call is run in the default executor to keep the event loop free
+    """
+    def __init__(self, table):
+        self._db_service = DBService(table=table)
+
+    async def get_or_create_session(self, session_id: str) -> dynamodb_entities.Session:
+        return await utils.to_thread(self._db_service.get_or_create_session, session_id=session_id)
+
+    async def get_session_item(self, session_id: str) -> dynamodb_entities.Session:
+        return await utils.to_thread(self._db_service.get_session_item, session_id=session_id)
+
+    async def put_session_item(self, session_id: str, b64_cookies: bytes):
+        return await utils.to_thread(
+            self._db_service.put_session_item,
+            session_id=session_id,
+            b64_cookies=b64_cookies
+        )
+
+    async def update_session_cookies(
+        self,
+        session_id: str,
+        b64_cookies: bytes,
+        return_values: str = 'NONE'
+    ) -> dynamodb_entities.Session | None:
+        return await utils.to_thread(
+            self._db_service.update_session_cookies,
+            session_id=session_id,
+            b64_cookies=b64_cookies,
+            return_values=return_values
+        )
+
+    async def update_session_cookie_delta(
+        self,
+        session_id: str,
+        set_cookies: dict[str, bytes],
+        remove_keys: list[str],
+        return_values: str = 'NONE'
+    ) -> dynamodb_entities.Session | None:
+        return await utils.to_thread(
+            self._db_service.update_session_cookie_delta,
+            session_id=session_id,
+            set_cookies=set_cookies,
+            remove_keys=remove_keys,
+            return_values=return_values
+        )
@@ -0,0 +1,75 @@
+import time
+import typing
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from py_aws_core import exceptions, logs
+
+logger = logs.get_logger()
+
+# Seconds held back from the Lambda's remaining time to log and return an error response before the runtime kills it
+LAMBDA_SAFETY_MARGIN = 0.5
+
+_deadline: ContextVar[float | None] = ContextVar('deadline', default=None)  # time.monotonic() value
+
+
+def get_remaining() -> float | None:
+    """
+    :return: Seconds left until the bound deadline, None if no deadline is bound
+    """
+    if (deadline := _deadline.get()) is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check(name: str = None):
+    """
+    Raises DeadlineExceeded if the bound deadline has passed
+    """
+    if (deadline := _deadline.get()) is not None and (now := time.monotonic()) >= deadline:
+        raise exceptions.DeadlineExceeded(name=name, overrun=round(now - deadline, 3))
+
+
+@contextmanager
+def bind(seconds: float) -> typing.Iterator[None]:
+    """
+    Binds a deadline "seconds" from now to the current context, including asyncio tasks created inside it.
+    A deadline already bound further out is shortened, one bound sooner is kept
+    """
+    deadline = time.monotonic() + seconds
+    if (current := _deadline.get()) is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def bind_lambda_context(aws_context, margin: float = LAMBDA_SAFETY_MARGIN) -> typing.ContextManager[None]:
+    """
+    Binds the deadline of a Lambda invocation, less margin. A no-op for anything other than a Lambda context object
+    """
+    if not hasattr(aws_context, 'get_remaining_time_in_millis'):
+        return nullcontext()
+    return bind(aws_context.get_remaining_time_in_millis() / 1000 - margin)
+
+
+def find_lambda_context(args: typing.Sequence, kwargs: typing.Mapping) -> typing.Any:
+    """
+    :return: The Lambda context object passed to a handler, if any
+    """
+    for arg in (*args, *kwargs.values()):
+        if hasattr(arg, 'get_remaining_time_in_millis'):
+            return arg
+    return None
+
+
+def fit_timeouts(timeouts: typing.Mapping[str, float | None]) -> typing.Dict[str, float | None]:
+    """
+    Shrinks httpx request timeouts, e.g. {'connect': 5.0, 'read': None, ...}, so none outlasts the bound deadline
+    """
+    if (remaining := get_remaining()) is None:
+        return dict(timeouts)
+    remaining = max(remaining, 0.001)
+    return {k: remaining if v is None else min(v, remaining) for k, v in timeouts.items()}
@@ -1,51 +1,107 @@
+import inspect
+import logging
 import typing
-from functools import wraps
+from functools import partial, wraps
 from typing import Any, Type
 
-from botocore.exceptions import ClientError
-from httpx import codes, HTTPStatusError
-
-from py_aws_core import exceptions, logs, utils
+from py_aws_core import deadlines, exceptions, logs, utils
 from py_aws_core.boto_responses import ErrorResponse
+from py_aws_core.retry_policies import Jitter, RetryBudget, RetryPolicy
+
+if typing.TYPE_CHECKING:
+    from botocore.exceptions import ClientError
 
 logger = logs.get_logger()
 
 
+def is_client_error(e: Exception) -> bool:
+    """
+    Imports botocore only once an exception is raised, not when functions are decorated at import time
+    """
+    from botocore.exceptions import ClientError
+
+    return isinstance(e, ClientError)
+
+
 def boto3_handler(raise_as: Type[exceptions.CoreException]):
     def deco_func(func):
+        func_name = f'{func!r}'
+
+        def raise_for_client_error(e: 'ClientError'):
+            error = e.response['Error']
+            message = error['Message']
+            logger.error(f'Boto client error', code=error['Code'], message=message, response=e.response)
+            raise raise_as(message=message)
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper_func(*args, **kwargs):
+                try:
+                    response = await func(*args, **kwargs)
+                    if logs.is_enabled_for(logging.DEBUG):
+                        logger.debug(f'boto response', response=response, wrapped_func_name=func_name)
+                    return response
+                except Exception as e:
+                    if not is_client_error(e):
+                        raise
+                    raise_for_client_error(e)
+
+            return async_wrapper_func
+
         @wraps(func)
         def wrapper_func(*args, **kwargs):
             try:
                 response = func(*args, **kwargs)
-                logger.debug(f'boto response', response=response, wrapped_func_name=f'{func!r}')
+                if logs.is_enabled_for(logging.DEBUG):
+                    logger.debug(f'boto response', response=response, wrapped_func_name=func_name)
                 return response
-            except ClientError as e:
-                error = e.response['Error']
-                message = error['Message']
-                logger.error(f'Boto client error', code=error['Code'], message=message, response=e.response)
-                raise raise_as(message=message)
-            except Exception:  # Raise all other exceptions as is
-                raise
+            except Exception as e:
+                if not is_client_error(e):
+                    raise  # Raise all other exceptions as is
+                raise_for_client_error(e)
         return wrapper_func  # true decorator
     return deco_func
 
 
 def dynamodb_handler(client_err_map: dict[str, Any], cancellation_err_maps: list[dict[str, Any]]):
     def deco_func(func):
+        func_name = f'{func!r}'
+
+        def raise_for_client_error(e: 'ClientError'):
+            logger.error(f'dynamodb ClientError detected', e=e, response=e.response, wrapped_func_name=func_name)
+            e_response = ErrorResponse(e.response)
+            if e_response.CancellationReasons:
+                e_response.raise_for_cancellation_reasons(error_maps=cancellation_err_maps)
+            if exc := client_err_map.get(e_response.Error.Code):
+                raise exc(e)
+            raise e
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper_func(*args, **kwargs):
+                try:
+                    response = await func(*args, **kwargs)
+                    if logs.is_enabled_for(logging.DEBUG):
+                        logger.debug(f'response from dynamodb', response=response, wrapped_func_name=func_name)
+                    return response
+                except Exception as e:
+                    if not is_client_error(e):
+                        raise
+                    raise_for_client_error(e)
+
+            return async_wrapper_func
+
         @wraps(func)
         def wrapper_func(*args, **kwargs):
             try:
                 response = func(*args, **kwargs)
-                logger.debug(f'response from dynamodb', response=response, wrapped_func_name=f'{func!r}')
+                if logs.is_enabled_for(logging.DEBUG):
+                    logger.debug(f'response from dynamodb', response=response, wrapped_func_name=func_name)
                 return response
-            except ClientError as e:
-                logger.error(f'dynamodb ClientError detected', e=e, response=e.response, wrapped_func_name=f'{func!r}')
-                e_response = ErrorResponse(e.response)
-                if e_response.CancellationReasons:
-                    e_response.raise_for_cancellation_reasons(error_maps=cancellation_err_maps)
-                if exc := client_err_map.get(e_response.Error.Code):
-                    raise exc(e)
-                raise
+            except Exception as e:
+                if not is_client_error(e):
+                    raise
+                raise_for_client_error(e)
         return wrapper_func  # true decorator
     return deco_func
 
@@ -55,34 +111,54 @@ def lambda_response_handler(raise_as: Type[exceptions.CoreException]):
     Handler for any exceptions raised by wrapped function
     Any uncaught exceptions are wrapped and re-raised as the "raise_as" parameter
     Standard lambda response is returned
+    The invocation's deadline is bound from the Lambda context, so retries and http clients stop in time
+    to return a DeadlineExceeded response instead of being killed by the runtime
     :param raise_as:
     :return:
     """
     def deco_func(func):
-        @wraps(func)
-        def wrapper_func(*args, **kwargs):
-            try:
-                return func(*args, **kwargs)
-            except raise_as as e:
+        def build_error_response(e: Exception):
+            if isinstance(e, (raise_as, exceptions.DeadlineExceeded)):
                 exc = e
                 logger.exception('Pass-Through exception detected')
-            except Exception as e:
+            else:
                 exc = raise_as(exc=e)
                 logger.exception('Fall-Through exception detected')  # Note:  # the logging.exception method just inside the except part
             return utils.build_lambda_response(
                 status_code=exc.HTTP_STATUS_CODE,
                 exc=exc
             )
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper_func(*args, **kwargs):
+                try:
+                    with deadlines.bind_lambda_context(deadlines.find_lambda_context(args, kwargs)):
+                        return await func(*args, **kwargs)
+                except Exception as e:
+                    return build_error_response(e)
+
+            return async_wrapper_func
+
+        @wraps(func)
+        def wrapper_func(*args, **kwargs):
+            try:
+                with deadlines.bind_lambda_context(deadlines.find_lambda_context(args, kwargs)):
+                    return func(*args, **kwargs)
+            except Exception as e:
+                return build_error_response(e)
         return wrapper_func  # true decorator
     return deco_func
 
 
 def retry(
-    retry_exceptions: typing.Tuple,
+    retry_exceptions: typing.Tuple = tuple(),
     tries: int = 4,
     delay: float = 1.5,
     backoff: float = 2.0,
-    jitter: float = 0.1
+    jitter: float = 0.1,
+    budget: RetryBudget = None,
+    policy: RetryPolicy = None
 ):
     """
     Retry calling the decorated function using an exponential backoff.
@@ -93,32 +169,35 @@ def retry(
         :param delay: Initial delay between retries in seconds.
         :param backoff: Backoff multiplier (e.g. value of 2.0 will double the delay each retry).
         :param jitter: adds a standard deviation to delay
+        :param budget: Shared RetryBudget, e.g. RetryBudget.get('my-upstream'). Retries stop once it runs out
+        :param policy: RetryPolicy to use instead of the above parameters
     """
+    if policy is None:
+        policy = RetryPolicy(
+            retry_exceptions=retry_exceptions,
+            tries=tries,
+            delay=delay,
+            backoff=backoff,
+            max_delay=float('inf'),
+            jitter=Jitter.UNIFORM,
+            jitter_amount=jitter,
+            idempotent_only=False,
+            budget=budget,
+        )
+
     def deco_func(func):
+        func_name = f'{func!r}'
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper_func(*args, **kwargs):
+                return await policy.async_run(partial(func, *args, **kwargs), name=func_name)
+
+            return async_wrapper_func
 
         @wraps(func)
         def wrapper_func(*args, **kwargs):
-            m_tries = 1
-            m_delay = delay
-            while m_tries < tries:
-                try:
-                    return func(*args, **kwargs)
-                except retry_exceptions as e:
-                    j_delay = utils.generate_jitter(midpoint=m_delay, floor=0, std_deviation=jitter)
-                    logger.info(
-                        f'Retrying in {j_delay:.3f} seconds...',
-                        num_tries=m_tries,
-                        max_tries=tries,
-                        exception=str(e),
-                        exception_type=type(e),
-                        wrapped_func_name=f'{func!r}'
-                    )
-                    utils.sleep(j_delay)
-                    m_tries += 1
-                    m_delay *= backoff
-
-            logger.warning(f'Max tries reached', num_tries=m_tries, max_tries=tries, wrapped_func_name=f'{func!r}')
-            return func(*args, **kwargs)
+            return policy.run(partial(func, *args, **kwargs), name=func_name)
 
         return wrapper_func  # true decorator
 
@@ -127,17 +206,32 @@ def retry(
 
 def http_status_check(reraise_status_codes: typing.Tuple[int, ...] = tuple()):
     def deco_func(func):
+        from httpx import HTTPStatusError, codes  # Deferred so importing decorators does not load httpx
+
+        def raise_for_status_error(e: HTTPStatusError, **kwargs):
+            status_code = e.response.status_code
+            if status_code in reraise_status_codes:     # Retryable status codes
+                raise e
+            if status_code == codes.UNAUTHORIZED:
+                raise exceptions.NotAuthorizedException(**kwargs, **e.__dict__)
+            raise exceptions.APIException(**kwargs, **e.__dict__)
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper_func(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                except HTTPStatusError as e:
+                    raise_for_status_error(e, **kwargs)
+
+            return async_wrapper_func
+
         @wraps(func)
         def wrapper_func(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
             except HTTPStatusError as e:
-                status_code = e.response.status_code
-                if status_code in reraise_status_codes:     # Retryable status codes
-                    raise
-                if status_code == codes.UNAUTHORIZED:
-                    raise exceptions.NotAuthorizedException(**kwargs, **e.__dict__)
-                raise exceptions.APIException(**kwargs, **e.__dict__)
+                raise_for_status_error(e, **kwargs)
 
         return wrapper_func
 
@@ -147,6 +241,17 @@ def http_status_check(reraise_status_codes: typing.Tuple[int, ...] = tuple()):
 def wrap_exceptions(raise_as: Type[exceptions.CoreException]):
 
     def deco_func(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper_func(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                except raise_as:
+                    raise
+                except Exception as e:
+                    raise raise_as(**kwargs, **e.__dict__)
+
+            return async_wrapper_func
 
         @wraps(func)
         def wrapper_func(*args, **kwargs):
@@ -0,0 +1,108 @@
+import os
+import re
+import typing
+from contextlib import nullcontext
+
+from httpx import Response, codes
+
+from py_aws_core import exceptions, logs
+
+logger = logs.get_logger()
+
+CONTENT_RANGE_PATTERN = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+
+
+class RangeDownload:
+    """
+    Progress of a download that resumes with a "Range" header after each failed attempt.
+    Raw bytes are requested with "Accept-Encoding: identity", so byte offsets match the bytes written to the sink
+    """
+    def __init__(self, url: str, sink: typing.BinaryIO, headers: typing.Mapping[str, str] = None):
+        self._url = url
+        self._sink = sink
+        self._headers = dict(headers or dict())
+        self._headers.setdefault('Accept-Encoding', 'identity')
+        self._written = 0
+        self._total = None
+        self._validator = None
+
+    @property
+    def url(self) -> str:
+        return self._url
+
+    @property
+    def written(self) -> int:
+        return self._written
+
+    @property
+    def total(self) -> int | None:
+        return self._total
+
+    @property
+    def request_headers(self) -> typing.Dict[str, str]:
+        headers = dict(self._headers)
+        if self._written:
+            headers['Range'] = f'bytes={self._written}-'
+            if self._validator:  # Server sends the full, new body instead if the resource changed
+                headers['If-Range'] = self._validator
+        return headers
+
+    def is_complete(self, response: Response) -> bool:
+        """
+        True if the previous attempt received every byte but failed before it could finish
+        """
+        return (
+            response.status_code == codes.REQUESTED_RANGE_NOT_SATISFIABLE and
+            self._written > 0 and
+            self._written == self._total
+        )
+
+    def start(self, response: Response):
+        """
+        Validates a successful response to the latest attempt before its body is written
+        """
+        if response.status_code == codes.PARTIAL_CONTENT:
+            self._start_partial(response)
+        else:
+            self._start_full(response)
+        if not self._validator:
+            etag = response.headers.get('ETag')
+            self._validator = etag if etag and not etag.startswith('W/') else response.headers.get('Last-Modified')
+
+    def write(self, chunk: bytes):
+        self._sink.write(chunk)
+        self._written += len(chunk)
+
+    def finish(self):
+        if self._total is not None and self._written != self._total:
+            raise exceptions.DownloadIncompleteError(url=self._url, written=self._written, total=self._total)
+
+    def _start_full(self, response: Response):
+        if self._written:
+            logger.warning(f'Server ignored range request, restarting download', url=self._url, written=self._written)
+            if not getattr(self._sink, 'seekable', lambda: False)():
+                raise exceptions.APIException(f'Cannot restart download of {self._url}, sink is not seekable')
+            self._sink.seek(0)
+            self._sink.truncate()
+            self._written = 0
+        content_length = response.headers.get('Content-Length')
+        self._total = int(content_length) if content_length else None
+
+    def _start_partial(self, response: Response):
+        match = CONTENT_RANGE_PATTERN.fullmatch(response.headers.get('Content-Range', ''))
+        if not match or int(match.group(1)) != self._written:
+            raise exceptions.APIException(
+                f'Unexpected Content-Range "{response.headers.get("Content-Range")}" resuming at byte {self._written}'
+            )
+        if match.group(3) != '*':
+            self._total = int(match.group(3))
+        logger.info(f'Resuming download', url=self._url, written=self._written, total=self._total)
+
+
+def open_sink(sink: typing.BinaryIO | str | os.PathLike) -> typing.ContextManager[typing.BinaryIO]:
+    """
+    Opens paths for writing. File-like sinks are passed through and left open
+    """
+    if isinstance(sink, (str, os.PathLike)):
+        return open(sink, 'wb')
+    return nullcontext(sink)
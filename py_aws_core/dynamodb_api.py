@@ -1,10 +1,11 @@
+import typing
 from dataclasses import dataclass
 
-import boto3
-from boto3.dynamodb.table import TableResource
-from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
-
 from py_aws_core import const, logs, utils
+from py_aws_core.dynamodb_codec import get_dynamodb_codec
+
+if typing.TYPE_CHECKING:
+    from boto3.dynamodb.table import TableResource
 
 logger = logs.get_logger()
 
@@ -80,7 +81,7 @@ class DynamoDBAPI:
         } | kwargs
 
     @classmethod
-    def batch_write_item_maps(cls, table_resource: TableResource, item_maps: list[dict]) -> int:
+    def batch_write_item_maps(cls, table_resource: 'TableResource', item_maps: list[dict]) -> int:
         with table_resource.batch_writer() as batch:
             for _map in item_maps:
                 batch.put_item(Item=_map)
@@ -88,6 +89,8 @@ class DynamoDBAPI:
 
     @classmethod
     def get_new_table_resource(cls, table_name: str):
+        import boto3
+
         dynamodb_resource = boto3.resource('dynamodb')
         return dynamodb_resource.Table(table_name)
 
@@ -96,14 +99,25 @@ class DynamoDBAPI:
         """
         Converts normalized json to low level dynamo json
         """
-        return {k: TypeSerializer().serialize(v) for k, v in data.items()}
+        return get_dynamodb_codec().serialize(data)
 
     @classmethod
     def deserialize_types(cls, data: dict):
         """
         Converts low level dynamo json to normalized json
         """
-        return {k: TypeDeserializer().deserialize(v) for k, v in data.items()}
+        return get_dynamodb_codec().deserialize(data)
+
+    @classmethod
+    def serialize_items(cls, items: list[dict]) -> list[dict]:
+        """
+        Converts a batch of items to low level dynamo json, see DynamoDBCodec to pass a schema
+        """
+        return get_dynamodb_codec().serialize_items(items)
+
+    @classmethod
+    def deserialize_items(cls, items: list[dict]) -> list[dict]:
+        return get_dynamodb_codec().deserialize_items(items)
 
     @classmethod
     def calc_expire_at_timestamp(cls, expire_in_seconds: int = None) -> int | str:
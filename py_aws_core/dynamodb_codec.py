@@ -0,0 +1,136 @@
+import typing
+from decimal import Decimal
+
+_MAX_INT = 10 ** 38  # Ints below this fit DynamoDB's 38 digit precision exactly, so str() matches boto3
+_TAGS = ('S', 'N', 'B', 'BOOL', 'NULL', 'M', 'L', 'SS', 'NS', 'BS')
+
+
+class DynamoDBCodec:
+    """
+    Converts between normalized json and low level dynamo json, with the same output and errors as boto3's
+    TypeSerializer and TypeDeserializer.
+
+    Values are dispatched on their exact type, or type tag, with one dict lookup instead of boto3's chain of
+    isinstance checks. Anything else, e.g. sets, floats or subclasses of the builtin types, falls back to boto3.
+
+    :param schema: Optional type tags of known top level attributes, e.g. {'PK': 'S', 'ExpiresAt': 'N'},
+        which lets deserialize() skip reading the tag of each value. Values stored with another tag, e.g. NULL,
+        are still deserialized correctly. Serializing already dispatches on the value's type, so ignores it
+    """
+    def __init__(self, schema: typing.Mapping[str, str] = None):
+        # boto3 is imported on first use, it is the slowest import on a cold start
+        from boto3.dynamodb.types import DYNAMODB_CONTEXT, Binary, TypeDeserializer, TypeSerializer
+
+        self._create_decimal = DYNAMODB_CONTEXT.create_decimal
+        self._serializer = TypeSerializer()
+        self._deserializer = TypeDeserializer()
+        self._serializers = {
+            str: lambda v: {'S': v},
+            bool: lambda v: {'BOOL': v},
+            int: self._serialize_int,
+            Decimal: self._serialize_decimal,
+            type(None): lambda v: {'NULL': True},
+            dict: lambda v: {'M': self._serialize_map(v)},
+            list: self._serialize_list,
+            tuple: self._serialize_list,
+            bytes: lambda v: {'B': v},
+            bytearray: lambda v: {'B': bytes(v)},
+            Binary: lambda v: {'B': v.value},
+        }
+        self._deserializers = {
+            'S': lambda v: v,
+            'N': self._create_decimal,
+            'B': Binary,
+            'BOOL': lambda v: v,
+            'NULL': lambda v: None,
+            'M': self._deserialize_map,
+            'L': lambda v: [self.deserialize_value(i) for i in v],
+            'SS': set,
+            'NS': lambda v: set(map(self._create_decimal, v)),
+            'BS': lambda v: set(map(Binary, v)),
+        }
+        self._hints = self._get_hints(schema or {})
+
+    def serialize_value(self, value: typing.Any) -> dict:
+        if serializer := self._serializers.get(type(value)):
+            return serializer(value)
+        return self._serializer.serialize(value)
+
+    def deserialize_value(self, value: dict) -> typing.Any:
+        try:
+            (tag, v), = value.items()
+            deserializer = self._deserializers[tag]
+        except (AttributeError, KeyError, ValueError):
+            return self._deserializer.deserialize(value)
+        return deserializer(v)
+
+    def serialize(self, item: typing.Mapping[str, typing.Any]) -> dict:
+        return self._serialize_map(item)
+
+    def deserialize(self, item: typing.Mapping[str, dict]) -> dict:
+        if hints := self._hints:
+            try:
+                return {
+                    k: h[1](v[h[0]]) if (h := hints.get(k)) else self.deserialize_value(v)
+                    for k, v in item.items()
+                }
+            except KeyError:
+                pass  # A hinted attribute was stored with another tag
+        return self._deserialize_map(item)
+
+    def serialize_items(self, items: typing.Iterable[typing.Mapping[str, typing.Any]]) -> typing.List[dict]:
+        serialize = self._serialize_map
+        return [serialize(item) for item in items]
+
+    def deserialize_items(self, items: typing.Iterable[typing.Mapping[str, dict]]) -> typing.List[dict]:
+        deserialize = self.deserialize
+        return [deserialize(item) for item in items]
+
+    def _serialize_map(self, value: typing.Mapping[str, typing.Any]) -> dict:
+        serializers = self._serializers
+        return {
+            k: s(v) if (s := serializers.get(type(v))) else self._serializer.serialize(v)
+            for k, v in value.items()
+        }
+
+    def _deserialize_map(self, value: typing.Mapping[str, dict]) -> dict:
+        deserializers = self._deserializers
+        try:
+            return {k: deserializers[tag](v) for k, typed in value.items() for (tag, v), in (typed.items(),)}
+        except (AttributeError, KeyError, ValueError):
+            # Malformed or unknown type tags, raised by boto3 as a TypeError
+            return {k: self.deserialize_value(v) for k, v in value.items()}
+
+    def _serialize_int(self, value: int) -> dict:
+        if -_MAX_INT < value < _MAX_INT:
+            return {'N': str(value)}
+        return self._serializer.serialize(value)
+
+    def _serialize_decimal(self, value: Decimal) -> dict:
+        number = str(self._create_decimal(value))
+        if number in ('Infinity', 'NaN'):
+            raise TypeError('Infinity and NaN not supported')
+        return {'N': number}
+
+    def _serialize_list(self, value: typing.Sequence) -> dict:
+        serialize_value = self.serialize_value
+        return {'L': [serialize_value(v) for v in value]}
+
+    def _get_hints(self, schema: typing.Mapping[str, str]) -> typing.Dict[str, typing.Tuple[str, typing.Callable]]:
+        for name, tag in schema.items():
+            if tag not in _TAGS:
+                raise ValueError(f'Unknown type tag "{tag}" for attribute "{name}", expected one of {list(_TAGS)}')
+        return {name: (tag, self._deserializers[tag]) for name, tag in schema.items()}
+
+
+_dynamodb_codec = None
+
+
+def get_dynamodb_codec() -> DynamoDBCodec:
+    """
+    Shared codec with no schema
+    """
+    global _dynamodb_codec
+    if _dynamodb_codec is None:
+        _dynamodb_codec = DynamoDBCodec()
+    return _dynamodb_codec
@@ -44,6 +44,7 @@ class Session(ABCEntity):
     def __init__(self, data):
         super().__init__(data)
         self.Base64Cookies = data.get('Base64Cookies')
+        self.CookieMap = data.get('CookieMap')
         self.SessionId = data.get('SessionId')
 
     @classmethod
@@ -55,3 +56,12 @@ class Session(ABCEntity):
         if self.Base64Cookies:
             return self.Base64Cookies.value
         return None
+
+    @property
+    def cookie_map_bytes(self) -> typing.Dict[str, bytes]:
+        """
+        Per-cookie encoded values, keyed by SessionCookiesMixin.cookie_key
+        """
+        if self.CookieMap:
+            return {k: v.value for k, v in self.CookieMap.items()}
+        return dict()
@@ -35,10 +35,28 @@ class CookieDecodingError(APIException):
     ERROR_MESSAGE = 'Error while decoding binary cookies'
 
 
+class CookieEncodingError(APIException):
+    ERROR_MESSAGE = 'Error while encoding binary cookies'
+
+
 class MissingCookieException(APIException):
     ERROR_MESSAGE = 'Missing Cookie Exception'
 
 
+class DownloadIncompleteError(APIException):
+    ERROR_MESSAGE = 'Download ended before all bytes were received'
+
+
+class CircuitOpenError(APIException):
+    HTTP_STATUS_CODE = 503
+    ERROR_MESSAGE = 'Circuit is open, request was not sent'
+
+
+class DeadlineExceeded(CoreException):
+    HTTP_STATUS_CODE = 504
+    ERROR_MESSAGE = 'Deadline exceeded before the operation could complete'
+
+
 class AWSCoreException(CoreException):
     ERROR_MESSAGE = 'A generic AWS error occurred'
 
@@ -0,0 +1,210 @@
+import asyncio
+import contextvars
+import threading
+import time
+import typing
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from httpx import AsyncClient, Client, Response
+
+from py_aws_core import logs
+
+logger = logs.get_logger()
+
+
+class LatencyWindow:
+    """
+    Thread-safe window of the most recent request latencies
+    """
+    def __init__(self, size: int = 200):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, p: float) -> float | None:
+        """
+        :param p: Percentile between 0 and 100
+        :return: Nearest-rank percentile, None if nothing was recorded yet
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        rank = min(len(latencies) - 1, max(0, round(p / 100 * len(latencies)) - 1))
+        return latencies[rank]
+
+    def __len__(self):
+        return len(self._latencies)
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """
+    :param percentile: Sends a hedge request once the primary request is slower than this percentile of recent latency
+    :param min_samples: Latencies recorded before hedging starts
+    :param min_delay: Lower bound on the hedge delay, in seconds
+    :param max_hedge_ratio: Upper bound on hedge requests as a fraction of hedgeable requests, keeping extra load bounded
+    :param window_size: Number of recent latencies the percentile is computed over
+    :param methods: Http methods eligible for hedging, must be idempotent
+    :param alternate_client: Client whose transport hedge requests are sent through, e.g. one configured with
+        a different proxy. Only its transport is used, cookies, redirects and retries stay with the client sending
+        the primary request. Defaults to the client sending the primary request
+    :param max_workers: Threads available to in-flight primary and hedge requests of a sync client
+    """
+    percentile: float = 95.0
+    min_samples: int = 20
+    min_delay: float = 0.05
+    max_hedge_ratio: float = 0.1
+    window_size: int = 200
+    methods: typing.FrozenSet[str] = frozenset(['GET', 'HEAD'])
+    alternate_client: Client | AsyncClient | None = field(default=None, compare=False)
+    max_workers: int = 16
+
+
+class Hedger:
+    """
+    Races a hedge request against a slow primary request, returning whichever response arrives first
+    """
+    def __init__(self, policy: HedgePolicy):
+        self._policy = policy
+        self._window = LatencyWindow(size=policy.window_size)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._requests = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+
+    @property
+    def policy(self) -> HedgePolicy:
+        return self._policy
+
+    @property
+    def metrics(self) -> typing.Dict[str, typing.Any]:
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'hedges': self._hedges,
+                'hedge_wins': self._hedge_wins,
+                'hedge_delay': self.get_hedge_delay(),
+            }
+
+    def should_hedge(self, method: str) -> bool:
+        return method.upper() in self._policy.methods
+
+    def get_hedge_delay(self) -> float | None:
+        """
+        :return: Seconds to wait for the primary response before hedging, None while too few latencies are recorded
+        """
+        if len(self._window) < self._policy.min_samples:
+            return None
+        return max(self._policy.min_delay, self._window.percentile(self._policy.percentile))
+
+    def run(self, send: typing.Callable[[], Response], hedge: typing.Callable[[], Response]) -> Response:
+        """
+        :param send: Sends the primary request
+        :param hedge: Sends the hedge request
+        """
+        self._count_request()
+        if (delay := self.get_hedge_delay()) is None:
+            return self._timed(send)
+
+        primary = self._get_executor().submit(contextvars.copy_context().run, self._timed, send)
+        if wait([primary], timeout=delay).done or not self._try_acquire_hedge():
+            return primary.result()
+
+        logger.info(f'Primary request slow, sending hedge request', hedge_delay=delay)
+        secondary = self._get_executor().submit(contextvars.copy_context().run, hedge)
+        legs = {primary, secondary}
+        done, _ = wait(legs, return_when=FIRST_COMPLETED)
+        if all(f.exception() is not None for f in done):  # The other request may still succeed
+            done, _ = wait(legs)
+        winner = next((f for f in done if f.exception() is None), primary)
+        for future in legs - {winner}:  # Sync requests cannot be cancelled, so release the loser once it arrives
+            future.add_done_callback(self._close_response)
+        if winner is secondary:
+            self._count_hedge_win()
+        return winner.result()
+
+    async def async_run(
+        self,
+        send: typing.Callable[[], typing.Awaitable[Response]],
+        hedge: typing.Callable[[], typing.Awaitable[Response]]
+    ) -> Response:
+        """
+        Same as "run". The losing request is cancelled instead of left to finish in the background
+        """
+        self._count_request()
+        if (delay := self.get_hedge_delay()) is None:
+            return await self._async_timed(send)
+
+        primary = asyncio.ensure_future(self._async_timed(send))
+        done, _ = await asyncio.wait([primary], timeout=delay)
+        if done or not self._try_acquire_hedge():
+            return await primary
+
+        logger.info(f'Primary request slow, sending hedge request', hedge_delay=delay)
+        secondary = asyncio.ensure_future(hedge())
+        legs = {primary, secondary}
+        try:
+            done, _ = await asyncio.wait(legs, return_when=asyncio.FIRST_COMPLETED)
+            if all(t.exception() is not None for t in done):  # The other request may still succeed
+                done, _ = await asyncio.wait(legs)
+        finally:
+            for task in legs:
+                task.cancel()  # No-op for finished tasks
+            await asyncio.gather(*legs, return_exceptions=True)  # Lets cancelled requests release their connections
+        winner = next((t for t in done if t.exception() is None), primary)
+        for task in done - {winner}:
+            if task.exception() is None:
+                await task.result().aclose()
+        if winner is secondary:
+            self._count_hedge_win()
+        return winner.result()
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _timed(self, send: typing.Callable[[], Response]) -> Response:
+        start = time.monotonic()
+        response = send()
+        self._window.record(time.monotonic() - start)
+        return response
+
+    async def _async_timed(self, send: typing.Callable[[], typing.Awaitable[Response]]) -> Response:
+        start = time.monotonic()
+        response = await send()
+        self._window.record(time.monotonic() - start)
+        return response
+
+    @staticmethod
+    def _close_response(future: Future):
+        if future.exception() is None:
+            future.result().close()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if not self._executor:
+                self._executor = ThreadPoolExecutor(max_workers=self._policy.max_workers, thread_name_prefix='hedge')
+            return self._executor
+
+    def _count_request(self):
+        with self._lock:
+            self._requests += 1
+
+    def _count_hedge_win(self):
+        with self._lock:
+            self._hedge_wins += 1
+
+    def _try_acquire_hedge(self) -> bool:
+        with self._lock:
+            if self._hedges + 1 > self._policy.max_hedge_ratio * self._requests:
+                return False
+            self._hedges += 1
+            return True
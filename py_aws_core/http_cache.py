@@ -0,0 +1,322 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import typing
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+
+from httpx import Headers, Request, Response, codes
+
+from py_aws_core import logs
+
+logger = logs.get_logger()
+
+# Hop-by-hop and per-exchange headers that are never replayed from the cache.
+# Bodies are cached decoded, so their encoding and length headers no longer apply
+UNCACHED_HEADERS = frozenset([
+    'connection', 'content-encoding', 'content-length', 'keep-alive', 'set-cookie', 'transfer-encoding'
+])
+# Request headers identifying the user. Responses to requests sending them are cached separately per value
+CREDENTIAL_HEADERS = ('Authorization', 'Cookie')
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    status_code: int
+    headers: typing.List[typing.Tuple[str, str]]
+    content: bytes
+    stored_at: float
+    vary: typing.Dict[str, str | None] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return len(self.content) + sum(len(k) + len(v) for k, v in self.headers)
+
+    @property
+    def etag(self) -> str | None:
+        return Headers(self.headers).get('ETag')
+
+    @property
+    def last_modified(self) -> str | None:
+        return Headers(self.headers).get('Last-Modified')
+
+    def get_ttl(self) -> float:
+        """
+        :return: Seconds the entry is fresh for after it was stored, 0 if it must always be revalidated
+        """
+        headers = Headers(self.headers)
+        cache_control = parse_cache_control(headers.get('Cache-Control'))
+        if 'no-cache' in cache_control:
+            return 0.0
+        if (max_age := cache_control.get('max-age')) is not None:
+            try:
+                return float(max_age)
+            except ValueError:
+                return 0.0
+        try:
+            expires = parsedate_to_datetime(headers['Expires'])
+            date = parsedate_to_datetime(headers['Date']) if 'Date' in headers else None
+            return (expires - date).total_seconds() if date else expires.timestamp() - self.stored_at
+        except (KeyError, TypeError, ValueError):
+            return 0.0
+
+    def is_fresh(self, now: float) -> bool:
+        return now - self.stored_at < self.get_ttl()
+
+    def matches(self, request: Request) -> bool:
+        return all(request.headers.get(name) == value for name, value in self.vary.items())
+
+    def to_response(self, request: Request) -> Response:
+        return Response(status_code=self.status_code, headers=self.headers, content=self.content, request=request)
+
+    def revalidated(self, response: Response, now: float) -> 'CacheEntry':
+        """
+        :return: Entry with headers updated from a 304 Not Modified response
+        """
+        headers = Headers(self.headers)
+        for name, value in response.headers.items():
+            if name.lower() not in UNCACHED_HEADERS:
+                headers[name] = value
+        return CacheEntry(
+            url=self.url,
+            status_code=self.status_code,
+            headers=list(headers.items()),
+            content=self.content,
+            stored_at=now,
+            vary=self.vary,
+        )
+
+
+class ICacheStore(ABC):
+    @abstractmethod
+    def get(self, key: str) -> CacheEntry | None:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry):
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+
+class MemoryCacheStore(ICacheStore):
+    """
+    Thread-safe LRU store bounded by the total size of the cached responses
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: typing.OrderedDict[str, CacheEntry] = OrderedDict()
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            if entry := self._entries.get(key):
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        if entry.size > self._max_bytes:
+            return
+        with self._lock:
+            if old := self._entries.pop(key, None):
+                self._size -= old.size
+            self._entries[key] = entry
+            self._size += entry.size
+            while self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+
+    def delete(self, key: str):
+        with self._lock:
+            if old := self._entries.pop(key, None):
+                self._size -= old.size
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskCacheStore(ICacheStore):
+    """
+    One file per entry: a length prefixed JSON header followed by the raw body.
+    Files are written to a temporary name and renamed, so readers never see a partial entry
+    """
+    _HEADER_LENGTH = struct.Struct('<I')
+
+    def __init__(self, directory: str | os.PathLike):
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> CacheEntry | None:
+        try:
+            with open(self._get_path(key), 'rb') as f:
+                data = f.read()
+            (header_length,) = self._HEADER_LENGTH.unpack_from(data)
+            offset = self._HEADER_LENGTH.size + header_length
+            header = json.loads(data[self._HEADER_LENGTH.size:offset])
+            return CacheEntry(
+                url=header['url'],
+                status_code=header['status_code'],
+                headers=[tuple(h) for h in header['headers']],
+                content=data[offset:],
+                stored_at=header['stored_at'],
+                vary=header['vary'],
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, KeyError, ValueError, struct.error) as e:
+            logger.warning(f'Discarding unreadable cache entry', key=key, exception=str(e))
+            self.delete(key)
+            return None
+
+    def set(self, key: str, entry: CacheEntry):
+        header = json.dumps({
+            'url': entry.url,
+            'status_code': entry.status_code,
+            'headers': entry.headers,
+            'stored_at': entry.stored_at,
+            'vary': entry.vary,
+        }).encode('utf-8')
+        path = self._get_path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self._HEADER_LENGTH.pack(len(header)) + header + entry.content)
+        os.replace(tmp_path, path)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._get_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self._directory, hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+
+class HttpCache:
+    """
+    Http cache for GET requests, which may be shared by clients with different sessions.
+    Fresh entries, per "Cache-Control: max-age" or "Expires", are returned without a request.
+    Stale entries are revalidated with "If-None-Match" and "If-Modified-Since", and a 304 response reuses the cached body
+
+    Responses to requests with credentials, i.e. an Authorization or Cookie header, are only reused for requests with
+    the same credentials. "Cache-Control: private" responses are never stored, and an entry is only reused for requests
+    matching its "Vary" headers. Redirected responses are stored under the url they were finally fetched from
+    """
+    CACHEABLE_STATUS_CODES = frozenset([codes.OK, codes.NON_AUTHORITATIVE_INFORMATION])
+
+    def __init__(self, store: ICacheStore = None):
+        """
+        :param store: Defaults to a 64 MiB MemoryCacheStore
+        """
+        self._store = store or MemoryCacheStore()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._revalidations = 0
+        self._misses = 0
+
+    @property
+    def metrics(self) -> typing.Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'revalidations': self._revalidations,
+                'misses': self._misses,
+            }
+
+    @staticmethod
+    def get_key(request: Request) -> str:
+        key = f'{request.method} {request.url}'
+        if credentials := '\n'.join(f'{name}: {request.headers[name]}' for name in CREDENTIAL_HEADERS if name in request.headers):
+            digest = hashlib.sha256(credentials.encode('utf-8')).hexdigest()
+            return f'{key} {digest}'
+        return key
+
+    def is_cacheable_request(self, request: Request) -> bool:
+        return (
+            request.method == 'GET' and
+            'Range' not in request.headers and
+            'no-store' not in parse_cache_control(request.headers.get('Cache-Control'))
+        )
+
+    def prepare(self, request: Request) -> typing.Tuple[CacheEntry | None, Response | None]:
+        """
+        Looks up request. Adds validators to request if a stale entry is found
+        :return: The entry found, and a response if it is fresh enough to be returned without sending request
+        """
+        entry = self._store.get(self.get_key(request))
+        if not entry or not entry.matches(request):
+            return None, None
+        if entry.is_fresh(now=time.time()) and 'no-cache' not in parse_cache_control(request.headers.get('Cache-Control')):
+            self._count('_hits')
+            return entry, entry.to_response(request)
+        if etag := entry.etag:
+            request.headers['If-None-Match'] = etag
+        if last_modified := entry.last_modified:
+            request.headers['If-Modified-Since'] = last_modified
+        return entry, None
+
+    def complete(self, request: Request, entry: CacheEntry | None, response: Response) -> Response:
+        """
+        Stores a cacheable response, or turns a 304 response into the cached response
+        """
+        now = time.time()
+        if entry and response.status_code == codes.NOT_MODIFIED and not response.history:
+            self._count('_revalidations')
+            entry = entry.revalidated(response, now=now)
+            self._store.set(self.get_key(request), entry)
+            return entry.to_response(request)
+
+        self._count('_misses')
+        # After redirects, the response belongs to the last request sent, not the one looked up
+        final_request = response.request if response.history else request
+        if response.status_code in self.CACHEABLE_STATUS_CODES and (new_entry := self._build_entry(final_request, response, now)):
+            self._store.set(self.get_key(final_request), new_entry)
+        return response
+
+    def _build_entry(self, request: Request, response: Response, now: float) -> CacheEntry | None:
+        cache_control = parse_cache_control(response.headers.get('Cache-Control'))
+        vary = [v.strip() for v in response.headers.get('Vary', '').split(',') if v.strip()]
+        if 'no-store' in cache_control or 'private' in cache_control or '*' in vary:
+            return None
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in UNCACHED_HEADERS]
+        try:
+            age = float(response.headers.get('Age', 0))
+        except ValueError:
+            age = 0.0
+        entry = CacheEntry(
+            url=str(request.url),
+            status_code=response.status_code,
+            headers=headers,
+            content=response.content,
+            stored_at=now - age,
+            vary={name: request.headers.get(name) for name in vary},
+        )
+        if not entry.get_ttl() and not entry.etag and not entry.last_modified:
+            return None  # Could never be reused
+        return entry
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+def parse_cache_control(value: str | None) -> typing.Dict[str, str | None]:
+    directives = dict()
+    for directive in (value or '').split(','):
+        name, sep, arg = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('"') if sep else None
+    return directives
@@ -1,47 +1,113 @@
 import logging
 import os
 import sys
+import threading
+import typing
 
-import structlog
-from dotenv import load_dotenv
-
-dotenv = load_dotenv()  # take environment variables from .env.
-level = os.environ.get("LOG_LEVEL", "INFO").upper()
-LOG_LEVEL = getattr(logging, level)
-
-exception_transformer = structlog.processors.ExceptionDictTransformer(locals_max_length=10000, locals_max_string=10000)
-
-shared_processors = [
-    structlog.processors.EventRenamer('message'),
-    structlog.processors.CallsiteParameterAdder(),
-    structlog.processors.TimeStamper(fmt='iso'),
-    structlog.processors.add_log_level,
-    structlog.processors.ExceptionPrettyPrinter(exception_formatter=exception_transformer),
-]
-val = sys.stderr.isatty()
-if 'unittest' in sys.modules or sys.stderr.isatty():
-    # Pretty printing when we run tests or a terminal session.
-    # Automatically prints pretty tracebacks when "rich" is installed
-    processors = shared_processors + [
-        structlog.dev.ConsoleRenderer(
-            colors=True,
-            event_key='message'
-        ),
-    ]
-else:
-    # Print JSON when we run, e.g., in a Docker container.
-    # Also print structured tracebacks.
-    processors = shared_processors + [
-        structlog.processors.dict_tracebacks,
-        structlog.processors.JSONRenderer(),
-    ]
-structlog.configure(
-    processors=processors,
-    wrapper_class=structlog.make_filtering_bound_logger(LOG_LEVEL)
-)
-
-__logger = structlog.get_logger(__name__)
+_lock = threading.Lock()
+_is_env_loaded = False
+_is_configured = False
+_log_level = None
+
+
+def load_env():
+    """
+    Loads variables from a .env file into os.environ, once. Deferred from import time to the first log call
+    or environment variable lookup, since searching for the file is slow on a cold start
+    """
+    global _is_env_loaded
+    if _is_env_loaded:
+        return
+    with _lock:
+        if not _is_env_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()  # take environment variables from .env.
+            _is_env_loaded = True
+
+
+def configure():
+    """
+    Configures structlog, once. Called on first use of a logger
+    """
+    global _is_configured, _log_level
+    if _is_configured:
+        return
+    load_env()
+    with _lock:
+        if _is_configured:
+            return
+        import structlog
+
+        level = os.environ.get("LOG_LEVEL", "INFO").upper()
+        _log_level = getattr(logging, level)
+
+        exception_transformer = structlog.processors.ExceptionDictTransformer(locals_max_length=10000, locals_max_string=10000)
+
+        shared_processors = [
+            structlog.processors.EventRenamer('message'),
+            structlog.processors.CallsiteParameterAdder(),
+            structlog.processors.TimeStamper(fmt='iso'),
+            structlog.processors.add_log_level,
+            structlog.processors.ExceptionPrettyPrinter(exception_formatter=exception_transformer),
+        ]
+        if 'unittest' in sys.modules or sys.stderr.isatty():
+            # Pretty printing when we run tests or a terminal session.
+            # Automatically prints pretty tracebacks when "rich" is installed
+            processors = shared_processors + [
+                structlog.dev.ConsoleRenderer(
+                    colors=True,
+                    event_key='message'
+                ),
+            ]
+        else:
+            # Print JSON when we run, e.g., in a Docker container.
+            # Also print structured tracebacks.
+            processors = shared_processors + [
+                structlog.processors.dict_tracebacks,
+                structlog.processors.JSONRenderer(),
+            ]
+        structlog.configure(
+            processors=processors,
+            wrapper_class=structlog.make_filtering_bound_logger(_log_level),
+            cache_logger_on_first_use=True,  # Otherwise every log call binds a new logger, even when filtered out
+        )
+        _is_configured = True
+
+
+class LazyLogger:
+    """
+    Stands in for the structlog logger until it is first used, so importing a module does not import structlog
+    """
+    def __init__(self, name: str):
+        self._name = name
+        self._logger = None
+
+    def __getattr__(self, item: str) -> typing.Any:
+        if (logger := self._logger) is None:
+            configure()
+            import structlog
+            logger = self._logger = structlog.get_logger(self._name).bind()
+        return getattr(logger, item)
+
+
+__logger = LazyLogger(__name__)
 
 
 def get_logger():
     return __logger
+
+
+def is_enabled_for(level: int) -> bool:
+    """
+    Cheap check to skip building costly log arguments for filtered out levels, e.g. is_enabled_for(logging.DEBUG)
+    """
+    if not _is_configured:
+        configure()
+    return level >= _log_level
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name == 'LOG_LEVEL':
+        configure()
+        return _log_level
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,398 @@
+import random
+import threading
+import typing
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+
+from py_aws_core import deadlines, exceptions, logs, utils
+
+logger = logs.get_logger()
+
+T = typing.TypeVar('T')
+
+
+class Jitter(Enum):
+    # Exact exponential delays
+    NONE = 'NONE'
+    # Exponential delay +/- jitter_amount seconds, the original decorators.retry behavior
+    UNIFORM = 'UNIFORM'
+    # Random delay between 0 and the exponential delay
+    FULL = 'FULL'
+    # Random delay between the initial delay and 3x the previous delay
+    DECORRELATED = 'DECORRELATED'
+
+
+@dataclass(frozen=True)
+class StatusRule:
+    """
+    Retry strategy for a single http status code
+    :param retry: Whether responses with this status code are retried at all
+    :param min_delay: Lower bound on the delay before the next attempt
+    :param honor_retry_after: Whether the "Retry-After" header may extend the delay
+    """
+    retry: bool = True
+    min_delay: float = 0.0
+    honor_retry_after: bool = True
+
+
+class RetryBudget:
+    """
+    Token bucket shared by every caller that retries against the same upstream.
+    Each retry spends retry_cost tokens and each successful call refills success_refill tokens,
+    so retries stay a bounded fraction of overall traffic.
+    Once the bucket is empty, retryable failures are raised right away instead of sleeping and retrying.
+
+    Named budgets are shared process-wide via RetryBudget.get(name)
+    """
+    DEFAULT = 'default'
+    _budgets: typing.Dict[str, 'RetryBudget'] = dict()
+    _budgets_lock = threading.Lock()
+
+    def __init__(self, name: str = DEFAULT, capacity: float = 100.0, retry_cost: float = 1.0, success_refill: float = 0.1):
+        """
+        :param name: Name reported in metrics and logs
+        :param capacity: Maximum number of tokens, the bucket starts full
+        :param retry_cost: Tokens spent per retry
+        :param success_refill: Tokens added per successful call, e.g. 0.1 allows one retry per ten successes
+        """
+        self._name = name
+        self._capacity = capacity
+        self._retry_cost = retry_cost
+        self._success_refill = success_refill
+        self._lock = threading.Lock()
+        self._tokens = capacity
+        self._retries_allowed = 0
+        self._retries_denied = 0
+        self._successes = 0
+
+    @classmethod
+    def get(cls, name: str = DEFAULT, **kwargs) -> 'RetryBudget':
+        """
+        Returns the named budget, creating it with kwargs on first use.
+        Raises ValueError if kwargs differ from the parameters the budget was created with
+        """
+        with cls._budgets_lock:
+            if not (budget := cls._budgets.get(name)):
+                budget = cls._budgets[name] = cls(name=name, **kwargs)
+            elif conflicts := {k: v for k, v in kwargs.items() if budget.params.get(k) != v}:
+                raise ValueError(f'Retry budget "{name}" already exists with {budget.params}, got {conflicts}')
+            return budget
+
+    @classmethod
+    def reset_all(cls):
+        with cls._budgets_lock:
+            for budget in cls._budgets.values():
+                budget.reset()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    @property
+    def params(self) -> typing.Dict[str, float]:
+        return {'capacity': self._capacity, 'retry_cost': self._retry_cost, 'success_refill': self._success_refill}
+
+    @property
+    def metrics(self) -> typing.Dict[str, typing.Any]:
+        with self._lock:
+            return {
+                'name': self._name,
+                'tokens': self._tokens,
+                'capacity': self._capacity,
+                'retries_allowed': self._retries_allowed,
+                'retries_denied': self._retries_denied,
+                'successes': self._successes,
+            }
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens < self._retry_cost:
+                self._retries_denied += 1
+                return False
+            self._tokens -= self._retry_cost
+            self._retries_allowed += 1
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._tokens = min(self._capacity, self._tokens + self._success_refill)
+            self._successes += 1
+
+    def reset(self):
+        with self._lock:
+            self._tokens = self._capacity
+            self._retries_allowed = 0
+            self._retries_denied = 0
+            self._successes = 0
+
+
+class KeyedRetryBudget:
+    """
+    One RetryBudget per key, e.g. per upstream host, so one degraded upstream cannot spend the retries of the others.
+    Budgets are created on first use of a key, and the least recently used are dropped past "max_keys"
+    """
+    _instances: 'weakref.WeakSet[KeyedRetryBudget]' = weakref.WeakSet()
+
+    def __init__(self, name: str, max_keys: int = 1024, **kwargs):
+        """
+        :param name: Prefix of the per key budget names
+        :param kwargs: RetryBudget parameters of each per key budget
+        """
+        self._name = name
+        self._max_keys = max_keys
+        self._kwargs = kwargs
+        self._lock = threading.Lock()
+        self._budgets: OrderedDict[str | None, RetryBudget] = OrderedDict()
+        KeyedRetryBudget._instances.add(self)
+
+    def get(self, key: str | None) -> RetryBudget:
+        with self._lock:
+            if budget := self._budgets.get(key):
+                self._budgets.move_to_end(key)
+                return budget
+            budget = self._budgets[key] = RetryBudget(name=f'{self._name}:{key}', **self._kwargs)
+            if len(self._budgets) > self._max_keys:
+                self._budgets.popitem(last=False)
+            return budget
+
+    def __len__(self):
+        return len(self._budgets)
+
+    def clear(self):
+        with self._lock:
+            self._budgets.clear()
+
+    @classmethod
+    def clear_all(cls):
+        for keyed_budget in list(cls._instances):
+            keyed_budget.clear()
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Decides whether and when a failed call is retried.
+    Works with httpx exceptions, which carry the request and response, and with botocore ClientErrors,
+    whose response metadata carries the http status code and headers.
+
+    :param retry_exceptions: Exceptions that may be retried
+    :param tries: Number of times to try (not retry) before giving up
+    :param delay: Initial delay between retries in seconds
+    :param backoff: Backoff multiplier (e.g. value of 2.0 will double the delay each retry)
+    :param max_delay: Upper bound on the computed backoff delay
+    :param jitter: Jitter strategy applied to the backoff delay
+    :param jitter_amount: Spread in seconds used by Jitter.UNIFORM
+    :param honor_retry_after: Waits at least as long as the server's "Retry-After" header asks
+    :param max_retry_after: Upper bound on how long a "Retry-After" header can make us wait
+    :param idempotent_only: Only retries requests with an idempotent http method
+    :param always_retry_exceptions: Exceptions raised before a request reaches the server, e.g. connect errors,
+        which are safe to retry for any http method
+    :param status_rules: Per status code retry strategies
+    :param budget: RetryBudget consulted before every retry, None retries without limit.
+        With a KeyedRetryBudget, the budget of the "budget_key" passed to run is used
+    """
+    IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'])
+
+    retry_exceptions: typing.Tuple[typing.Type[BaseException], ...] = tuple()
+    tries: int = 4
+    delay: float = 1.5
+    backoff: float = 2.0
+    max_delay: float = 30.0
+    jitter: Jitter = Jitter.UNIFORM
+    jitter_amount: float = 0.1
+    honor_retry_after: bool = True
+    max_retry_after: float = 60.0
+    idempotent_only: bool = True
+    always_retry_exceptions: typing.Tuple[typing.Type[BaseException], ...] = tuple()
+    status_rules: typing.Mapping[int, StatusRule] = field(default_factory=dict)
+    budget: RetryBudget | KeyedRetryBudget | None = None
+
+    def should_retry(self, exc: BaseException, method: str = None) -> bool:
+        if isinstance(exc, self.always_retry_exceptions):
+            return True
+        if not isinstance(exc, self.retry_exceptions):
+            return False
+        if (rule := self.status_rules.get(get_status_code(exc))) and not rule.retry:
+            return False
+        method = method or get_request_method(exc)
+        if self.idempotent_only and method and method.upper() not in self.IDEMPOTENT_METHODS:
+            return False
+        return True
+
+    def get_delay(self, num_tries: int, prev_delay: float | None, exc: BaseException = None) -> float:
+        """
+        :param num_tries: Number of attempts made so far
+        :param prev_delay: Delay used before the previous attempt, None before the first retry
+        :param exc: Exception raised by the last attempt
+        """
+        base = min(self.max_delay, self.delay * self.backoff ** (num_tries - 1))
+        match self.jitter:
+            case Jitter.UNIFORM:
+                j_delay = utils.generate_jitter(midpoint=base, floor=0, std_deviation=self.jitter_amount)
+            case Jitter.FULL:
+                j_delay = random.uniform(0, base)
+            case Jitter.DECORRELATED:
+                upper = max(self.delay, (prev_delay or self.delay) * 3)
+                j_delay = min(self.max_delay, random.uniform(self.delay, upper))
+            case _:
+                j_delay = base
+
+        rule = self.status_rules.get(get_status_code(exc)) if exc else None
+        if rule:
+            j_delay = max(j_delay, rule.min_delay)
+        if self.honor_retry_after and (not rule or rule.honor_retry_after):
+            if (retry_after := get_retry_after(exc)) is not None:
+                j_delay = max(j_delay, min(retry_after, self.max_retry_after))
+        return j_delay
+
+    def run(self, func: typing.Callable[[], T], method: str = None, name: str = None, budget_key: str = None) -> T:
+        """
+        Calls func until it succeeds, raises a non retryable exception or runs out of tries
+        Raises DeadlineExceeded instead of retrying if the next attempt would start after the bound deadline
+        :param func: Zero argument callable, e.g. a functools.partial
+        :param method: Http method of the request made by func, if known
+        :param name: Name used in log messages
+        :param budget_key: Selects the budget of a KeyedRetryBudget, e.g. the request's host
+        """
+        budget = self._get_budget(budget_key)
+        num_tries = 1
+        j_delay = None
+        while True:
+            deadlines.check(name=name)
+            try:
+                result = func()
+            except Exception as e:
+                j_delay = self._before_retry(
+                    e, num_tries=num_tries, prev_delay=j_delay, method=method, name=name, budget=budget
+                )
+            else:
+                if budget:
+                    budget.record_success()
+                return result
+            utils.sleep(j_delay)
+            num_tries += 1
+
+    async def async_run(
+        self,
+        func: typing.Callable[[], typing.Awaitable[T]],
+        method: str = None,
+        name: str = None,
+        budget_key: str = None
+    ) -> T:
+        """
+        Same as "run", awaiting func and sleeping without blocking the event loop
+        """
+        budget = self._get_budget(budget_key)
+        num_tries = 1
+        j_delay = None
+        while True:
+            deadlines.check(name=name)
+            try:
+                result = await func()
+            except Exception as e:
+                j_delay = self._before_retry(
+                    e, num_tries=num_tries, prev_delay=j_delay, method=method, name=name, budget=budget
+                )
+            else:
+                if budget:
+                    budget.record_success()
+                return result
+            await utils.async_sleep(j_delay)
+            num_tries += 1
+
+    def _get_budget(self, budget_key: str | None) -> RetryBudget | None:
+        if isinstance(self.budget, KeyedRetryBudget):
+            return self.budget.get(budget_key)
+        return self.budget
+
+    def _before_retry(
+        self,
+        e: Exception,
+        num_tries: int,
+        prev_delay: float | None,
+        method: str,
+        name: str,
+        budget: RetryBudget | None
+    ) -> float:
+        """
+        Re-raises e if it should not be retried, otherwise returns the delay before the next attempt
+        """
+        if isinstance(e, exceptions.DeadlineExceeded) or not self.should_retry(e, method=method):
+            raise e
+        if num_tries >= self.tries:
+            logger.warning(f'Max tries reached', num_tries=num_tries, max_tries=self.tries, wrapped_func_name=name)
+            raise e
+        if budget and not budget.try_spend():
+            logger.warning(
+                f'Retry budget exhausted, failing fast',
+                budget=budget.name,
+                num_tries=num_tries,
+                exception=str(e),
+                wrapped_func_name=name
+            )
+            raise e
+        j_delay = self.get_delay(num_tries=num_tries, prev_delay=prev_delay, exc=e)
+        if (remaining := deadlines.get_remaining()) is not None and j_delay >= remaining:
+            logger.warning(
+                f'Deadline too close to retry, failing fast',
+                remaining=round(remaining, 3),
+                delay=round(j_delay, 3),
+                num_tries=num_tries,
+                exception=str(e),
+                wrapped_func_name=name
+            )
+            raise exceptions.DeadlineExceeded(name=name, num_tries=num_tries) from e
+        logger.info(
+            f'Retrying in {j_delay:.3f} seconds...',
+            num_tries=num_tries,
+            max_tries=self.tries,
+            exception=str(e),
+            exception_type=type(e),
+            wrapped_func_name=name
+        )
+        return j_delay
+
+
+def get_status_code(exc: BaseException) -> int | None:
+    response = getattr(exc, 'response', None)
+    if isinstance(response, dict):  # botocore ClientError
+        return response.get('ResponseMetadata', dict()).get('HTTPStatusCode')
+    return getattr(response, 'status_code', None)
+
+
+def get_request_method(exc: BaseException) -> str | None:
+    try:
+        return exc.request.method
+    except (AttributeError, RuntimeError):  # httpx raises RuntimeError when no request was set
+        return None
+
+
+def get_retry_after(exc: BaseException) -> float | None:
+    """
+    Parses the "Retry-After" header of the response attached to exc, in either delay-seconds or http-date form
+    """
+    response = getattr(exc, 'response', None)
+    if isinstance(response, dict):  # botocore ClientError
+        value = response.get('ResponseMetadata', dict()).get('HTTPHeaders', dict()).get('retry-after')
+    elif headers := getattr(response, 'headers', None):
+        value = headers.get('Retry-After')
+    else:
+        return None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - utils.get_now_datetime()).total_seconds())
+    except (TypeError, ValueError):
+        return None
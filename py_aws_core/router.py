@@ -1,7 +1,7 @@
 import typing
 from dataclasses import dataclass
 
-from . import exceptions, logs
+from . import deadlines, exceptions, logs
 
 logger = logs.get_logger()
 
@@ -51,11 +51,16 @@ class APIGatewayRouter:
         logger.info(f'Added route to router', http_method=http_method, path=path)
 
     def handle_event(self, aws_event, aws_context, **kwargs):
+        """
+        Calls the function routed to the event's path and method
+        The Lambda deadline is bound from aws_context while it runs, see deadlines.bind_lambda_context
+        """
         path = aws_event['path']
         http_method = aws_event['httpMethod']
         logger.info(f'Routing event', path=path, http_method=http_method, aws_event=aws_event)
         try:
             path_funcs = self._route_map[http_method][path]
-            return path_funcs.fn(aws_event, aws_context, **path_funcs.kwargs, **kwargs)
+            with deadlines.bind_lambda_context(aws_context):
+                return path_funcs.fn(aws_event, aws_context, **path_funcs.kwargs, **kwargs)
         except KeyError:
             raise exceptions.RouteNotFound(http_method=http_method, path=path)
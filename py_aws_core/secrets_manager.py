@@ -1,11 +1,12 @@
 import json
-
-from botocore.client import BaseClient
-from botocore.exceptions import ClientError
+import typing
 
 from . import exceptions, logs, utils
 from .secrets_interface import ISecrets
 
+if typing.TYPE_CHECKING:
+    from botocore.client import BaseClient
+
 logger = logs.get_logger()
 
 
@@ -29,7 +30,7 @@ class SecretsManager(ISecrets):
     """
     AWS_SECRET_NAME = 'AWS_SECRET_NAME'
 
-    def __init__(self, boto_client: BaseClient):
+    def __init__(self, boto_client: 'BaseClient'):
         self._boto_client = boto_client
         self._secrets_map = dict()
 
@@ -40,6 +41,7 @@ class SecretsManager(ISecrets):
         if val := self._secrets_map.get(secret_name):
             logger.debug(f'Secret "{secret_name}" found in cached secrets')
             return val
+        from botocore.exceptions import ClientError  # Loaded by the caller's boto client already
         try:
             r_secrets = self.Response(self._boto_client.get_secret_value(SecretId=self.aws_secret_name))
             self._secrets_map = r_secrets.secret_json
@@ -9,3 +9,13 @@ class ISession(ABC):
     @abstractmethod
     def write_session(self, value):
         pass
+
+
+class IAsyncSession(ABC):
+    @abstractmethod
+    async def read_session(self):
+        pass
+
+    @abstractmethod
+    async def write_session(self, value):
+        pass
@@ -1,11 +1,12 @@
 import json
-
-from botocore.client import BaseClient
-from botocore.exceptions import ClientError
+import typing
 
 from . import exceptions, logs, utils
 from .secrets_interface import ISecrets
 
+if typing.TYPE_CHECKING:
+    from botocore.client import BaseClient
+
 logger = logs.get_logger()
 
 
@@ -37,7 +38,7 @@ class SSMParameterStore(ISecrets):
 
     AWS_SECRET_ID_KEY = 'AWS_SECRET_NAME'
 
-    def __init__(self, boto_client: BaseClient, cached_secrets: dict = None):
+    def __init__(self, boto_client: 'BaseClient', cached_secrets: dict = None):
         self._boto_client = boto_client
         self._cached_secrets = cached_secrets or dict()
 
@@ -48,6 +49,7 @@ class SSMParameterStore(ISecrets):
         if val := self._cached_secrets.get(secret_name):
             logger.debug(f'Secret "{secret_name}" found in cached secrets')
             return val
+        from botocore.exceptions import ClientError  # Loaded by the caller's boto client already
         try:
             r_get_parameter = self._boto_client.get_parameter(Name=self.aws_secret_id)
             r_get_parameter = self.Response(r_get_parameter)
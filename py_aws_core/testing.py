@@ -10,6 +10,9 @@ import respx
 from httpx import Response, codes
 
 from . import utils
+from .boto_clients import BOTO_CLIENTS
+from .circuit_breakers import CIRCUIT_BREAKERS
+from .retry_policies import KeyedRetryBudget, RetryBudget
 from .secrets_interface import IDynamoDBSecrets
 
 
@@ -41,6 +44,10 @@ class BaseTestFixture(TestCase):
 
     def setUp(self):
         self.start_time = time.time()
+        RetryBudget.reset_all()
+        KeyedRetryBudget.clear_all()
+        CIRCUIT_BREAKERS.clear()
+        BOTO_CLIENTS.clear()  # Stubbers activated by earlier tests stay attached to cached clients
         super().setUp()
 
     def tearDown(self):
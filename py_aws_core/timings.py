@@ -0,0 +1,260 @@
+import bisect
+import logging
+import math
+import threading
+import time
+import typing
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from httpx import Request
+
+from py_aws_core import logs
+
+logger = logs.get_logger()
+
+# httpcore trace events and the phase each one is timed as.
+# DNS resolution happens inside connect_tcp, so it is part of the "connect" phase
+TRACE_PHASES = {
+    'connection.connect_tcp': 'connect',
+    'connection.start_tls': 'tls',
+    'proxy.start_tls': 'tls',
+    'http11.send_request_headers': 'send',
+    'http11.send_request_body': 'send',
+    'http2.send_request_headers': 'send',
+    'http2.send_request_body': 'send',
+    'http11.receive_response_headers': 'wait',
+    'http2.receive_response_headers': 'wait',
+    'http11.receive_response_body': 'receive',
+    'http2.receive_response_body': 'receive',
+}
+PHASES = ('connect', 'proxy_connect', 'tls', 'send', 'wait', 'receive')
+
+
+class LatencyHistogram:
+    """
+    Fixed memory histogram with exponentially sized buckets, 10% apart from 0.1ms to about 3 minutes.
+    Percentiles are estimated to within one bucket
+    """
+    BOUNDS = tuple(0.0001 * 1.1 ** i for i in range(153))
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.BOUNDS) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def record(self, seconds: float):
+        index = bisect.bisect_left(self.BOUNDS, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += seconds
+            self._max = max(self._max, seconds)
+
+    def percentile(self, p: float) -> float | None:
+        """
+        :param p: Percentile between 0 and 100
+        :return: Upper bound of the bucket holding the percentile, None if nothing was recorded yet
+        """
+        with self._lock:
+            if not self._count:
+                return None
+            rank = max(1, math.ceil(p / 100 * self._count))
+            seen = 0
+            for index, count in enumerate(self._counts):
+                seen += count
+                if seen >= rank:
+                    return min(self._max, self.BOUNDS[index]) if index < len(self.BOUNDS) else self._max
+
+    def snapshot(self) -> typing.Dict[str, float | int | None]:
+        return {
+            'count': self._count,
+            'mean': self._sum / self._count if self._count else None,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self._max if self._count else None,
+        }
+
+
+class RequestTimer:
+    """
+    Times each attempt of a request, split into phases from httpcore trace events
+    """
+    def __init__(self, request: Request):
+        self._request = request
+        self._trace_extension = request.extensions.get('trace')
+        self._started: typing.Dict[str, float] = dict()
+        self._start = time.monotonic()
+        self.phases: typing.Dict[str, float] = dict()
+        self.attempt_latencies: typing.List[float] = list()
+        self.total = None
+
+    @property
+    def host(self) -> str:
+        return self._request.url.host
+
+    @contextmanager
+    def install(self, is_async: bool = False):
+        """
+        Registers this timer as the request's httpcore trace extension while the request is sent,
+        chaining any extension already set and restoring it afterwards
+        """
+        self._request.extensions['trace'] = self.atrace if is_async else self.trace
+        try:
+            yield self
+        finally:
+            if self._trace_extension is None:
+                self._request.extensions.pop('trace', None)
+            else:
+                self._request.extensions['trace'] = self._trace_extension
+
+    @contextmanager
+    def attempt(self):
+        self.phases = dict()
+        self._started = dict()
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.attempt_latencies.append(time.monotonic() - start)
+
+    def finish(self):
+        self.total = time.monotonic() - self._start
+
+    def trace(self, event_name: str, info: dict):
+        self._on_event(event_name)
+        if self._trace_extension:
+            self._trace_extension(event_name, info)
+
+    async def atrace(self, event_name: str, info: dict):
+        self._on_event(event_name)
+        if self._trace_extension:
+            await self._trace_extension(event_name, info)
+
+    def _on_event(self, event_name: str):
+        name, _, stage = event_name.rpartition('.')
+        if not (phase := TRACE_PHASES.get(name)):
+            return
+        if stage == 'started':
+            if name == 'proxy.start_tls':  # Everything sent so far was the proxy CONNECT request
+                tunnel = self.phases.pop('send', 0.0) + self.phases.pop('wait', 0.0)
+                self.phases['proxy_connect'] = self.phases.get('proxy_connect', 0.0) + tunnel
+            self._started[name] = time.monotonic()
+        elif (started := self._started.pop(name, None)) is not None:
+            self.phases[phase] = self.phases.get(phase, 0.0) + time.monotonic() - started
+
+
+def copy_untimed(request: Request) -> Request:
+    """
+    Copy of the request without a RequestTimer's trace extension, for sending it alongside the timed request,
+    e.g. as a hedge, without mixing both sends' trace events into the same phases
+    """
+    extensions = dict(request.extensions)
+    if isinstance(timer := getattr(extensions.get('trace'), '__self__', None), RequestTimer):
+        if timer._trace_extension is None:
+            del extensions['trace']
+        else:
+            extensions['trace'] = timer._trace_extension
+    return Request(
+        method=request.method,
+        url=request.url,
+        headers=request.headers,
+        stream=request.stream,
+        extensions=extensions
+    )
+
+
+class HostTimings:
+    def __init__(self):
+        self.total = LatencyHistogram()
+        self.attempt = LatencyHistogram()
+        self.phases = {phase: LatencyHistogram() for phase in PHASES}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+
+    def record(self, timer: RequestTimer, is_error: bool):
+        self.total.record(timer.total)
+        for latency in timer.attempt_latencies:
+            self.attempt.record(latency)
+        for phase, seconds in timer.phases.items():
+            self.phases[phase].record(seconds)
+        with self._lock:
+            self.requests += 1
+            self.retries += max(0, len(timer.attempt_latencies) - 1)
+            self.errors += is_error
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'errors': self.errors,
+            'total': self.total.snapshot(),
+            'attempt': self.attempt.snapshot(),
+            **{phase: histogram.snapshot() for phase, histogram in self.phases.items() if histogram.count},
+        }
+
+
+class TimingRegistry:
+    """
+    Per host latency histograms, shared by every client recording into it.
+    Only the most recently used hosts are kept, so crawling many hosts doesn't grow it without bound
+
+    :param max_hosts: Hosts kept before the least recently used one is dropped
+    """
+    def __init__(self, max_hosts: int = 1024):
+        self._max_hosts = max_hosts
+        self._lock = threading.Lock()
+        self._hosts: OrderedDict[str, HostTimings] = OrderedDict()
+
+    def record(self, timer: RequestTimer, status_code: int | None = None, error: BaseException = None):
+        with self._lock:
+            if host_timings := self._hosts.get(timer.host):
+                self._hosts.move_to_end(timer.host)
+            else:
+                host_timings = self._hosts[timer.host] = HostTimings()
+                if len(self._hosts) > self._max_hosts:
+                    self._hosts.popitem(last=False)
+        host_timings.record(timer, is_error=error is not None)
+        if not logs.is_enabled_for(logging.DEBUG):
+            return
+        logger.debug(
+            f'Request timing',
+            host=timer.host,
+            status_code=status_code,
+            error=type(error).__name__ if error else None,
+            attempts=len(timer.attempt_latencies),
+            attempt_latencies_ms=[round(latency * 1000, 2) for latency in timer.attempt_latencies],
+            total_ms=round(timer.total * 1000, 2),
+            **{f'{phase}_ms': round(seconds * 1000, 2) for phase, seconds in timer.phases.items()},
+        )
+
+    def get_stats(self, host: str = None) -> typing.Dict[str, typing.Any]:
+        """
+        :param host: Limits stats to one host
+        :return: Snapshot of request counts and p50/p95/p99 latencies, in seconds, by host and phase
+        """
+        with self._lock:
+            hosts = dict(self._hosts)
+        if host:
+            return hosts[host].snapshot() if host in hosts else dict()
+        return {h: host_timings.snapshot() for h, host_timings in hosts.items()}
+
+    def log_stats(self):
+        for host, stats in self.get_stats().items():
+            logger.info(f'Latency stats', host=host, **stats)
+
+    def clear(self):
+        with self._lock:
+            self._hosts.clear()
+
+
+REQUEST_TIMINGS = TimingRegistry()
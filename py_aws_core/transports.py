@@ -0,0 +1,184 @@
+import threading
+import time
+import typing
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from httpx import BaseTransport, HTTPTransport, Limits, Proxy, Request, Response, SyncByteStream
+
+from py_aws_core import logs
+
+logger = logs.get_logger()
+
+
+class TransportRegistry:
+    """
+    Process-wide registry of pooled transports keyed by proxy URL and target origin.
+    Short-lived clients borrow a warm transport instead of opening new TCP and TLS connections.
+    Least recently used pools are closed once the registry grows past "max_pools", or once they
+    have been idle for "idle_timeout" seconds, but never while a response is still streaming from them.
+    """
+    @dataclass
+    class Pool:
+        transport: HTTPTransport
+        leases: int = 0
+        last_used: float = field(default_factory=time.monotonic)
+        retired: bool = False  # Closed by clear() while leased, so closed once the last lease is released
+
+    def __init__(self, max_pools: int = 64, idle_timeout: float = 300.0):
+        self._max_pools = max_pools
+        self._idle_timeout = idle_timeout
+        self._pools: OrderedDict[typing.Hashable, TransportRegistry.Pool] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pools)
+
+    def acquire(self, key: typing.Hashable, factory: typing.Callable[[], HTTPTransport]) -> HTTPTransport:
+        with self._lock:
+            if pool := self._pools.get(key):
+                self._pools.move_to_end(key)
+                pool.retired = False
+            else:
+                pool = self._pools[key] = self.Pool(transport=factory())
+                logger.debug(f'Created pooled transport', num_pools=len(self._pools))
+            pool.leases += 1
+            pool.last_used = time.monotonic()
+            self._evict()
+            return pool.transport
+
+    def release(self, key: typing.Hashable):
+        with self._lock:
+            if pool := self._pools.get(key):
+                pool.leases -= 1
+                pool.last_used = time.monotonic()
+                if pool.retired and not pool.leases:
+                    del self._pools[key]
+                    pool.transport.close()
+
+    def clear(self):
+        """
+        Closes every pool. Pools still leased are closed once their last lease is released
+        """
+        with self._lock:
+            for key, pool in list(self._pools.items()):
+                if pool.leases:
+                    pool.retired = True
+                    continue
+                del self._pools[key]
+                pool.transport.close()
+
+    def _evict(self):
+        now = time.monotonic()
+        for key, pool in list(self._pools.items()):
+            over_capacity = len(self._pools) > self._max_pools
+            is_expired = now - pool.last_used > self._idle_timeout
+            if not (over_capacity or is_expired):
+                break
+            if pool.leases:
+                continue
+            del self._pools[key]
+            pool.transport.close()
+            logger.debug(f'Evicted pooled transport', over_capacity=over_capacity, is_expired=is_expired)
+
+
+TRANSPORT_REGISTRY = TransportRegistry()
+
+
+def get_proxy_key(proxy: str | Proxy | None) -> str | None:
+    """
+    Proxy URL including credentials, since httpx moves them out of the URL of a Proxy
+    """
+    if not proxy:
+        return None
+    if not isinstance(proxy, Proxy):
+        return str(proxy)
+    if not proxy.auth:
+        return str(proxy.url)
+    username, password = proxy.auth
+    return str(proxy.url.copy_with(username=username, password=password))
+
+
+class _ReleasingStream(SyncByteStream):
+    """Returns the pool lease once the response body has been consumed or closed"""
+    def __init__(self, stream: SyncByteStream, release: typing.Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    def __iter__(self) -> typing.Iterator[bytes]:
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+class SharedPoolTransport(BaseTransport):
+    """
+    Transport that routes each request through a transport borrowed from a TransportRegistry.
+    Closing it leaves the pooled connections open for the next client with the same proxy, origin and settings.
+    """
+    def __init__(
+        self,
+        proxy: str | Proxy = None,
+        verify=True,
+        cert=None,
+        http1: bool = True,
+        http2: bool = False,
+        limits: Limits = None,
+        trust_env: bool = True,
+        registry: TransportRegistry = None,
+    ):
+        self._proxy = proxy
+        self._verify = verify
+        self._cert = cert
+        self._http1 = http1
+        self._http2 = http2
+        self._trust_env = trust_env
+        self._limits = limits or Limits()
+        self._registry = TRANSPORT_REGISTRY if registry is None else registry
+        self._proxy_key = get_proxy_key(proxy)
+
+    def handle_request(self, request: Request) -> Response:
+        url = request.url
+        key = (
+            self._proxy_key,
+            url.scheme,
+            url.host,
+            url.port,
+            self._verify,
+            self._cert,
+            self._http1,
+            self._http2,
+            self._trust_env,
+            self._limits.max_connections,
+            self._limits.max_keepalive_connections,
+            self._limits.keepalive_expiry,
+        )
+        transport = self._registry.acquire(key, factory=self._new_transport)
+        try:
+            response = transport.handle_request(request)
+        except BaseException:
+            self._registry.release(key)
+            raise
+        response.stream = _ReleasingStream(response.stream, release=lambda: self._registry.release(key))
+        return response
+
+    def close(self):
+        """Pooled transports are owned by the registry"""
+
+    def _new_transport(self) -> HTTPTransport:
+        return HTTPTransport(
+            proxy=self._proxy,
+            verify=self._verify,
+            cert=self._cert,
+            http1=self._http1,
+            http2=self._http2,
+            limits=self._limits,
+            trust_env=self._trust_env,
+        )
@@ -6,8 +6,10 @@ import time
 import typing
 import uuid
 from datetime import datetime, timezone, timedelta, UTC
-from importlib.resources import files
-from pathlib import Path
+
+from py_aws_core import logs
+
+T = typing.TypeVar('T')
 
 
 def build_lambda_response(
@@ -94,11 +96,27 @@ def sleep(seconds: float) -> None:
     return time.sleep(seconds)
 
 
+async def async_sleep(seconds: float) -> None:
+    import asyncio  # Already loaded by the running event loop, and slow to import on a cold start
+
+    return await asyncio.sleep(seconds)
+
+
+async def to_thread(func: typing.Callable[..., T], *args, **kwargs) -> T:
+    """
+    Runs a blocking call in the default executor, see async_sleep for why asyncio is imported here
+    """
+    import asyncio
+
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+
 def get_uuid_hex() -> str:
     return uuid.uuid4().hex
 
 
 def get_environment_variable(secret_name: str, default=None) -> str:
+    logs.load_env()
     return os.environ.get(secret_name, default=default)
 
 
@@ -128,6 +146,9 @@ def to_utf8_bytes(s: str) -> bytes:
 
 
 def import_all_package_modules(package: str):
+    from importlib.resources import files
+    from pathlib import Path
+
     f = files(package)
     modules = [fp for fp in f.iterdir() if fp.is_file and fp.name.endswith('.py')]
     for fp in modules:
@@ -0,0 +1,190 @@
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.config import Config
+from botocore.stub import Stubber
+
+from py_aws_core import logs
+from py_aws_core.boto_clients import BOTO_CLIENTS, BOTO_SESSIONS, BotoClientRegistry, BotoProfile, CognitoClient, DynamoTable, SSMClient, \
+    get_boto_profile
+from py_aws_core.testing import BaseTestFixture
+
+
+class DynamoTableTests(BaseTestFixture):
+    def test_caches_table(self):
+        ddb_secrets = self.MockDynamoDBSecretsService()
+        with mock.patch.object(ddb_secrets, 'get_table_name', return_value='TEST_TABLE') as mock_get_table_name:
+            dynamo_table = DynamoTable(ddb_secrets=ddb_secrets)
+            table = dynamo_table.table
+            self.assertIs(dynamo_table.table, table)
+            self.assertEqual(dynamo_table.table_name, 'TEST_TABLE')
+            self.assertEqual(table.name, 'TEST_TABLE')
+            self.assertEqual(mock_get_table_name.call_count, 1)
+
+            mock_get_table_name.return_value = 'ROTATED_TABLE'
+            dynamo_table.invalidate()
+            self.assertEqual(dynamo_table.table.name, 'ROTATED_TABLE')
+            self.assertEqual(mock_get_table_name.call_count, 2)
+
+    def test_low_level_get_item(self):
+        dynamo_table = DynamoTable(ddb_secrets=self.MockDynamoDBSecretsService())
+        self.assertIs(dynamo_table.client, DynamoTable(ddb_secrets=self.MockDynamoDBSecretsService()).client)
+
+        key = {'PK': {'S': 'SESSION#1'}, 'SK': {'S': 'SESSION#1'}}
+        item = key | {'Count': {'N': '2'}}
+        stubber = Stubber(dynamo_table.client)
+        stubber.add_response(
+            method='get_item',
+            service_response={'Item': item},
+            expected_params={'TableName': 'TEST_TABLE', 'Key': key}
+        )
+        stubber.activate()
+
+        response = dynamo_table.get_item(key=key)
+        self.assertEqual(response['Item'], item)
+        stubber.assert_no_pending_responses()
+
+
+class ThreadSafetyTests(BaseTestFixture):
+    class RawBody:
+        def __init__(self, body: bytes):
+            self._body = body
+
+        def stream(self, **kwargs):
+            yield self._body
+
+    def test_session_per_thread(self):
+        session = BOTO_SESSIONS.get_session()
+        self.assertIs(BOTO_SESSIONS.get_session(), session)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            self.assertIsNot(executor.submit(BOTO_SESSIONS.get_session).result(), session)
+
+    @mock.patch.dict(os.environ, {'AWS_ACCESS_KEY_ID': 'test', 'AWS_SECRET_ACCESS_KEY': 'test'})
+    def test_concurrent_use(self):
+        # Stubber queues responses and is not thread-safe, so requests are answered by a "before-send" hook instead
+        def fake_send(request, **kwargs) -> AWSResponse:
+            key = json.loads(request.body)['Key']
+            body = json.dumps({'Item': key | {'Count': {'N': '1'}}}).encode()
+            return AWSResponse(request.url, 200, {'Content-Type': 'application/x-amz-json-1.0'}, self.RawBody(body))
+
+        BOTO_SESSIONS.reset()  # Requests are signed before the hook answers them, so sessions must pick up the test credentials
+        self.addCleanup(BOTO_SESSIONS.reset)
+        dynamo_table = DynamoTable(ddb_secrets=self.MockDynamoDBSecretsService(), boto_profile='bulk')
+        dynamo_table.client.meta.events.register('before-send.dynamodb', fake_send)
+        cognito_client = CognitoClient().boto_client
+        start = threading.Barrier(8)
+
+        def work(worker: int) -> list[str]:
+            start.wait()
+            table = dynamo_table.table
+            pks = list()
+            for i in range(25):
+                self.assertIs(CognitoClient().boto_client, cognito_client)
+                self.assertIs(dynamo_table.table, table)
+                response = dynamo_table.get_item(key={'PK': {'S': f'{worker}#{i}'}})
+                pks.append(response['Item']['PK']['S'])
+            return [table, pks]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(work, range(8)))
+
+        tables = [table for table, _ in results]
+        self.assertEqual(len({id(t) for t in tables}), 8)
+        self.assertTrue(all(t.name == 'TEST_TABLE' for t in tables))
+        for worker, (_, pks) in enumerate(results):
+            self.assertEqual(pks, [f'{worker}#{i}' for i in range(25)])
+        self.assertEqual(len(BOTO_CLIENTS), 2)
+
+
+class BotoClientRegistryTests(BaseTestFixture):
+    def test_reuses_clients(self):
+        self.assertIs(CognitoClient().boto_client, CognitoClient().boto_client)
+        self.assertIsNot(CognitoClient().boto_client, SSMClient().boto_client)
+        self.assertEqual(len(BOTO_CLIENTS), 2)
+
+        cognito_client = CognitoClient().boto_client
+        BOTO_CLIENTS.clear()
+        self.assertIsNot(CognitoClient().boto_client, cognito_client)
+
+    def test_key(self):
+        registry = BotoClientRegistry()
+        session = boto3.Session(region_name='us-west-2')
+        client = registry.get_client(session, 'ssm', config=Config(read_timeout=1))
+        self.assertIs(registry.get_client(session, 'ssm', config=Config(read_timeout=1)), client)
+        self.assertIsNot(registry.get_client(session, 'ssm', config=Config(read_timeout=2)), client)
+        self.assertIsNot(registry.get_client(session, 'ssm', config=Config(read_timeout=1), region_name='us-east-1'), client)
+        self.assertEqual(len(registry), 3)
+
+    def test_session_key(self):
+        registry = BotoClientRegistry()
+        sessions = [
+            boto3.Session(region_name='us-west-2', aws_access_key_id=key, aws_secret_access_key='secret')
+            for key in ('AKIAFIRST', 'AKIAFIRST', 'AKIASECOND')
+        ]
+        clients = [registry.get_client(session, 'ssm') for session in sessions]
+        self.assertIs(clients[0], clients[1])
+        self.assertIsNot(clients[0], clients[2])
+        self.assertEqual(len(registry), 2)
+
+
+class BotoSessionManagerTests(BaseTestFixture):
+    @mock.patch.object(logs, '_is_env_loaded', False)
+    def test_loads_env_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            env_path = os.path.join(directory, '.env')
+            with open(env_path, 'w') as f:
+                f.write('AWS_DEFAULT_REGION=eu-central-1\n')
+            environ = {k: v for k, v in os.environ.items() if k not in ('AWS_DEFAULT_REGION', 'AWS_REGION')}
+            with mock.patch.dict(os.environ, environ, clear=True), mock.patch('dotenv.main.find_dotenv', return_value=env_path):
+                BOTO_SESSIONS.reset()
+                self.addCleanup(BOTO_SESSIONS.reset)
+                self.assertEqual(SSMClient().boto_client.meta.region_name, 'eu-central-1')
+
+
+class BotoProfileTests(BaseTestFixture):
+    def test_default_profile(self):
+        config = CognitoClient().boto_client.meta.config
+        self.assertEqual(config.connect_timeout, 4.9)
+        self.assertEqual(config.read_timeout, 4.9)
+        self.assertEqual(config.retries['total_max_attempts'], 2)
+        self.assertEqual(config.max_pool_connections, 10)
+
+    def test_instance_profile(self):
+        dynamo_table = DynamoTable(ddb_secrets=self.MockDynamoDBSecretsService(), boto_profile='bulk')
+        self.assertEqual(dynamo_table.max_pool_connections, 50)
+        config = dynamo_table.client.meta.config
+        self.assertEqual(config.retries['mode'], 'adaptive')
+        self.assertTrue(config.tcp_keepalive)
+
+        ssm_client = SSMClient(boto_profile=BotoProfile(max_pool_connections=25))
+        self.assertEqual(ssm_client.max_pool_connections, 25)
+        self.assertIsNot(ssm_client.boto_client, SSMClient().boto_client)
+
+    def test_class_profile(self):
+        class FastSSMClient(SSMClient):
+            BOTO_PROFILE = 'latency_sensitive'
+
+        config = FastSSMClient().boto_client.meta.config
+        self.assertEqual(config.read_timeout, 2.0)
+        self.assertEqual(config.retries['mode'], 'standard')
+
+    def test_timeout_overrides(self):
+        class SlowSSMClient(SSMClient):
+            CLIENT_READ_TIMEOUT = 30
+
+        config = SlowSSMClient().boto_client.meta.config
+        self.assertEqual(config.connect_timeout, 4.9)
+        self.assertEqual(config.read_timeout, 30)
+        self.assertEqual(config.retries['total_max_attempts'], 2)
+        with self.assertRaises(ValueError):
+            SlowSSMClient(boto_profile='bulk')
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            get_boto_profile('turbo')
@@ -1,7 +1,10 @@
-from botocore.stub import Stubber
+from unittest import IsolatedAsyncioTestCase
+
+from botocore.stub import ANY, Stubber
 
 from py_aws_core.boto_clients import DynamoTable
-from py_aws_core.db_service import DBService
+from py_aws_core.db_interface import IAsyncDatabase, IDatabase
+from py_aws_core.db_service import AsyncDBService, DBService
 from py_aws_core.testing import BaseTestFixture
 
 
@@ -74,8 +77,97 @@ class GetOrCreateSessionTests(BaseTestFixture):
         session_service = DBService(table=table)
         session = session_service.update_session_cookies(
             session_id='10c7676f77a34605b5ed76c210369c66',
+            return_values='ALL_NEW',
             b64_cookies=b"gASVigMAAAAAAABdlCiMDmh0dHAuY29va2llamFylIwGQ29va2lllJOUKYGUfZQojAd2ZXJzaW9u\nlEsAjARuYW1llIwISHR0cE9ubHmUjAV2YWx1ZZROjARwb3J0lE6MDnBvcnRfc3BlY2lmaWVklImM\nBmRvbWFpbpSMHWFwcHMubWlncmFjaW9uY29sb21iaWEuZ292LmNvlIwQZG9tYWluX3NwZWNpZmll\nZJSJjBJkb21haW5faW5pdGlhbF9kb3SUiYwEcGF0aJSMEC9wcmUtcmVnaXN0cm8vZXOUjA5wYXRo\nX3NwZWNpZmllZJSJjAZzZWN1cmWUiIwHZXhwaXJlc5ROjAdkaXNjYXJklIiMB2NvbW1lbnSUTowL\nY29tbWVudF91cmyUTowHcmZjMjEwOZSJjAVfcmVzdJR9lIwIU2FtZVNpdGWUjAZTdHJpY3SUc3Vi\naAMpgZR9lChoBksAaAeMFi5jaGVja21pZy5BbnRpZm9yZ2VyeS6UaAmMm0NmREo4Rl92WjdwbkRD\ncEFnRUdtTDFtSklUSVdld0Y4dXdtTDVaSE5uUTZLN1lDellPQmpEX21UUTZBY1l0YkNkRUFRcnRD\nUnVkNGM5cDFTNE1BUTFKWWdhRFZ0OEtFLWFJbFN3NjJxR21XWEFYcVBMcjZCay1HQVZ0djFjN0lO\nMk13M2ZKRFBmLWlnblZvdFBVNVVhd3JYZWFBlGgKTmgLiWgMjB1hcHBzLm1pZ3JhY2lvbmNvbG9t\nYmlhLmdvdi5jb5RoDoloD4loEIwNL3ByZS1yZWdpc3Ryb5RoEohoE4hoFEowwqVmaBWJaBZOaBdO\naBiJaBl9lCiMCHNhbWVzaXRllIwGc3RyaWN0lIwIaHR0cG9ubHmUTnV1YmgDKYGUfZQoaAZLAGgH\njAdST1VURUlElGgJjAYubm9kZTCUaApOaAuJaAyMHWFwcHMubWlncmFjaW9uY29sb21iaWEuZ292\nLmNvlGgOiWgPiWgQjAEvlGgSiGgTiGgUTmgViGgWTmgXTmgYiWgZfZSMCEh0dHBPbmx5lE5zdWJo\nAymBlH2UKGgGSwBoB4wNUk9VVEVJRFBSRVJFR5RoCYwGLm5vZGUwlGgKTmgLiWgMjB1hcHBzLm1p\nZ3JhY2lvbmNvbG9tYmlhLmdvdi5jb5RoDoloD4loEGgsaBKIaBOJaBROaBWIaBZOaBdOaBiJaBl9\nlHViZS4=\n"
         )
         self.assertEqual(len(session.Base64Cookies.value), 1241)
         self.assertEqual(session.SessionId, '10c7676f77a34605b5ed76c210369c66')
         stubber.assert_no_pending_responses()
+
+    def test_update_session_no_return_values(self):
+        ddb_secrets = self.MockDynamoDBSecretsService()
+        table = DynamoTable(ddb_secrets=ddb_secrets).table
+        stubber = Stubber(table.meta.client)
+        stubber.add_response(
+            'update_item',
+            dict(),
+            expected_params={
+                'TableName': 'TEST_TABLE',
+                'Key': ANY,
+                'UpdateExpression': 'SET #b64 = :b64, #mda = :mda, #cm = :cm',
+                'ExpressionAttributeNames': {'#b64': 'Base64Cookies', '#mda': 'ModifiedAt', '#cm': 'CookieMap'},
+                'ExpressionAttributeValues': {':b64': b'', ':mda': ANY, ':cm': {}},
+                'ReturnValues': 'NONE',
+            }
+        )
+        stubber.activate()
+
+        session_service = DBService(table=table)
+        session = session_service.update_session_cookies(session_id='10c7676f77a34605b5ed76c210369c66', b64_cookies=b'')
+        self.assertIsNone(session)
+        stubber.assert_no_pending_responses()
+
+    def test_update_session_cookie_delta(self):
+        ddb_secrets = self.MockDynamoDBSecretsService()
+        table = DynamoTable(ddb_secrets=ddb_secrets).table
+        stubber = Stubber(table.meta.client)
+        stubber.add_response(
+            'update_item',
+            dict(),
+            expected_params={
+                'TableName': 'TEST_TABLE',
+                'Key': ANY,
+                'UpdateExpression': 'SET #mda = :mda, #cm.#s0 = :s0 REMOVE #b64, #cm.#r0',
+                'ExpressionAttributeNames': {
+                    '#cm': 'CookieMap',
+                    '#b64': 'Base64Cookies',
+                    '#mda': 'ModifiedAt',
+                    '#s0': 'www.example.com|/|cookie_1',
+                    '#r0': 'www.example.com|/|cookie_2',
+                },
+                'ExpressionAttributeValues': {':mda': ANY, ':s0': b'value_1'},
+                'ReturnValues': 'NONE',
+            }
+        )
+        stubber.activate()
+
+        session_service = DBService(table=table)
+        session = session_service.update_session_cookie_delta(
+            session_id='10c7676f77a34605b5ed76c210369c66',
+            set_cookies={'www.example.com|/|cookie_1': b'value_1'},
+            remove_keys=['www.example.com|/|cookie_2']
+        )
+        self.assertIsNone(session)
+        stubber.assert_no_pending_responses()
+
+
+class DatabaseInterfaceTests(IsolatedAsyncioTestCase, BaseTestFixture):
+    class BlobOnlyDatabase(IDatabase):
+        get_or_create_session = get_session_item = put_session_item = update_session_cookies = None
+
+    class AsyncBlobOnlyDatabase(IAsyncDatabase):
+        get_or_create_session = get_session_item = put_session_item = update_session_cookies = None
+
+    async def test_cookie_delta_is_optional(self):
+        with self.assertRaisesRegex(NotImplementedError, 'BlobOnlyDatabase does not implement update_session_cookie_delta'):
+            self.BlobOnlyDatabase().update_session_cookie_delta(session_id='1', set_cookies={}, remove_keys=[])
+        with self.assertRaisesRegex(NotImplementedError, 'AsyncBlobOnlyDatabase does not implement'):
+            await self.AsyncBlobOnlyDatabase().update_session_cookie_delta(session_id='1', set_cookies={}, remove_keys=[])
+
+
+class AsyncDBServiceTests(IsolatedAsyncioTestCase, BaseTestFixture):
+    async def test_get_session_item(self):
+        session_json = self.get_resource_json('db#get_session_item.json', path=self.TEST_DB_RESOURCES_PATH)
+        session_json['Item']['Base64Cookies']['B'] = self.to_utf8_bytes(session_json['Item']['Base64Cookies']['B'])
+
+        ddb_secrets = self.MockDynamoDBSecretsService()
+        table = DynamoTable(ddb_secrets=ddb_secrets).table
+        stubber = Stubber(table.meta.client)
+        stubber.add_response(method='get_item', service_response=session_json)
+        stubber.activate()
+
+        session_service = AsyncDBService(table=table)
+        session = await session_service.get_session_item(session_id='10c7676f77a34605b5ed76c210369c66')
+        self.assertEqual(len(session.Base64Cookies.value), 1241)
+
+        stubber.assert_no_pending_responses()
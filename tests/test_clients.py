@@ -1,12 +1,15 @@
+import asyncio
+import threading
+import time
 from http.cookiejar import CookieJar
-from unittest import mock
+from unittest import IsolatedAsyncioTestCase, mock
 
 from botocore.stub import Stubber
-from httpx import HTTPStatusError, NetworkError, Request, Response, codes
+from httpx import ByteStream, ConnectError, HTTPStatusError, MockTransport, NetworkError, Request, Response, codes
 
-from py_aws_core import dynamodb_entities, exceptions
+from py_aws_core import dynamodb_entities, exceptions, utils
 from py_aws_core.boto_clients import DynamoTable
-from py_aws_core.clients import RetryClient, SessionPersistClient
+from py_aws_core.clients import POOL_PROFILES, AsyncRetryClient, CookiePersistMode, AsyncSessionPersistClient, RetryClient, SessionPersistClient
 from py_aws_core.db_service import DBService
 from py_aws_core.exceptions import APIException
 from py_aws_core.testing import BaseTestFixture
@@ -50,6 +53,42 @@ class RetryClientTests(BaseTestFixture):
                 h_client.get('https://example.com')
         self.assertEqual(mock_send.call_count, 1)
 
+    @mock.patch.object(RetryClient, '_send_handling_auth')
+    def test_non_idempotent_method(self, mock_send):
+        mock_send.side_effect = NetworkError(message='')
+        with self.assertRaises(NetworkError):
+            with RetryClient() as h_client:
+                h_client.post('https://example.com')
+        self.assertEqual(mock_send.call_count, 1)
+
+        mock_send.reset_mock()
+        mock_send.side_effect = ConnectError(message='')  # Never reached the server
+        with self.assertRaises(ConnectError):
+            with RetryClient() as h_client:
+                h_client.post('https://example.com')
+        self.assertEqual(mock_send.call_count, 4)
+
+    def test_retryable_status_code(self):
+        responses = iter([
+            Response(status_code=codes.TOO_MANY_REQUESTS, headers={'Retry-After': '2'}),
+            Response(status_code=codes.OK, text='ok'),
+        ])
+        with mock.patch('py_aws_core.utils.sleep', return_value=None) as mocked_sleep:
+            with RetryClient(transport=MockTransport(lambda request: next(responses))) as client:
+                r = client.get('https://example.com')
+        self.assertEqual(r.text, 'ok')
+        mocked_sleep.assert_called_once_with(2.0)
+
+        requests = list()
+
+        def handler(request: Request) -> Response:
+            requests.append(request)
+            return Response(status_code=codes.SERVICE_UNAVAILABLE)
+
+        with RetryClient(transport=MockTransport(handler)) as client, self.assertRaises(HTTPStatusError):
+            client.get('https://example.com')
+        self.assertEqual(len(requests), 4)
+
     def test_ok_cookies(self):
         client = RetryClient()
         self.assertEqual(len(client.cookies), 0)
@@ -87,6 +126,20 @@ class RetryClientTests(BaseTestFixture):
         self.assertEqual(r_cookie_2.name, 'cookie_2')
         self.assertEqual(r_cookie_2.value, 'value_2')
 
+    def test_pool_profile(self):
+        client = RetryClient(pool_profile='low_footprint')
+        pool = client._transport._pool
+        self.assertEqual(pool._max_connections, POOL_PROFILES['low_footprint'].max_connections)
+        self.assertEqual(pool._keepalive_expiry, POOL_PROFILES['low_footprint'].keepalive_expiry)
+        self.assertFalse(pool._http2)
+
+        with self.assertRaises(ValueError):
+            RetryClient(pool_profile='unknown')
+
+    def test_http2(self):
+        client = RetryClient(http2=True)
+        self.assertTrue(client._transport._pool._http2)
+
     def test_cookie_errors(self):
         client = RetryClient()
 
@@ -131,3 +184,281 @@ class SessionPersistClientTests(BaseTestFixture):
         self.assertEqual(mocked_read_session.call_count, 1)
 
         stubber.assert_no_pending_responses()
+
+    def test_skips_unchanged_session_write(self):
+        session_service = mock.Mock()
+        cookie = self.create_test_cookie(name='cookie_1', value='value_1')
+        cookie.expires = utils.add_seconds_to_current_unix_timestamp(seconds=3600)
+        cookie_jar = CookieJar()
+        cookie_jar.set_cookie(cookie)
+        b64_cookies = RetryClient(cookies=cookie_jar).encoded_cookies
+        session_service.get_or_create_session.return_value = dynamodb_entities.Session(
+            {'Base64Cookies': mock.Mock(value=b64_cookies)}
+        )
+
+        with SessionPersistClient(session_service=session_service) as client:
+            self.assertEqual(len(client.cookies.jar), 1)
+            self.assertFalse(client.is_session_dirty)
+        self.assertEqual(session_service.update_session_cookies.call_count, 0)
+
+        with SessionPersistClient(session_service=session_service) as client:
+            client.cookies.set('cookie_2', 'value_2', domain='www.example.com')
+            self.assertTrue(client.is_session_dirty)
+        self.assertEqual(session_service.update_session_cookies.call_count, 1)
+
+    def test_lazy_skips_unused_session(self):
+        session_service = mock.Mock()
+        with SessionPersistClient(session_service=session_service, lazy=True):
+            pass
+        self.assertEqual(session_service.get_or_create_session.call_count, 0)
+        self.assertEqual(session_service.update_session_cookies.call_count, 0)
+
+    def test_lazy_restores_cookies_on_first_request(self):
+        cookie = self.create_test_cookie(name='cookie_1', value='value_1')
+        cookie.version = 0  # Netscape cookie, so the default policy sends it
+        cookie.expires = utils.add_seconds_to_current_unix_timestamp(seconds=3600)
+        cookie_jar = CookieJar()
+        cookie_jar.set_cookie(cookie)
+        session_service = mock.Mock()
+        session_service.get_or_create_session.return_value = dynamodb_entities.Session(
+            {'Base64Cookies': mock.Mock(value=RetryClient(cookies=cookie_jar).encoded_cookies)}
+        )
+        requests = list()
+
+        def handler(request: Request):
+            requests.append(request)
+            return Response(status_code=codes.OK)
+
+        with SessionPersistClient(session_service=session_service, lazy=True, transport=MockTransport(handler)) as c:
+            self.assertEqual(session_service.get_or_create_session.call_count, 0)
+            c.get('https://www.example.com/')
+            c.get('https://www.example.com/')
+
+        self.assertEqual(session_service.get_or_create_session.call_count, 1)
+        self.assertEqual([r.headers['Cookie'] for r in requests], ['cookie_1=value_1', 'cookie_1=value_1'])
+        self.assertEqual(session_service.update_session_cookies.call_count, 0)
+
+    def test_lazy_merges_cookies_set_before_first_request(self):
+        cookie = self.create_test_cookie(name='cookie_1', value='value_1')
+        cookie.version = 0
+        cookie.expires = utils.add_seconds_to_current_unix_timestamp(seconds=3600)
+        cookie_jar = CookieJar()
+        cookie_jar.set_cookie(cookie)
+        session_service = mock.Mock()
+        session_service.get_or_create_session.return_value = dynamodb_entities.Session(
+            {'Base64Cookies': mock.Mock(value=RetryClient(cookies=cookie_jar).encoded_cookies)}
+        )
+        requests = list()
+
+        def handler(request: Request):
+            requests.append(request)
+            return Response(status_code=codes.OK)
+
+        with SessionPersistClient(session_service=session_service, lazy=True, transport=MockTransport(handler)) as c:
+            c.cookies.set('cookie_2', 'value_2', domain='www.example.com')
+            c.get('https://www.example.com/', headers={'Cookie': 'cookie_1=override; cookie_3=value_3'})
+            c.get('https://www.example.com/')
+
+        self.assertEqual(
+            [r.headers['Cookie'] for r in requests],
+            ['cookie_1=override; cookie_2=value_2; cookie_3=value_3', 'cookie_1=value_1; cookie_2=value_2']
+        )
+
+    def test_delta_persist_mode(self):
+        cookie_jar = CookieJar()
+        for name in ('cookie_1', 'cookie_2', 'cookie_3'):
+            cookie = self.create_test_cookie(name=name, value='value')
+            cookie.expires = utils.add_seconds_to_current_unix_timestamp(seconds=3600)
+            cookie_jar.set_cookie(cookie)
+        cookie_map = RetryClient(cookies=cookie_jar).encoded_cookie_map
+        session_service = mock.Mock()
+        session_service.get_or_create_session.return_value = dynamodb_entities.Session(
+            {'CookieMap': {k: mock.Mock(value=v) for k, v in cookie_map.items()}}
+        )
+
+        with SessionPersistClient(session_service=session_service, persist_mode=CookiePersistMode.DELTA) as client:
+            self.assertEqual(len(client.cookies.jar), 3)
+            client.cookies.set('cookie_1', 'rotated', domain='www.example.com')
+            client.cookies.delete('cookie_2', domain='www.example.com', path='/')
+            client.cookies.set('cookie_4', 'value', domain='www.example.com')
+
+        self.assertEqual(session_service.update_session_cookies.call_count, 0)
+        kwargs = session_service.update_session_cookie_delta.call_args.kwargs
+        self.assertEqual(set(kwargs['set_cookies']), {'www.example.com|/|cookie_1', 'www.example.com|/|cookie_4'})
+        self.assertEqual(kwargs['remove_keys'], ['www.example.com|/|cookie_2'])
+
+    def test_delta_persist_mode_migrates_blob(self):
+        cookie = self.create_test_cookie(name='cookie_1', value='value_1')
+        cookie.expires = utils.add_seconds_to_current_unix_timestamp(seconds=3600)
+        cookie_jar = CookieJar()
+        cookie_jar.set_cookie(cookie)
+        session_service = mock.Mock()
+        session_service.get_or_create_session.return_value = dynamodb_entities.Session(
+            {'Base64Cookies': mock.Mock(value=RetryClient(cookies=cookie_jar).b64_encoded_cookies), 'CookieMap': {}}
+        )
+
+        with SessionPersistClient(session_service=session_service, persist_mode=CookiePersistMode.DELTA) as client:
+            self.assertEqual(len(client.cookies.jar), 1)
+            client.write_session(session_id=client.session_id)
+
+        kwargs = session_service.update_session_cookie_delta.call_args.kwargs
+        self.assertEqual(list(kwargs['set_cookies']), ['www.example.com|/|cookie_1'])
+        self.assertEqual(kwargs['remove_keys'], [])
+
+
+class FetchManyTests(BaseTestFixture):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.mocked_sleep = mock.patch('py_aws_core.utils.sleep', return_value=None).start()
+
+    def setUp(self):
+        super().setUp()
+        self.lock = threading.Lock()
+        self.state = {'in_flight': 0, 'max_in_flight': 0}
+
+    def handler(self, request: Request):
+        with self.lock:
+            self.state['in_flight'] += 1
+            self.state['max_in_flight'] = max(self.state['max_in_flight'], self.state['in_flight'])
+        try:
+            index = int(request.url.path.strip('/'))
+            if index == 3:
+                raise ConnectError(message='down', request=request)
+            time.sleep(0.002 * (10 - index))  # Earlier requests finish last
+            return Response(status_code=codes.OK, stream=ByteStream(str(index).encode()))
+        finally:
+            with self.lock:
+                self.state['in_flight'] -= 1
+
+    def test_completion_order(self):
+        with RetryClient(transport=MockTransport(self.handler)) as client:
+            results = list(client.fetch_many((f'https://example.com/{i}' for i in range(10)), concurrency=4))
+
+        self.assertEqual(sorted(r.index for r in results), list(range(10)))
+        self.assertNotEqual([r.index for r in results], list(range(10)))
+        self.assertLessEqual(self.state['max_in_flight'], 4)
+
+        failed = [r for r in results if not r.ok]
+        self.assertEqual([r.index for r in failed], [3])
+        self.assertIsInstance(failed[0].error, ConnectError)
+
+    def test_input_order(self):
+        with RetryClient(transport=MockTransport(self.handler)) as client:
+            requests = [client.build_request('GET', f'https://example.com/{i}') for i in range(10)]
+            results = list(client.fetch_many(requests, concurrency=4, ordered=True))
+
+        self.assertEqual([r.index for r in results], list(range(10)))
+        self.assertEqual([r.request for r in results], requests)
+        self.assertEqual(results[5].response.read(), b'5')
+
+    def test_close_does_not_wait_for_requests_in_flight(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def handler(request):
+            if request.url.path != '/0':
+                release.wait(timeout=5)
+            return Response(status_code=codes.OK)
+
+        with RetryClient(transport=MockTransport(handler)) as client:
+            results = client.fetch_many((f'https://example.com/{i}' for i in range(10)), concurrency=4)
+            self.assertEqual(next(results).index, 0)
+            start = time.monotonic()
+            results.close()
+            self.assertLess(time.monotonic() - start, 1)
+            release.set()
+
+
+class AsyncRetryClientTests(IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.request = Request(url='', method='')  # Must add a non null request to avoid raising Runtime exception
+        cls.mocked_sleep = mock.patch('py_aws_core.utils.async_sleep', return_value=None).start()
+
+    @mock.patch.object(AsyncRetryClient, '_send_handling_auth')
+    async def test_ok(self, mock_send):
+        mock_send.return_value = Response(
+            request=self.request,
+            status_code=codes.OK,
+            text='ok'
+        )
+        async with AsyncRetryClient() as retry_client:
+            await retry_client.get('http://example.com')
+            self.assertEqual(mock_send.call_count, 1)
+
+    @mock.patch.object(AsyncRetryClient, '_send_handling_auth')
+    async def test_retryable_exception(self, mock_send):
+        mock_send.side_effect = NetworkError(message='')
+        with self.assertRaises(NetworkError):
+            async with AsyncRetryClient() as h_client:
+                await h_client.get('https://example.com')
+        self.assertEqual(mock_send.call_count, 4)
+
+    async def test_retryable_status_code(self):
+        responses = iter([
+            Response(status_code=codes.SERVICE_UNAVAILABLE, headers={'Retry-After': '3'}),
+            Response(status_code=codes.OK, text='ok'),
+        ])
+        with mock.patch('py_aws_core.utils.async_sleep', return_value=None) as mocked_sleep:
+            async with AsyncRetryClient(transport=MockTransport(lambda request: next(responses))) as client:
+                r = await client.get('https://example.com')
+        self.assertEqual(r.text, 'ok')
+        mocked_sleep.assert_called_once_with(3.0)
+
+    @mock.patch.object(AsyncRetryClient, '_send_handling_auth')
+    async def test_non_retryable_http_status_code(self, mock_send):
+        response = Response(
+            request=self.request,
+            status_code=404,  # Non-retryable
+        )
+        mock_send.side_effect = HTTPStatusError(message='test_123', request=self.request, response=response)
+        with self.assertRaises(APIException):
+            async with AsyncRetryClient() as h_client:
+                await h_client.get('https://example.com')
+        self.assertEqual(mock_send.call_count, 1)
+
+
+class AsyncSessionPersistClientTests(IsolatedAsyncioTestCase):
+    async def test_ok(self):
+        session_service = mock.AsyncMock()
+        session_service.get_or_create_session.return_value = dynamodb_entities.Session(dict())
+
+        async with AsyncSessionPersistClient(session_service=session_service, session_id='abc') as client:
+            self.assertEqual(len(client.cookies.jar), 0)
+
+        session_service.get_or_create_session.assert_awaited_once_with(session_id='abc')
+        self.assertEqual(session_service.update_session_cookies.await_count, 0)  # Cookie jar unchanged
+
+    async def test_writes_changed_cookies(self):
+        session_service = mock.AsyncMock()
+        session_service.get_or_create_session.return_value = dynamodb_entities.Session(dict())
+
+        async with AsyncSessionPersistClient(session_service=session_service) as client:
+            client.cookies.set('cookie_1', 'value_1', domain='www.example.com')
+
+        self.assertEqual(session_service.update_session_cookies.await_count, 1)
+
+
+class AsyncFetchManyTests(IsolatedAsyncioTestCase):
+    async def test_fetch_many(self):
+        state = {'in_flight': 0, 'max_in_flight': 0}
+
+        async def handler(request: Request):
+            state['in_flight'] += 1
+            state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+            try:
+                index = int(request.url.path.strip('/'))
+                await asyncio.sleep(0.002 * (10 - index))
+                return Response(status_code=codes.OK, text=str(index))
+            finally:
+                state['in_flight'] -= 1
+
+        async with AsyncRetryClient(transport=MockTransport(handler)) as client:
+            urls = [f'https://example.com/{i}' for i in range(10)]
+            results = [r async for r in client.fetch_many(urls, concurrency=3, ordered=True)]
+
+        self.assertEqual([r.index for r in results], list(range(10)))
+        self.assertLessEqual(state['max_in_flight'], 3)
+        self.assertEqual(results[9].response.text, '9')
@@ -0,0 +1,78 @@
+from py_aws_core import exceptions, utils
+from py_aws_core.clients import RetryClient
+from py_aws_core.cookie_codecs import CompactCookieCodec, PickleCookieCodec
+from py_aws_core.testing import BaseTestFixture
+
+
+class CompactCookieCodecTests(BaseTestFixture):
+    LEGACY_COOKIES = b'gASVjAEAAAAAAABdlCiMDmh0dHAuY29va2llamFylIwGQ29va2lllJOUKYGUfZQojAd2ZXJzaW9u\nlEsBjARuYW1llIwIY29va2llXzGUjAV2YWx1ZZSMB3ZhbHVlXzGUjARwb3J0lE6MDnBvcnRfc3Bl\nY2lmaWVklImMBmRvbWFpbpSMD3d3dy5leGFtcGxlLmNvbZSMEGRvbWFpbl9zcGVjaWZpZWSUiIwS\nZG9tYWluX2luaXRpYWxfZG90lImMBHBhdGiUjAEvlIwOcGF0aF9zcGVjaWZpZWSUiIwGc2VjdXJl\nlIiMB2V4cGlyZXOUTRAOjAdkaXNjYXJklImMB2NvbW1lbnSUTowLY29tbWVudF91cmyUTowHcmZj\nMjEwOZSJjAVfcmVzdJR9lHViaAMpgZR9lChoBksBaAeMCGNvb2tpZV8ylGgJjAd2YWx1ZV8ylGgL\nTmgMiWgNjA93d3cuZXhhbXBsZS5jb22UaA+IaBCJaBFoEmgTiGgUiGgVTRAOaBaJaBdOaBhOaBmJ\naBp9lHViZS4=\n'
+
+    @classmethod
+    def create_live_cookie(cls, name: str, value: str, **rest):
+        cookie = cls.create_test_cookie(name=name, value=value)
+        cookie.expires = utils.add_seconds_to_current_unix_timestamp(seconds=3600)
+        cookie._rest = rest
+        return cookie
+
+    def test_round_trip(self):
+        cookie_1 = self.create_live_cookie(name='cookie_1', value='value_1', HttpOnly=None, SameSite='Strict')
+        cookie_2 = self.create_live_cookie(name='cookie_2', value='value_2')
+        cookie_2.expires = None
+        cookie_2.discard = True
+
+        codec = CompactCookieCodec()
+        encoded = codec.encode([cookie_1, cookie_2])
+        self.assertTrue(encoded.startswith(CompactCookieCodec.MAGIC))
+
+        r_cookie_1, r_cookie_2 = codec.decode(encoded)
+        for attr in ('name', 'value', 'domain', 'path', 'expires', 'secure', 'discard', 'domain_specified'):
+            self.assertEqual(getattr(r_cookie_1, attr), getattr(cookie_1, attr))
+            self.assertEqual(getattr(r_cookie_2, attr), getattr(cookie_2, attr))
+        self.assertEqual(r_cookie_1._rest, {'HttpOnly': None, 'SameSite': 'Strict'})
+
+    def test_smaller_than_legacy(self):
+        cookies = [self.create_live_cookie(name=f'cookie_{i}', value=utils.get_uuid_hex()) for i in range(10)]
+        compact = CompactCookieCodec().encode(cookies)
+        legacy = PickleCookieCodec().encode(cookies)
+        self.assertLess(len(compact), len(legacy) / 2)
+
+    def test_compression_threshold(self):
+        cookies = [self.create_live_cookie(name=f'cookie_{i}', value='a' * 100) for i in range(10)]
+        compressed = CompactCookieCodec(compress_threshold=256).encode(cookies)
+        uncompressed = CompactCookieCodec(compress_threshold=None).encode(cookies)
+
+        self.assertEqual(compressed[3] & CompactCookieCodec.FLAG_ZLIB, CompactCookieCodec.FLAG_ZLIB)
+        self.assertEqual(uncompressed[3] & CompactCookieCodec.FLAG_ZLIB, 0)
+        self.assertLess(len(compressed), len(uncompressed))
+        self.assertEqual(len(CompactCookieCodec().decode(compressed)), 10)
+
+    def test_prunes_expired(self):
+        expired = self.create_test_cookie(name='expired', value='value_1')  # Expires at 3600 seconds after epoch
+        live = self.create_live_cookie(name='live', value='value_2')
+
+        cookies = CompactCookieCodec().decode(CompactCookieCodec().encode([expired, live]))
+        self.assertEqual([c.name for c in cookies], ['live'])
+
+        cookies = CompactCookieCodec(prune_expired=False).decode(CompactCookieCodec().encode([live]))
+        self.assertEqual([c.name for c in cookies], ['live'])
+
+    def test_decodes_legacy(self):
+        cookies = CompactCookieCodec().decode(self.LEGACY_COOKIES)
+        self.assertEqual([c.name for c in cookies], ['cookie_1', 'cookie_2'])
+
+    def test_decode_errors(self):
+        codec = CompactCookieCodec()
+        with self.assertRaises(exceptions.CookieDecodingError):
+            codec.decode(CompactCookieCodec.MAGIC + b'\x01\x00\x05\x01')
+        with self.assertRaises(exceptions.CookieDecodingError):
+            codec.decode(CompactCookieCodec.MAGIC + b'\x09\x00')
+        with self.assertRaises(exceptions.CookieDecodingError):
+            codec.decode(b'badcookies')
+
+    def test_client_round_trip(self):
+        client = RetryClient()
+        client.cookies.jar.set_cookie(self.create_live_cookie(name='cookie_1', value='value_1'))
+
+        r_client = RetryClient()
+        r_client.decode_and_set_cookies(client.encoded_cookies)
+        self.assertEqual(r_client.cookies['cookie_1'], 'value_1')
@@ -0,0 +1,133 @@
+from unittest import IsolatedAsyncioTestCase, mock
+
+from httpx import MockTransport, ReadTimeout, Request, Response, codes
+
+from py_aws_core import deadlines, decorators, exceptions, router
+from py_aws_core.clients import AsyncRetryClient, RetryClient
+from py_aws_core.retry_policies import Jitter, RetryPolicy
+from py_aws_core.testing import BaseTestFixture
+
+
+class LambdaContext:
+    def __init__(self, remaining_ms: int):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self) -> int:
+        return self.remaining_ms
+
+
+class DeadlineTests(BaseTestFixture):
+    def test_bind(self):
+        self.assertIsNone(deadlines.get_remaining())
+        with deadlines.bind(10):
+            self.assertAlmostEqual(deadlines.get_remaining(), 10, delta=0.1)
+            with deadlines.bind(60):  # The sooner deadline wins
+                self.assertAlmostEqual(deadlines.get_remaining(), 10, delta=0.1)
+            with deadlines.bind(2):
+                self.assertAlmostEqual(deadlines.get_remaining(), 2, delta=0.1)
+        self.assertIsNone(deadlines.get_remaining())
+
+    def test_check(self):
+        deadlines.check()
+        with deadlines.bind(-1):
+            with self.assertRaises(exceptions.DeadlineExceeded):
+                deadlines.check()
+
+    def test_bind_lambda_context(self):
+        with deadlines.bind_lambda_context(LambdaContext(remaining_ms=3000), margin=0.5):
+            self.assertAlmostEqual(deadlines.get_remaining(), 2.5, delta=0.1)
+        with deadlines.bind_lambda_context(None):
+            self.assertIsNone(deadlines.get_remaining())
+
+    def test_fit_timeouts(self):
+        timeouts = {'connect': 5.0, 'read': 30.0, 'write': 1.0, 'pool': None}
+        self.assertEqual(deadlines.fit_timeouts(timeouts), timeouts)
+        with deadlines.bind(2):
+            fitted = deadlines.fit_timeouts(timeouts)
+        self.assertEqual(fitted['write'], 1.0)
+        for key in ('connect', 'read', 'pool'):
+            self.assertAlmostEqual(fitted[key], 2, delta=0.1)
+
+
+class RetryPolicyDeadlineTests(BaseTestFixture):
+    @mock.patch('py_aws_core.utils.sleep')
+    def test_fails_fast_when_delay_exceeds_deadline(self, mock_sleep):
+        policy = RetryPolicy(retry_exceptions=(ValueError,), tries=5, delay=1.0, backoff=2.0, jitter=Jitter.NONE)
+        func = mock.Mock(side_effect=ValueError('boom'))
+        with deadlines.bind(1.5):
+            with self.assertRaises(exceptions.DeadlineExceeded) as e:
+                policy.run(func)
+        self.assertIsInstance(e.exception.__cause__, ValueError)
+        self.assertEqual(func.call_count, 2)  # The second retry would sleep 2 seconds, past the deadline
+        mock_sleep.assert_called_once_with(1.0)
+
+    def test_no_attempt_after_deadline(self):
+        func = mock.Mock()
+        with deadlines.bind(0):
+            with self.assertRaises(exceptions.DeadlineExceeded):
+                RetryPolicy().run(func)
+        func.assert_not_called()
+
+
+class LambdaResponseHandlerDeadlineTests(BaseTestFixture):
+    @mock.patch('py_aws_core.utils.sleep')
+    def test_deadline_response(self, mock_sleep):
+        @decorators.lambda_response_handler(raise_as=exceptions.CoreException)
+        @decorators.retry(retry_exceptions=(ValueError,), tries=10, delay=1.0, jitter=0)
+        def handler(event, context):
+            raise ValueError('boom')
+
+        response = handler(dict(), LambdaContext(remaining_ms=1200))
+        self.assertEqual(response['statusCode'], 504)
+        self.assertEqual(mock_sleep.call_count, 0)  # 0.7 seconds remain after the margin, less than the first delay
+
+    def test_router_binds_deadline(self):
+        test_router = router.APIGatewayRouter()
+
+        @test_router.route(path='/abc', http_method='GET')
+        def remaining(aws_event, aws_context):
+            return deadlines.get_remaining()
+
+        value = test_router.handle_event({'path': '/abc', 'httpMethod': 'GET'}, LambdaContext(remaining_ms=10_000))
+        self.assertAlmostEqual(value, 9.5, delta=0.1)
+
+
+class RetryClientDeadlineTests(BaseTestFixture):
+    def test_shrinks_timeouts(self):
+        timeouts = list()
+
+        def handler(request: Request):
+            timeouts.append(request.extensions['timeout'])
+            return Response(status_code=codes.OK)
+
+        with RetryClient(transport=MockTransport(handler), timeout=10.0) as client:
+            with deadlines.bind(3):
+                client.get('https://example.com/a')
+            client.get('https://example.com/a')
+
+        self.assertAlmostEqual(timeouts[0]['read'], 3, delta=0.1)
+        self.assertEqual(timeouts[1]['read'], 10.0)
+
+    def test_timeout_at_deadline(self):
+        def handler(request: Request):
+            raise ReadTimeout('timed out', request=request)
+
+        with RetryClient(transport=MockTransport(handler)) as client:
+            with deadlines.bind(0.5):
+                with self.assertRaises(exceptions.DeadlineExceeded):
+                    client.get('https://example.com/a')
+
+
+class AsyncRetryClientDeadlineTests(IsolatedAsyncioTestCase):
+    async def test_shrinks_timeouts(self):
+        timeouts = list()
+
+        async def handler(request: Request):
+            timeouts.append(request.extensions['timeout'])
+            return Response(status_code=codes.OK)
+
+        async with AsyncRetryClient(transport=MockTransport(handler), timeout=10.0) as client:
+            with deadlines.bind(3):
+                await client.get('https://example.com/a')
+
+        self.assertAlmostEqual(timeouts[0]['connect'], 3, delta=0.1)
@@ -1,6 +1,6 @@
 import json
 from importlib.resources import as_file
-from unittest import TestCase, mock
+from unittest import IsolatedAsyncioTestCase, TestCase, mock
 
 from botocore.exceptions import ClientError
 from botocore.stub import Stubber
@@ -51,6 +51,16 @@ class Boto3HandlerTests(BaseTestFixture):
         self.assertEqual('Invalid Refresh Token', str(e.exception.kwargs['message']))
         stubber.assert_no_pending_responses()
 
+    @mock.patch('py_aws_core.decorators.logger')
+    @mock.patch('py_aws_core.logs.is_enabled_for', return_value=False)
+    def test_skips_debug_log(self, mock_is_enabled_for, mock_logger):
+        @decorators.boto3_handler(raise_as=exceptions.CognitoException)
+        def func(x):
+            return 2 * x
+
+        self.assertEqual(func(7), 14)
+        mock_logger.debug.assert_not_called()
+
     def test_handle_non_client_error(self):
         @decorators.boto3_handler(raise_as=exceptions.RouteNotFound)
         def func():
@@ -226,6 +236,32 @@ class RetryTests(TestCase):
         self.assertEqual(func.call_count, tries)
 
 
+class AsyncRetryTests(IsolatedAsyncioTestCase):
+    async def test_multi_retry(self):
+        tries = 5
+        func = mock.AsyncMock(side_effect=exceptions.CoreException("Test"))
+        decorated_function = decorators.retry(
+            retry_exceptions=(exceptions.CoreException,),
+            tries=tries,
+            delay=0,
+            backoff=1,
+            jitter=0,
+        )(func)
+        with self.assertRaises(exceptions.CoreException):
+            await decorated_function()
+        self.assertEqual(func.await_count, tries)
+
+    async def test_recovers(self):
+        func = mock.AsyncMock(side_effect=[exceptions.CoreException("Test"), 14])
+        decorated_function = decorators.retry(
+            retry_exceptions=(exceptions.CoreException,),
+            delay=0,
+            jitter=0,
+        )(func)
+        self.assertEqual(await decorated_function(), 14)
+        self.assertEqual(func.await_count, 2)
+
+
 class WrapExceptions(TestCase):
     def test_no_exception(self):
         @decorators.wrap_exceptions(raise_as=BlockingIOError)
@@ -253,3 +289,48 @@ class WrapExceptions(TestCase):
 
         with self.assertRaises(BlockingIOError):
             func()
+
+
+class AsyncDecoratorTests(IsolatedAsyncioTestCase):
+    async def test_boto3_handler(self):
+        @decorators.boto3_handler(raise_as=exceptions.CognitoException)
+        async def func():
+            raise ClientError(
+                error_response={'Error': {'Code': 'NotAuthorizedException', 'Message': 'Invalid Refresh Token'}},
+                operation_name='InitiateAuth'
+            )
+
+        with self.assertRaises(exceptions.CognitoException) as e:
+            await func()
+        self.assertEqual('Invalid Refresh Token', str(e.exception.kwargs['message']))
+
+    async def test_dynamodb_handler(self):
+        source = BaseTestFixture.TEST_BOTO3_ERROR_RESOURCES_PATH.joinpath('client_error#ConditionalCheckFailed.json')
+        with as_file(source) as err_json:
+            client_error = ClientError(error_response=json.loads(err_json.read_text(encoding='utf-8')), operation_name='test1')
+
+        @decorators.dynamodb_handler(client_err_map=dict(), cancellation_err_maps=[{'ConditionalCheckFailed': RuntimeError}])
+        async def func():
+            raise client_error
+
+        with self.assertRaises(RuntimeError):
+            await func()
+
+    async def test_lambda_response_handler(self):
+        @decorators.lambda_response_handler(raise_as=exceptions.CoreException)
+        async def func():
+            raise KeyError
+
+        response = await func()
+        self.assertEqual(response['statusCode'], exceptions.CoreException.HTTP_STATUS_CODE)
+
+    async def test_wrap_exceptions(self):
+        @decorators.wrap_exceptions(raise_as=BlockingIOError)
+        async def func(x):
+            if x:
+                raise KeyError
+            return 14
+
+        self.assertEqual(await func(0), 14)
+        with self.assertRaises(BlockingIOError):
+            await func(1)
@@ -0,0 +1,125 @@
+import io
+import os
+import tempfile
+from unittest import IsolatedAsyncioTestCase, mock
+
+from httpx import AsyncByteStream, MockTransport, RemoteProtocolError, Request, Response, SyncByteStream, codes
+
+from py_aws_core import exceptions
+from py_aws_core.clients import AsyncRetryClient, RetryClient
+from py_aws_core.testing import BaseTestFixture
+
+
+class BrokenStream(SyncByteStream, AsyncByteStream):
+    """
+    Sends the first "cut_at" bytes of data, then drops the connection
+    """
+    def __init__(self, data: bytes, cut_at: int = None, chunk_size: int = 1000):
+        self._data = data
+        self._cut_at = cut_at
+        self._chunk_size = chunk_size
+
+    def __iter__(self):
+        end = len(self._data) if self._cut_at is None else self._cut_at
+        for i in range(0, end, self._chunk_size):
+            yield self._data[i:min(end, i + self._chunk_size)]
+        if self._cut_at is not None:
+            raise RemoteProtocolError('peer closed connection without sending complete message body')
+
+    async def __aiter__(self):
+        for chunk in self:
+            yield chunk
+
+
+class RangeServer:
+    PAYLOAD = os.urandom(100_000)
+
+    def __init__(self, cuts: list[int | None], honor_range: bool = True):
+        """
+        :param cuts: Byte offset, relative to the start of each response body, at which each response is cut short
+        """
+        self.cuts = list(cuts)
+        self.honor_range = honor_range
+        self.requests: list[Request] = list()
+        self.bytes_sent = 0
+
+    def handler(self, request: Request) -> Response:
+        self.requests.append(request)
+        cut_at = self.cuts.pop(0) if self.cuts else None
+        headers = {'ETag': '"v1"', 'Accept-Ranges': 'bytes'}
+        range_header = request.headers.get('Range')
+        if range_header and self.honor_range:
+            start = int(range_header.removeprefix('bytes=').removesuffix('-'))
+            if start >= len(self.PAYLOAD):
+                return Response(status_code=codes.REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+            body = self.PAYLOAD[start:]
+            headers['Content-Range'] = f'bytes {start}-{len(self.PAYLOAD) - 1}/{len(self.PAYLOAD)}'
+            status_code = codes.PARTIAL_CONTENT
+        else:
+            body = self.PAYLOAD
+            status_code = codes.OK
+        headers['Content-Length'] = str(len(body))
+        self.bytes_sent += len(body) if cut_at is None else cut_at
+        return Response(status_code=status_code, headers=headers, stream=BrokenStream(body, cut_at=cut_at))
+
+
+class DownloadTests(BaseTestFixture):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.mocked_sleep = mock.patch('py_aws_core.utils.sleep', return_value=None).start()
+
+    def test_resumes_from_last_byte(self):
+        server = RangeServer(cuts=[40_000, 30_000])
+        sink = io.BytesIO()
+        with RetryClient(transport=MockTransport(server.handler)) as client:
+            written = client.download('https://example.com/file', sink)
+
+        self.assertEqual(written, len(RangeServer.PAYLOAD))
+        self.assertEqual(sink.getvalue(), RangeServer.PAYLOAD)
+        self.assertEqual(server.bytes_sent, len(RangeServer.PAYLOAD))  # No byte downloaded twice
+        self.assertEqual([r.headers.get('Range') for r in server.requests], [None, 'bytes=40000-', 'bytes=70000-'])
+        self.assertEqual(server.requests[1].headers['If-Range'], '"v1"')
+        self.assertEqual(server.requests[0].headers['Accept-Encoding'], 'identity')
+
+    def test_writes_to_path(self):
+        server = RangeServer(cuts=[50_000])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'file.bin')
+            with RetryClient(transport=MockTransport(server.handler)) as client:
+                client.download('https://example.com/file', path)
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), RangeServer.PAYLOAD)
+
+    def test_restarts_when_range_ignored(self):
+        server = RangeServer(cuts=[40_000], honor_range=False)
+        sink = io.BytesIO()
+        with RetryClient(transport=MockTransport(server.handler)) as client:
+            client.download('https://example.com/file', sink)
+        self.assertEqual(sink.getvalue(), RangeServer.PAYLOAD)
+
+    def test_incomplete(self):
+        server = RangeServer(cuts=[10, 10, 10, 10])
+        with self.assertRaises(RemoteProtocolError):
+            with RetryClient(transport=MockTransport(server.handler)) as client:
+                client.download('https://example.com/file', io.BytesIO())
+        self.assertEqual(len(server.requests), 4)
+
+    def test_non_retryable_status(self):
+        transport = MockTransport(lambda request: Response(status_code=codes.NOT_FOUND))
+        with self.assertRaises(exceptions.APIException):
+            with RetryClient(transport=transport) as client:
+                client.download('https://example.com/file', io.BytesIO())
+
+
+class AsyncDownloadTests(IsolatedAsyncioTestCase):
+    @mock.patch('py_aws_core.utils.async_sleep')
+    async def test_resumes_from_last_byte(self, mock_sleep):
+        server = RangeServer(cuts=[60_000])
+        sink = io.BytesIO()
+        async with AsyncRetryClient(transport=MockTransport(server.handler)) as client:
+            written = await client.download('https://example.com/file', sink)
+
+        self.assertEqual(written, len(RangeServer.PAYLOAD))
+        self.assertEqual(sink.getvalue(), RangeServer.PAYLOAD)
+        self.assertEqual(server.bytes_sent, len(RangeServer.PAYLOAD))
@@ -0,0 +1,73 @@
+from decimal import Decimal
+from enum import StrEnum
+
+from boto3.dynamodb.types import Binary, TypeDeserializer, TypeSerializer
+
+from py_aws_core.dynamodb_codec import DynamoDBCodec, get_dynamodb_codec
+from py_aws_core.testing import BaseTestFixture
+
+
+class Color(StrEnum):
+    RED = 'red'
+
+
+ITEM = {
+    'PK': 'SESSION#1',
+    'SK': 'SESSION#1',
+    'Count': 12,
+    'Big': -(10 ** 37),
+    'Price': Decimal('19.99'),
+    'Enabled': True,
+    'Deleted': None,
+    'Blob': b'\x00\x01',
+    'Buffer': bytearray(b'\x02'),
+    'Wrapped': Binary(b'\x03'),
+    'Tags': {'a', 'b'},
+    'Scores': {1, Decimal('2.5')},
+    'Tuple': (1, 'x'),
+    'Color': Color.RED,
+    'Data': {'Name': 'abc', 'Nested': [{'Enabled': False}, [], {}]},
+}
+
+
+class DynamoDBCodecTests(BaseTestFixture):
+    def test_matches_boto3(self):
+        codec = DynamoDBCodec()
+        expected = {k: TypeSerializer().serialize(v) for k, v in ITEM.items()}
+        serialized = codec.serialize(ITEM)
+        self.assertEqual(serialized, expected)
+        self.assertEqual(codec.deserialize(serialized), {k: TypeDeserializer().deserialize(v) for k, v in expected.items()})
+
+    def test_items(self):
+        codec = get_dynamodb_codec()
+        self.assertIs(get_dynamodb_codec(), codec)
+        items = [{'PK': f'SESSION#{i}', 'Count': i} for i in range(3)]
+        serialized = codec.serialize_items(items)
+        self.assertEqual(serialized[2], {'PK': {'S': 'SESSION#2'}, 'Count': {'N': '2'}})
+        self.assertEqual(codec.deserialize_items(serialized), items)
+
+    def test_schema(self):
+        codec = DynamoDBCodec(schema={'PK': 'S', 'Count': 'N', 'Enabled': 'BOOL', 'Data': 'M', 'Name': 'N'})
+        item = {'PK': 'SESSION#1', 'Count': Decimal(3), 'Enabled': False, 'Data': {'Name': 'abc'}, 'Other': Decimal(1)}
+        serialized = codec.serialize(item)
+        self.assertEqual(serialized, DynamoDBCodec().serialize(item))
+        self.assertEqual(codec.deserialize(serialized), item)  # Hints only apply to top level attributes
+
+        serialized['Enabled'] = {'NULL': True}
+        self.assertEqual(codec.deserialize(serialized), item | {'Enabled': None})
+
+    def test_unknown_schema_tag(self):
+        with self.assertRaises(ValueError):
+            DynamoDBCodec(schema={'PK': 'STRING'})
+
+    def test_errors(self):
+        codec = DynamoDBCodec()
+        for value in (1.5, 10 ** 40, Decimal('NaN'), object()):
+            with self.subTest(value=value), self.assertRaises(Exception) as e:
+                codec.serialize({'A': value})
+            with self.assertRaises(type(e.exception)):
+                TypeSerializer().serialize(value)
+
+        for value in ({}, {'X': 'a'}):
+            with self.subTest(value=value), self.assertRaises(TypeError):
+                codec.deserialize({'A': value})
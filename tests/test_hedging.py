@@ -0,0 +1,148 @@
+import asyncio
+import threading
+from unittest import IsolatedAsyncioTestCase
+
+from httpx import ByteStream, MockTransport, Response, codes
+
+from py_aws_core.clients import AsyncRetryClient, RetryClient
+from py_aws_core.hedging import Hedger, HedgePolicy, LatencyWindow
+from py_aws_core.testing import BaseTestFixture
+
+
+class LatencyWindowTests(BaseTestFixture):
+    def test_percentile(self):
+        window = LatencyWindow(size=100)
+        self.assertIsNone(window.percentile(95))
+        for i in range(1, 101):
+            window.record(i / 100)
+        self.assertEqual(window.percentile(50), 0.5)
+        self.assertEqual(window.percentile(95), 0.95)
+        self.assertEqual(window.percentile(100), 1.0)
+
+        window.record(2.0)  # Oldest latency drops out
+        self.assertEqual(len(window), 100)
+        self.assertEqual(window.percentile(1), 0.02)
+
+
+class HedgerTests(BaseTestFixture):
+    def setUp(self):
+        super().setUp()
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def slow(self):
+        self.release.wait(timeout=5)
+        return Response(status_code=codes.OK, text='slow')
+
+    def test_hedge_wins(self):
+        hedger = Hedger(policy=HedgePolicy(min_samples=10, max_hedge_ratio=0.1))
+        self.addCleanup(hedger.close)
+        for _ in range(10):
+            hedger.run(send=lambda: 'fast', hedge=self.slow)
+        self.assertEqual(hedger.metrics['hedges'], 0)
+
+        response = hedger.run(send=self.slow, hedge=lambda: Response(status_code=codes.OK, text='hedged'))
+        self.assertEqual(response.text, 'hedged')
+        self.assertEqual(hedger.metrics['hedges'], 1)
+        self.assertEqual(hedger.metrics['hedge_wins'], 1)
+
+    def test_hedge_ratio_cap(self):
+        hedger = Hedger(policy=HedgePolicy(max_hedge_ratio=0.5))
+        hedger._count_request()
+        self.assertFalse(hedger._try_acquire_hedge())
+        for _ in range(3):
+            hedger._count_request()
+        self.assertTrue(hedger._try_acquire_hedge())
+        self.assertTrue(hedger._try_acquire_hedge())
+        self.assertFalse(hedger._try_acquire_hedge())  # 4 requests allow 2 hedges
+        self.assertEqual(hedger.metrics['hedges'], 2)
+
+    def test_failed_hedge_falls_back_to_primary(self):
+        hedger = Hedger(policy=HedgePolicy(min_samples=1, min_delay=0.01, max_hedge_ratio=1))
+        self.addCleanup(hedger.close)
+        hedger.run(send=lambda: 'fast', hedge=self.slow)
+
+        def failing_hedge():
+            self.release.set()
+            raise ValueError('hedge failed')
+
+        response = hedger.run(send=self.slow, hedge=failing_hedge)
+        self.assertEqual(response.text, 'slow')
+
+
+class RetryClientHedgingTests(BaseTestFixture):
+    def test_client_hedges_slow_request(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        state = {'block_next': False, 'calls': 0}
+
+        def handler(request):
+            state['calls'] += 1
+            if state['block_next']:
+                state['block_next'] = False
+                release.wait(timeout=5)
+                return Response(status_code=codes.OK, stream=ByteStream(b'slow'))
+            return Response(status_code=codes.OK, stream=ByteStream(b'fast'))
+
+        policy = HedgePolicy(min_samples=5, max_hedge_ratio=0.5)
+        with RetryClient(transport=MockTransport(handler), hedge_policy=policy) as client:
+            for _ in range(5):
+                client.get('https://example.com')
+            state['block_next'] = True
+            r = client.get('https://example.com')
+            self.assertEqual(r.read(), b'fast')
+            self.assertEqual(state['calls'], 7)
+
+            client.post('https://example.com')  # Not hedged
+            self.assertEqual(client._hedger.metrics['requests'], 6)
+
+    def test_alternate_client_hedge_keeps_cookies(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        state = {'block_next': False}
+
+        def handler(request):
+            if state['block_next']:
+                state['block_next'] = False
+                release.wait(timeout=5)
+            return Response(status_code=codes.OK, text='primary')
+
+        def alternate_handler(request):
+            return Response(status_code=codes.OK, text='alternate', headers={'Set-Cookie': 'sid=abc; Path=/'})
+
+        alternate_client = RetryClient(transport=MockTransport(alternate_handler))
+        self.addCleanup(alternate_client.close)
+        policy = HedgePolicy(min_samples=5, max_hedge_ratio=0.5, alternate_client=alternate_client)
+        with RetryClient(transport=MockTransport(handler), hedge_policy=policy) as client:
+            for _ in range(5):
+                client.get('https://example.com')
+            state['block_next'] = True
+            r = client.get('https://example.com')
+            self.assertEqual(r.text, 'alternate')
+            self.assertEqual(client.cookies.get('sid'), 'abc')
+            self.assertIsNone(alternate_client.cookies.get('sid'))  # Only its transport is used
+
+
+class AsyncRetryClientHedgingTests(IsolatedAsyncioTestCase):
+    async def test_client_hedges_and_cancels_loser(self):
+        state = {'block_next': False, 'cancelled': False}
+
+        async def handler(request):
+            if state['block_next']:
+                state['block_next'] = False
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    state['cancelled'] = True
+                    raise
+            return Response(status_code=codes.OK, text='fast')
+
+        policy = HedgePolicy(min_samples=5, max_hedge_ratio=0.5)
+        async with AsyncRetryClient(transport=MockTransport(handler), hedge_policy=policy) as client:
+            for _ in range(5):
+                await client.get('https://example.com')
+            state['block_next'] = True
+            r = await client.get('https://example.com')
+            self.assertEqual(r.text, 'fast')
+        self.assertTrue(state['cancelled'])
+        self.assertEqual(client._hedger.metrics['hedge_wins'], 1)
@@ -0,0 +1,191 @@
+import gzip
+import tempfile
+import time
+from unittest import IsolatedAsyncioTestCase, mock
+
+from httpx import MockTransport, Request, Response, codes
+
+from py_aws_core.clients import AsyncRetryClient, RetryClient
+from py_aws_core.http_cache import CacheEntry, DiskCacheStore, HttpCache, MemoryCacheStore
+from py_aws_core.testing import BaseTestFixture
+
+
+class CachingServer:
+    def __init__(self, headers: dict, body: bytes = b'payload'):
+        self.headers = headers
+        self.body = body
+        self.requests: list[Request] = list()
+
+    def handler(self, request: Request) -> Response:
+        self.requests.append(request)
+        etag = self.headers.get('ETag')
+        if etag and request.headers.get('If-None-Match') == etag:
+            return Response(status_code=codes.NOT_MODIFIED, headers={'ETag': etag, 'Cache-Control': 'max-age=60'})
+        return Response(status_code=codes.OK, headers=self.headers, content=self.body)
+
+
+def build_entry(key: str, size: int) -> CacheEntry:
+    return CacheEntry(url=key, status_code=200, headers=[], content=b'x' * size, stored_at=time.time())
+
+
+class MemoryCacheStoreTests(BaseTestFixture):
+    def test_evicts_least_recently_used(self):
+        store = MemoryCacheStore(max_bytes=250)
+        store.set('a', build_entry('a', 100))
+        store.set('b', build_entry('b', 100))
+        store.get('a')
+        store.set('c', build_entry('c', 100))
+
+        self.assertIsNotNone(store.get('a'))
+        self.assertIsNone(store.get('b'))
+        self.assertIsNotNone(store.get('c'))
+        self.assertEqual(store.size, 200)
+
+    def test_skips_oversized_entry(self):
+        store = MemoryCacheStore(max_bytes=50)
+        store.set('a', build_entry('a', 100))
+        self.assertEqual(len(store), 0)
+
+
+class DiskCacheStoreTests(BaseTestFixture):
+    def test_round_trip(self):
+        entry = CacheEntry(
+            url='https://example.com/a',
+            status_code=200,
+            headers=[('ETag', '"v1"'), ('Content-Type', 'application/json')],
+            content=b'{"a": 1}',
+            stored_at=1000.0,
+            vary={'Accept': 'application/json'},
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = DiskCacheStore(tmp_dir)
+            store.set('GET https://example.com/a', entry)
+            self.assertEqual(DiskCacheStore(tmp_dir).get('GET https://example.com/a'), entry)
+            store.delete('GET https://example.com/a')
+            self.assertIsNone(store.get('GET https://example.com/a'))
+
+
+class RetryClientCacheTests(BaseTestFixture):
+    def test_fresh_hit(self):
+        server = CachingServer(headers={'Cache-Control': 'max-age=60'})
+        cache = HttpCache()
+        with RetryClient(transport=MockTransport(server.handler), cache=cache) as client:
+            r1 = client.get('https://example.com/a')
+            r2 = client.get('https://example.com/a')
+
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(r2.content, b'payload')
+        self.assertEqual(r2.request.url, 'https://example.com/a')
+        self.assertEqual(r1.status_code, r2.status_code)
+        self.assertEqual(cache.metrics, {'hits': 1, 'revalidations': 0, 'misses': 1})
+
+    def test_decoded_body(self):
+        server = CachingServer(headers={'Cache-Control': 'max-age=60', 'Content-Encoding': 'gzip'}, body=gzip.compress(b'abc'))
+        with RetryClient(transport=MockTransport(server.handler), cache=HttpCache()) as client:
+            client.get('https://example.com/a')
+            response = client.get('https://example.com/a')
+        self.assertEqual(response.content, b'abc')
+        self.assertEqual(response.headers['Content-Length'], '3')
+
+    def test_revalidates_stale_entry(self):
+        server = CachingServer(headers={'Cache-Control': 'no-cache', 'ETag': '"v1"'})
+        cache = HttpCache()
+        with RetryClient(transport=MockTransport(server.handler), cache=cache) as client:
+            client.get('https://example.com/a')
+            response = client.get('https://example.com/a')
+            client.get('https://example.com/a')  # 304 refreshed the entry with max-age=60
+
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(server.requests[1].headers['If-None-Match'], '"v1"')
+        self.assertEqual(response.status_code, codes.OK)
+        self.assertEqual(response.content, b'payload')
+        self.assertEqual(cache.metrics, {'hits': 1, 'revalidations': 1, 'misses': 1})
+
+    def test_last_modified(self):
+        server = CachingServer(headers={'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+        with RetryClient(transport=MockTransport(server.handler), cache=HttpCache()) as client:
+            client.get('https://example.com/a')
+            client.get('https://example.com/a')
+        self.assertEqual(server.requests[1].headers['If-Modified-Since'], 'Wed, 21 Oct 2015 07:28:00 GMT')
+
+    @mock.patch('py_aws_core.http_cache.time.time')
+    def test_expires_after_max_age(self, mock_time):
+        mock_time.return_value = 1000.0
+        server = CachingServer(headers={'Cache-Control': 'max-age=60', 'Age': '30'})
+        with RetryClient(transport=MockTransport(server.handler), cache=HttpCache()) as client:
+            client.get('https://example.com/a')
+            mock_time.return_value = 1029.0
+            client.get('https://example.com/a')
+            mock_time.return_value = 1031.0
+            client.get('https://example.com/a')
+        self.assertEqual(len(server.requests), 2)
+
+    def test_not_cached(self):
+        for headers in ({'Cache-Control': 'no-store'}, {'Cache-Control': 'max-age=60', 'Vary': '*'}, dict()):
+            server = CachingServer(headers=headers)
+            with RetryClient(transport=MockTransport(server.handler), cache=HttpCache()) as client:
+                client.get('https://example.com/a')
+                client.get('https://example.com/a')
+            self.assertEqual(len(server.requests), 2, headers)
+
+    def test_non_get_bypasses_cache(self):
+        server = CachingServer(headers={'Cache-Control': 'max-age=60'})
+        with RetryClient(transport=MockTransport(server.handler), cache=HttpCache()) as client:
+            client.get('https://example.com/a')
+            client.post('https://example.com/a')
+            client.get('https://example.com/a', headers={'Cache-Control': 'no-cache'})
+        self.assertEqual(len(server.requests), 3)
+
+    def test_vary(self):
+        server = CachingServer(headers={'Cache-Control': 'max-age=60', 'Vary': 'Accept'})
+        with RetryClient(transport=MockTransport(server.handler), cache=HttpCache()) as client:
+            client.get('https://example.com/a', headers={'Accept': 'application/json'})
+            client.get('https://example.com/a', headers={'Accept': 'text/html'})
+            client.get('https://example.com/a', headers={'Accept': 'text/html'})
+        self.assertEqual(len(server.requests), 2)  # Each Accept value replaces the single entry for the url
+
+    def test_credentials(self):
+        server = CachingServer(headers={'Cache-Control': 'max-age=60'})
+        with RetryClient(transport=MockTransport(server.handler), cache=HttpCache()) as client:
+            for headers in ({'Authorization': 'Bearer a'}, {'Authorization': 'Bearer b'}, {'Cookie': 'sid=a'}, dict()):
+                client.get('https://example.com/a', headers=headers)
+                client.get('https://example.com/a', headers=headers)
+        self.assertEqual(len(server.requests), 4)  # Each hit only for the same credentials
+
+    def test_private_not_cached(self):
+        server = CachingServer(headers={'Cache-Control': 'private, max-age=60'})
+        with RetryClient(transport=MockTransport(server.handler), cache=HttpCache()) as client:
+            client.get('https://example.com/a')
+            client.get('https://example.com/a')
+        self.assertEqual(len(server.requests), 2)
+
+    def test_redirect_keyed_by_final_url(self):
+        server = CachingServer(headers={'Cache-Control': 'max-age=60'})
+
+        def handler(request: Request) -> Response:
+            if request.url.path == '/old':
+                server.requests.append(request)
+                return Response(status_code=codes.FOUND, headers={'Location': '/new'})
+            return server.handler(request)
+
+        with RetryClient(transport=MockTransport(handler), cache=HttpCache()) as client:
+            client.get('https://example.com/old', follow_redirects=True)
+            response = client.get('https://example.com/new')
+            client.get('https://example.com/old', follow_redirects=True)
+        self.assertEqual(response.content, b'payload')
+        self.assertEqual([r.url.path for r in server.requests], ['/old', '/new', '/old', '/new'])
+
+
+class AsyncRetryClientCacheTests(IsolatedAsyncioTestCase):
+    async def test_revalidates_stale_entry(self):
+        server = CachingServer(headers={'Cache-Control': 'max-age=0', 'ETag': '"v1"'})
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = HttpCache(store=DiskCacheStore(tmp_dir))
+            async with AsyncRetryClient(transport=MockTransport(server.handler), cache=cache) as client:
+                await client.get('https://example.com/a')
+                response = await client.get('https://example.com/a')
+                await client.get('https://example.com/a')
+
+        self.assertEqual(response.content, b'payload')
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(cache.metrics, {'hits': 1, 'revalidations': 1, 'misses': 1})
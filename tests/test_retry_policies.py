@@ -0,0 +1,181 @@
+from email.utils import format_datetime
+from unittest import mock
+
+from botocore.exceptions import ClientError
+from httpx import ConnectError, HTTPStatusError, Request, Response
+
+from py_aws_core import decorators, exceptions, utils
+from py_aws_core.retry_policies import Jitter, KeyedRetryBudget, RetryBudget, RetryPolicy, StatusRule, get_retry_after
+from py_aws_core.testing import BaseTestFixture
+
+
+class RetryPolicyTests(BaseTestFixture):
+    @classmethod
+    def create_status_error(cls, status_code: int, method: str = 'GET', headers: dict = None) -> HTTPStatusError:
+        request = Request(method=method, url='https://example.com')
+        response = Response(status_code=status_code, request=request, headers=headers)
+        return HTTPStatusError(message='test', request=request, response=response)
+
+    @classmethod
+    def create_client_error(cls, status_code: int, retry_after: str) -> ClientError:
+        return ClientError(
+            error_response={
+                'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'},
+                'ResponseMetadata': {'HTTPStatusCode': status_code, 'HTTPHeaders': {'retry-after': retry_after}},
+            },
+            operation_name='GetItem'
+        )
+
+    def test_honors_retry_after_seconds(self):
+        policy = RetryPolicy(retry_exceptions=(HTTPStatusError,), delay=0.1, jitter=Jitter.NONE, max_retry_after=10)
+        exc = self.create_status_error(status_code=429, headers={'Retry-After': '7'})
+        self.assertEqual(policy.get_delay(num_tries=1, prev_delay=None, exc=exc), 7)
+
+        exc = self.create_status_error(status_code=429, headers={'Retry-After': '120'})
+        self.assertEqual(policy.get_delay(num_tries=1, prev_delay=None, exc=exc), 10)
+
+        policy = RetryPolicy(retry_exceptions=(HTTPStatusError,), delay=0.1, jitter=Jitter.NONE, honor_retry_after=False)
+        self.assertEqual(policy.get_delay(num_tries=1, prev_delay=None, exc=exc), 0.1)
+
+    def test_honors_retry_after_date(self):
+        retry_at = format_datetime(utils.add_seconds_to_now_datetime(seconds=30), usegmt=True)
+        exc = self.create_status_error(status_code=503, headers={'Retry-After': retry_at})
+        self.assertAlmostEqual(get_retry_after(exc), 30, delta=2)
+
+        exc = self.create_status_error(status_code=503, headers={'Retry-After': 'not a date'})
+        self.assertIsNone(get_retry_after(exc))
+
+    def test_honors_boto_retry_after(self):
+        policy = RetryPolicy(retry_exceptions=(ClientError,), delay=0.1, jitter=Jitter.NONE)
+        exc = self.create_client_error(status_code=400, retry_after='3')
+        self.assertEqual(policy.get_delay(num_tries=1, prev_delay=None, exc=exc), 3)
+
+    def test_idempotent_only(self):
+        policy = RetryPolicy(retry_exceptions=(HTTPStatusError, ConnectError), always_retry_exceptions=(ConnectError,))
+        self.assertTrue(policy.should_retry(self.create_status_error(status_code=503, method='GET')))
+        self.assertFalse(policy.should_retry(self.create_status_error(status_code=503, method='POST')))
+        self.assertTrue(policy.should_retry(ConnectError(message='test'), method='POST'))
+
+        policy = RetryPolicy(retry_exceptions=(HTTPStatusError,), idempotent_only=False)
+        self.assertTrue(policy.should_retry(self.create_status_error(status_code=503, method='POST')))
+
+    def test_status_rules(self):
+        policy = RetryPolicy(
+            retry_exceptions=(HTTPStatusError,),
+            delay=0.1,
+            jitter=Jitter.NONE,
+            status_rules={
+                500: StatusRule(retry=False),
+                429: StatusRule(min_delay=5, honor_retry_after=False),
+            }
+        )
+        self.assertFalse(policy.should_retry(self.create_status_error(status_code=500)))
+        self.assertTrue(policy.should_retry(self.create_status_error(status_code=502)))
+
+        exc = self.create_status_error(status_code=429, headers={'Retry-After': '30'})
+        self.assertEqual(policy.get_delay(num_tries=1, prev_delay=None, exc=exc), 5)
+
+    def test_jitter(self):
+        policy = RetryPolicy(delay=1, backoff=2, max_delay=6, jitter=Jitter.NONE)
+        self.assertEqual([policy.get_delay(num_tries=n, prev_delay=None) for n in range(1, 5)], [1, 2, 4, 6])
+
+        policy = RetryPolicy(delay=1, backoff=2, max_delay=6, jitter=Jitter.FULL)
+        for n in range(1, 5):
+            self.assertTrue(0 <= policy.get_delay(num_tries=n, prev_delay=None) <= min(6, 2 ** (n - 1)))
+
+        policy = RetryPolicy(delay=1, max_delay=6, jitter=Jitter.DECORRELATED)
+        for prev_delay in (None, 1, 1.5, 4, 6):
+            self.assertTrue(1 <= policy.get_delay(num_tries=2, prev_delay=prev_delay) <= 6)
+
+    @mock.patch('py_aws_core.utils.sleep')
+    def test_run_sleeps_retry_after(self, mock_sleep):
+        policy = RetryPolicy(retry_exceptions=(HTTPStatusError,), delay=0.1, jitter=Jitter.NONE)
+        exc = self.create_status_error(status_code=429, headers={'Retry-After': '2'})
+        func = mock.Mock(side_effect=[exc, exc, 'ok'])
+        self.assertEqual(policy.run(func), 'ok')
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(mock_sleep.call_args_list, [mock.call(2), mock.call(2)])
+
+    @mock.patch('py_aws_core.utils.sleep')
+    def test_decorator_policy(self, mock_sleep):
+        policy = RetryPolicy(retry_exceptions=(ClientError,), tries=3, delay=0.1, jitter=Jitter.NONE)
+        func = mock.Mock(side_effect=self.create_client_error(status_code=400, retry_after='1'))
+        with self.assertRaises(ClientError):
+            decorators.retry(policy=policy)(func)()
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+
+class RetryBudgetTests(BaseTestFixture):
+    def test_named_budgets(self):
+        self.assertIs(RetryBudget.get('test_upstream'), RetryBudget.get('test_upstream'))
+        self.assertIsNot(RetryBudget.get('test_upstream'), RetryBudget.get())
+
+    def test_conflicting_params(self):
+        budget = RetryBudget.get('test_params', capacity=5)
+        self.assertIs(RetryBudget.get('test_params', capacity=5), budget)
+        self.assertIs(RetryBudget.get('test_params'), budget)
+        with self.assertRaises(ValueError):
+            RetryBudget.get('test_params', capacity=10)
+
+    @mock.patch('py_aws_core.utils.sleep')
+    def test_keyed_budgets(self, mock_sleep):
+        keyed_budget = KeyedRetryBudget(name='test', max_keys=2, capacity=1)
+        policy = RetryPolicy(retry_exceptions=(exceptions.CoreException,), delay=0, budget=keyed_budget)
+        func = mock.Mock(side_effect=exceptions.CoreException('Test'))
+        with self.assertRaises(exceptions.CoreException):
+            policy.run(func, budget_key='down.example.com')
+        self.assertEqual(func.call_count, 2)  # Spent the only token of down.example.com
+
+        func.reset_mock()
+        with self.assertRaises(exceptions.CoreException):
+            policy.run(func, budget_key='up.example.com')
+        self.assertEqual(func.call_count, 2)
+        self.assertEqual(keyed_budget.get('down.example.com').metrics['retries_denied'], 1)
+
+        keyed_budget.get('other.example.com')
+        self.assertEqual(len(keyed_budget), 2)
+
+    def test_spend_and_refill(self):
+        budget = RetryBudget(capacity=2, retry_cost=1, success_refill=0.5)
+        self.assertTrue(budget.try_spend())
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+
+        budget.record_success()
+        self.assertFalse(budget.try_spend())
+        budget.record_success()
+        self.assertTrue(budget.try_spend())
+
+        for _ in range(10):
+            budget.record_success()
+        self.assertEqual(budget.tokens, 2)
+        self.assertEqual(budget.metrics['retries_allowed'], 3)
+        self.assertEqual(budget.metrics['retries_denied'], 2)
+        self.assertEqual(budget.metrics['successes'], 12)
+
+    @mock.patch('py_aws_core.utils.sleep')
+    def test_fails_fast_when_exhausted(self, mock_sleep):
+        budget = RetryBudget(capacity=3)
+        func = mock.Mock(side_effect=exceptions.CoreException('Test'))
+        decorated_function = decorators.retry(retry_exceptions=(exceptions.CoreException,), delay=0, budget=budget)(func)
+
+        with self.assertRaises(exceptions.CoreException):
+            decorated_function()
+        self.assertEqual(func.call_count, 4)
+
+        func.reset_mock()
+        with self.assertRaises(exceptions.CoreException):
+            decorated_function()
+        self.assertEqual(func.call_count, 1)
+        self.assertEqual(mock_sleep.call_count, 3)
+        self.assertEqual(budget.metrics['retries_denied'], 1)
+
+    @mock.patch('py_aws_core.utils.sleep')
+    def test_success_refills(self, mock_sleep):
+        budget = RetryBudget(capacity=1, success_refill=1)
+        policy = RetryPolicy(retry_exceptions=(exceptions.CoreException,), delay=0, budget=budget)
+        func = mock.Mock(side_effect=[exceptions.CoreException('Test'), 'ok', exceptions.CoreException('Test'), 'ok'])
+        self.assertEqual(policy.run(func), 'ok')
+        self.assertEqual(policy.run(func), 'ok')
+        self.assertEqual(budget.metrics['retries_allowed'], 2)
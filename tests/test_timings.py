@@ -0,0 +1,148 @@
+from unittest import IsolatedAsyncioTestCase, mock
+
+from httpx import ConnectError, MockTransport, Request, Response, codes
+
+from py_aws_core.clients import AsyncRetryClient, RetryClient
+from py_aws_core.testing import BaseTestFixture
+from py_aws_core.timings import TRACE_PHASES, LatencyHistogram, RequestTimer, TimingRegistry, copy_untimed
+
+
+class LatencyHistogramTests(BaseTestFixture):
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.percentile(50))
+        for i in range(1, 1001):
+            histogram.record(i / 1000)
+
+        for p, expected in ((50, 0.5), (95, 0.95), (99, 0.99)):
+            self.assertAlmostEqual(histogram.percentile(p), expected, delta=expected * 0.1)
+        self.assertEqual(histogram.percentile(100), 1.0)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['count'], 1000)
+        self.assertAlmostEqual(snapshot['mean'], 0.5005)
+
+    def test_out_of_range(self):
+        histogram = LatencyHistogram()
+        histogram.record(0)
+        histogram.record(1000)
+        self.assertEqual(histogram.percentile(10), LatencyHistogram.BOUNDS[0])  # Upper bound of the first bucket
+        self.assertEqual(histogram.percentile(99), 1000)
+
+
+class RequestTimerTests(BaseTestFixture):
+    @mock.patch('py_aws_core.timings.time.monotonic')
+    def test_phases(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+        timer = RequestTimer(Request(method='GET', url='https://example.com'))
+        events = [
+            ('connection.connect_tcp.started', 0.0),
+            ('connection.connect_tcp.complete', 0.1),
+            ('http11.send_request_headers.started', 0.1),  # Proxy CONNECT request
+            ('http11.send_request_headers.complete', 0.11),
+            ('http11.receive_response_headers.started', 0.11),
+            ('http11.receive_response_headers.complete', 0.3),
+            ('proxy.start_tls.started', 0.3),
+            ('proxy.start_tls.complete', 0.5),
+            ('http11.send_request_headers.started', 0.5),
+            ('http11.send_request_headers.complete', 0.52),
+            ('http11.receive_response_headers.started', 0.52),
+            ('http11.receive_response_headers.complete', 1.0),
+            ('http11.response_closed.started', 1.0),
+        ]
+        with timer.attempt():
+            for event_name, now in events:
+                mock_monotonic.return_value = now
+                timer.trace(event_name, dict())
+
+        expected = {'connect': 0.1, 'proxy_connect': 0.2, 'tls': 0.2, 'send': 0.02, 'wait': 0.48}
+        self.assertEqual(timer.phases.keys(), expected.keys())
+        for phase, seconds in expected.items():
+            self.assertAlmostEqual(timer.phases[phase], seconds)
+        self.assertEqual(timer.attempt_latencies, [1.0])
+
+    def test_trace_phase_names(self):
+        # httpcore prefixes trace events with the last part of the name of the module's logger
+        from httpcore._sync import connection, http11, http2, http_proxy
+
+        prefixes = {module.logger.name.rpartition('.')[2] for module in (connection, http11, http2, http_proxy)}
+        self.assertTrue(all(name.partition('.')[0] in prefixes for name in TRACE_PHASES), prefixes)
+
+    def test_chains_trace_extension(self):
+        existing = mock.Mock()
+        request = Request(method='GET', url='https://example.com', extensions={'trace': existing})
+        timer = RequestTimer(request)
+        with timer.install():
+            request.extensions['trace']('connection.connect_tcp.started', {'timeout': 1})
+            copy = copy_untimed(request)
+        existing.assert_called_once_with('connection.connect_tcp.started', {'timeout': 1})
+        self.assertIs(request.extensions['trace'], existing)
+        self.assertIs(copy.extensions['trace'], existing)
+
+    def test_restores_missing_trace_extension(self):
+        request = Request(method='GET', url='https://example.com')
+        with RequestTimer(request).install():
+            self.assertNotIn('trace', copy_untimed(request).extensions)
+        self.assertNotIn('trace', request.extensions)
+
+
+class TimingRegistryTests(BaseTestFixture):
+    def test_max_hosts(self):
+        registry = TimingRegistry(max_hosts=2)
+        for host in ('a.example.com', 'b.example.com', 'a.example.com', 'c.example.com'):
+            timer = RequestTimer(Request(method='GET', url=f'https://{host}'))
+            timer.finish()
+            registry.record(timer, status_code=200)
+        self.assertEqual(set(registry.get_stats()), {'a.example.com', 'c.example.com'})
+        self.assertEqual(registry.get_stats(host='a.example.com')['requests'], 2)
+
+
+class RetryClientTimingTests(BaseTestFixture):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.mocked_sleep = mock.patch('py_aws_core.utils.sleep', return_value=None).start()
+
+    def test_records_phases_and_retries(self):
+        calls = {'count': 0}
+
+        def handler(request: Request):
+            calls['count'] += 1
+            if calls['count'] == 1:
+                raise ConnectError(message='refused', request=request)
+            trace = request.extensions['trace']
+            for name in ('connection.connect_tcp', 'http11.send_request_headers', 'http11.receive_response_headers'):
+                trace(f'{name}.started', dict())
+                trace(f'{name}.complete', dict())
+            return Response(status_code=codes.OK, text='ok')
+
+        registry = TimingRegistry()
+        with RetryClient(transport=MockTransport(handler), timing_registry=registry) as client:
+            client.get('https://example.com/a')
+            stats = client.get_latency_stats(host='example.com')
+
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['retries'], 1)
+        self.assertEqual(stats['attempt']['count'], 2)
+        for phase in ('connect', 'send', 'wait'):
+            self.assertEqual(stats[phase]['count'], 1)
+        self.assertNotIn('tls', stats)
+        self.assertEqual(registry.get_stats(host='unknown.example.com'), dict())
+
+
+class AsyncRetryClientTimingTests(IsolatedAsyncioTestCase):
+    async def test_records_phases(self):
+        async def handler(request: Request):
+            trace = request.extensions['trace']
+            await trace('connection.start_tls.started', dict())
+            await trace('connection.start_tls.complete', dict())
+            return Response(status_code=codes.OK, text='ok')
+
+        registry = TimingRegistry()
+        async with AsyncRetryClient(transport=MockTransport(handler), timing_registry=registry) as client:
+            await client.get('https://example.com/a')
+            await client.get('https://example.com/b')
+
+        stats = registry.get_stats()['example.com']
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['tls']['count'], 2)
+        self.assertEqual(stats['total']['count'], 2)